@@ -314,7 +314,12 @@ class XGSBuilder(PyInstallerBuilder):
         cls.run_command(cmd_segs, "Cython编译")
         time.sleep(2)
 
-        print("=== 步骤3: 使用Pyinstaller打包成exe ===")
+        print("=== 步骤3: 生成反检测脚本包 ===")
+        from src.frame.common.playwright_stealth.stealth import build_bundle
+        bundle_path = build_bundle()
+        print(f"已生成反检测脚本包：{bundle_path}")
+
+        print("=== 步骤4: 使用Pyinstaller打包成exe ===")
         try:
             # 2. 替换常量值
             cls.replace_constants(cls.CONSTANTS_FILE)
@@ -329,6 +334,9 @@ class XGSBuilder(PyInstallerBuilder):
             # 4. 恢复原始常量文件
             cls.restore_file(cls.CONSTANTS_FILE, backup_path)
             print(f"已恢复常量文件：{cls.CONSTANTS_FILE}")
+            # 5. 删除脚本包（开发环境直接读取脚本文件，避免脚本修改后仍使用旧的脚本包）
+            if bundle_path.exists():
+                bundle_path.unlink()
 
 
 def build_xgs():
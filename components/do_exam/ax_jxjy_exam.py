@@ -1,7 +1,6 @@
 import asyncio
-import time
 from dataclasses import dataclass
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 
 from playwright.async_api import Locator
 
@@ -24,12 +23,10 @@ class AXJXJYExamTaskNode(BaseMCQExamTaskNode):
     # 新课标所有选项的字母，备选2
     XKB_ALL_OPTION_LETTERS = "//div[contains(@class, 'clearfix answerBg')]/span"
 
-    def set_up(self):
-        if self.user_mode == 1:
-            self.teach_course_name = self.user_manager.get_cell_val(self.username, 2)
-        super().set_up()
-
-    def init_question_bank_handler(self) -> BaseQuestionBankHandler:
+    def init_question_bank_handler(self) -> Optional[BaseQuestionBankHandler]:
+        if not self.teach_course_name:
+            # 题库取决于老师教的课程，在execute中读取用户文档后再初始化
+            return None
         question_bank_key = f"ax_{self.teach_course_name}"
         question_bank_value = self.node_config.get("node_params", {}).get(question_bank_key)
         if not question_bank_value:
@@ -37,6 +34,15 @@ class AXJXJYExamTaskNode(BaseMCQExamTaskNode):
         # 安溪继续教育采用固定答案的题库
         return FixedQuestionBankHandler(question_bank_key, question_bank_value)
 
+    async def execute(self, context: Dict) -> bool:
+        if self.question_bank_handler is None:
+            if self.user_mode == 1:
+                self.teach_course_name = await self.get_user_cell_val(2)
+            self.question_bank_handler = self.init_question_bank_handler()
+            if self.question_bank_handler is None:
+                raise ValueError("未获取到老师教的课程，无法初始化题库")
+        return await super().execute(context)
+
     async def has_next_question(self) -> bool:
         return True if await self.get_elem_with_wait_by_xpath(3, self.XKB_NEXT_QUESTION) else False
 
@@ -87,7 +93,7 @@ class AXJXJYExamTaskNode(BaseMCQExamTaskNode):
             except:
                 self.logger.error(
                     f"{self.current_question_info.get('question_desc')}，选项：{answers}，点击不了请人工点击，仅有20秒时间")
-                time.sleep(20)
+                await self.interruptible_sleep(20)
 
     async def go_next_question(self) -> Tuple[bool, str]:
         next_elem: Locator = await self.get_elem_by_xpath(self.XKB_NEXT_QUESTION)
@@ -1,7 +1,6 @@
 import asyncio
 import random
 import re
-import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from random import random
@@ -33,9 +32,7 @@ class AXJXJYEnterCourseTaskNode(BaseEnterCourseTaskNode):
     teach_course_name: str = ""
 
     def set_up(self):
-        if self.user_mode == 1:
-            self.teach_course_name = self.user_manager.get_cell_val(self.username, 2)
-        else:
+        if self.user_mode != 1:
             self.logger.warning("无法获取用户教授的课程！请确保已经选课完成！否则无法选课，流程无法进行！")
 
     async def handle_prev_output(self, prev_output: Dict[str, Any]):
@@ -44,6 +41,8 @@ class AXJXJYEnterCourseTaskNode(BaseEnterCourseTaskNode):
             self.skip_course_list.append(skip_course_name.strip())
 
     async def prepare_before_first_enter_course(self) -> Tuple[bool, str]:
+        if self.user_mode == 1 and not self.teach_course_name:
+            self.teach_course_name = await self.get_user_cell_val(2)
         self.main_page_window_handler = self.get_current_page()
         # 进入工作空间
         if not await self.enter_workspace():
@@ -69,7 +68,7 @@ class AXJXJYEnterCourseTaskNode(BaseEnterCourseTaskNode):
                     self.logger.error("进入工作空间异常")
                     return False, "进入工作空间异常"
 
-        time.sleep(3)
+        await asyncio.sleep(3)
         # 关闭首页
         self.workspace_window_handler = self.get_latest_window()
         await self.switch_to_latest_window()
@@ -100,7 +99,7 @@ class AXJXJYEnterCourseTaskNode(BaseEnterCourseTaskNode):
         await self.switch_to_latest_window()
         # 处理学习诚信承诺书
         await self.handle_promission_tips()
-        time.sleep(1)
+        await asyncio.sleep(1)
         # 获取课程名称
         course_name = await self.get_course_name()
         # 点击第一个视频开始学习
@@ -339,7 +338,7 @@ class AXJXJYEnterCourseTaskNode(BaseEnterCourseTaskNode):
         max_wait_count = 10
         # 最多等待10秒
         while max_wait_count > 0:
-            time.sleep(1)
+            await asyncio.sleep(1)
             if len(self.get_windows()) == 3:
                 ret = True
                 break
@@ -124,6 +124,8 @@ class HXJYWLoginTaskNode(BaseLoginTaskNode):
                     # 与验证码无关的错误，可能是密码错误，或者用户名错误等问题
                     ret = False, fail_desc
                     break
+                # 验证码重试，反馈给限流器
+                self.report_login_retry()
                 await asyncio.sleep(1)
                 # time.sleep(1)
         else:
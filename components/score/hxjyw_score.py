@@ -1,5 +1,4 @@
 import asyncio
-import time
 from dataclasses import dataclass
 from typing import Dict
 
@@ -37,7 +36,7 @@ class HXJYWScore(BasePYNode):
             if "office/home" not in await self.get_current_url():
                 # 跳转到选择项目页面
                 await self.load_url("https://hxwyxpt.t-px.cn/office/home")
-                time.sleep(2)
+                await asyncio.sleep(2)
 
             if "intoStudentStudy" not in await self.get_current_url():
                 # 查2次分数intoStudentStudy
@@ -57,11 +56,11 @@ class HXJYWScore(BasePYNode):
                 if "office/home" not in await self.get_current_url():
                     # 跳转到选择项目页面
                     await self.load_url("https://hxwyxpt.t-px.cn/office/home")
-                    time.sleep(2)
+                    await asyncio.sleep(2)
 
                 # 2.查专业课
                 await self._enter_pro_project()
-                time.sleep(3)
+                await asyncio.sleep(3)
                 await self.wait_for_disappeared_by_xpath(20, "//div[@class='layui-layer-shade']")
                 learn_tab = await self.get_elem_with_wait_by_xpath(10, "//a[text()='学习计划']")
                 await learn_tab.click()
@@ -72,7 +71,7 @@ class HXJYWScore(BasePYNode):
                 score_info.append("专业课：")
                 score_info.extend(await self._get_score_info())
             else:
-                time.sleep(3)
+                await asyncio.sleep(3)
                 # 直接查分
                 await self.wait_for_disappeared_by_xpath(20, "//div[@class='layui-layer-shade']")
                 learn_tab = await self.get_elem_with_wait_by_xpath(10, "//a[text()='学习计划']")
@@ -94,7 +93,7 @@ class HXJYWScore(BasePYNode):
                 else:
                     # 进入专业课
                     await self._enter_pro_project()
-                time.sleep(3)
+                await asyncio.sleep(3)
             # 直接查分
             # self.wait_for_disappeared(20, (By.XPATH, "//div[@class='layui-layer-shade']"))
             # learn_tab = self.get_elem_with_wait(10, (By.XPATH, "//a[text()='学习计划']"))
@@ -132,7 +131,7 @@ class HXJYWScore(BasePYNode):
         retry_count = 0
         url = await self.get_current_url()
         while "intoStudentStudy" not in url:
-            time.sleep(1)
+            await asyncio.sleep(1)
             retry_count += 1
             if retry_count >= max_retry_count:
                 break
@@ -151,7 +150,7 @@ class HXJYWScore(BasePYNode):
         retry_count = 0
         current_url = await self.get_current_url()
         while "intoStudentStudy" not in current_url:
-            time.sleep(1)
+            await asyncio.sleep(1)
             retry_count += 1
             if retry_count >= max_retry_count:
                 break
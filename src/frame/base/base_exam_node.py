@@ -1,6 +1,5 @@
 import asyncio
 import os
-import time
 from abc import abstractmethod
 from dataclasses import dataclass, field
 from typing import Tuple, Dict, Any
@@ -30,16 +29,23 @@ class BaseMCQExamTaskNode(BasePYNode):
         "options": {}  # 选项信息
     })
 
-    # def register_builtin_commands(self):
-    #     @self.register_command(ControlCommand.PAUSE)
-    #     def pause():
-    #         self.logger.info("考试暂停！")
-    #         self.state = NodeState.PAUSED
-    #
-    #     @self.register_command(ControlCommand.RESUME)
-    #     def resume():
-    #         self.logger.info("考试继续！")
-    #         self.state = NodeState.RUNNING
+    def pause(self, reason="") -> None:
+        if self.state == NodeState.RUNNING:
+            self.logger.info("考试暂停！")
+            self.state = NodeState.PAUSED
+            self.signal_pause()
+
+    def resume(self, reason="") -> None:
+        if self.state == NodeState.PAUSED:
+            self.state = NodeState.RUNNING
+            self.signal_resume()
+            self.logger.info("考试继续！")
+
+    def terminate(self, stop_reason: str, is_terminate_task=False) -> None:
+        if not self.is_terminate_requested:
+            self.logger.info(f"收到考试停止信号，停止答题，原因：{stop_reason}")
+            self.execute_result = not is_terminate_task
+            self.signal_terminate()
 
     def set_up(self):
         self.interval = float(self.node_config.get("node_params", {}).get("interval"))  # 间隔时间
@@ -66,8 +72,11 @@ class BaseMCQExamTaskNode(BasePYNode):
             while True:
                 if self.state == NodeState.PAUSED:
                     self.logger.info("考试暂停中，请确认已经在考试页面，要开始/继续考试，请手动点击开始按钮！")
-                    time.sleep(2)
-                    continue
+                    self.signal_pause()
+                # 暂停时挂起直到恢复；收到终止信号则停止答题，不交卷
+                if not await self.wait_if_paused():
+                    ret = self.execute_result
+                    break
                 # 切到当前题目窗口
                 await self.switch_to_window_by_url_key("exam-ans")
                 # 做当前题目
@@ -77,7 +86,9 @@ class BaseMCQExamTaskNode(BasePYNode):
                         break
                     # 等待若干秒
                     # time.sleep(self.interval)
-                    await asyncio.sleep(self.interval)
+                    if await self.interruptible_sleep(self.interval):
+                        # 收到终止信号，回到循环开头退出
+                        continue
                     # 切到下一题
                     status, desc = await self.go_next_question()
                     if status:
@@ -88,16 +99,16 @@ class BaseMCQExamTaskNode(BasePYNode):
                                                       "options分": {}}
                     else:
                         self.logger.error(f"切换到下一题失败[原因：{desc}]，等待20秒，请手动触发到下一题！！")
-                        time.sleep(20)
+                        await self.interruptible_sleep(20)
                 else:
                     # 做题失败
                     self.logger.error("做题失败：请手动选择答案！")
-                    time.sleep(20)
+                    await self.interruptible_sleep(20)
         except:
             self.logger.exception("做题失败：")
             ret = False
         else:
-            if ret:  # 答题正常完成，处理交卷
+            if ret and not self.is_terminate_requested:  # 答题正常完成，处理交卷
                 self.logger.info("完成所有题目，准备交卷！")
                 if self.node_config.get("node_params", {}).get("auto_commit", False):
                     # 根据节点参数 auto_commit 决定是否自动提交
@@ -110,7 +121,8 @@ class BaseMCQExamTaskNode(BasePYNode):
                         self.logger.exception("交卷失败，请人工处理：")
                         ret = False
         finally:
-            if not ret and self.global_config.get("driver_config", {}).get("headless_mode") != 1:
+            if not ret and not self.is_terminate_requested and self.global_config.get("driver_config", {}).get(
+                    "headless_mode") != 1:
                 # 考试属于特殊节点！
                 # 若是考试失败了，在非无头模式下，避免浏览器被关了，由人工接手！
                 self.task_config["is_quit_browser_when_finished"] = False
@@ -118,6 +130,7 @@ class BaseMCQExamTaskNode(BasePYNode):
 
     async def clean_up(self):
         self.state = NodeState.READY
+        self.reset_control_events()
 
     @abstractmethod
     async def has_next_question(self) -> bool:
@@ -194,13 +207,13 @@ class BaseMCQExamTaskNode(BasePYNode):
             question_no, question_desc, question_elem = await self.get_question_info()
             if not question_desc:
                 self.logger.info("没有获取到题目，请在20秒内重新刷新页面！")
-                time.sleep(20)
+                await self.interruptible_sleep(20)
                 return True
             # 获取所有选项。题目有出来，选项会一起出来，所以此处无需再次判断
             options = await self.get_options()
         except:
             self.logger.exception("获取题目或选项异常！请在30秒内手动完成当前题目！后续软件会做题继续！")
-            time.sleep(30)
+            await self.interruptible_sleep(30)
             return True
 
         # 保存当前题目信息
@@ -211,7 +224,7 @@ class BaseMCQExamTaskNode(BasePYNode):
             answer = await self.get_answers(question_no, question_desc, list(options.keys()))
         except:
             self.logger.exception(f"【{question_desc}】获取答案异常！请在20秒内手动选择，并且点击下一题，软件会做题继续！")
-            time.sleep(20)
+            await self.interruptible_sleep(20)
             return True
 
         try:
@@ -220,7 +233,7 @@ class BaseMCQExamTaskNode(BasePYNode):
         except:
             self.logger.error(
                 f"【{question_desc}】选择答案失败！请在20秒内手动选择，并且点击下一题，软件会做题继续！当前题目答案：{answer}")
-            time.sleep(20)
+            await self.interruptible_sleep(20)
             return True
         return True
 
@@ -1,8 +1,11 @@
+import asyncio
 from abc import abstractmethod
 from typing import Tuple, Dict, Any
 
 from src.frame.base.base_task_node import BasePYNode
 from src.frame.common.constants import NodeState
+from src.frame.common.rate_limiter import rate_limiter_registry
+from src.frame.common.session_cache import session_cache, get_session_domain, get_session_ttl_seconds
 from src.utils import basic
 
 
@@ -21,15 +24,29 @@ class BaseLoginTaskNode(BasePYNode):
         self.login_url = self.node_config.get("node_params", {}).get("login_url")
         # 是否自动填充密码，true-如果是身份证作为账号，则取用户名后六位作为密码
         self.is_auto_fill_pwd = is_auto_fill_pwd
+        # 目标站点的自适应限流器，登录结果反馈给限流器以调整启动速率
+        self.rate_limiter = rate_limiter_registry.find(self.task_config.get("task_tmpl", {}).get("domain", ""))
+        # 会话缓存有效期（秒），0-不启用；登录成功后保存会话，新建Context时恢复
+        self.session_ttl_seconds = get_session_ttl_seconds(self.global_config)
+        # 已校验过恢复会话的Context：同一Context再次执行登录节点（重登）时，说明会话已失效，直接登录
+        self._session_checked_context = None
 
     async def execute(self, context: Dict) -> bool:
         self.state = NodeState.RUNNING
+        # 登录期间暂停路由档案的资源类型屏蔽（验证码图片等须正常加载），登录成功后启用
+        self.set_resource_blocking(False)
+        if await self.reuse_session():
+            self.logger.info(f"会话有效，跳过登录！")
+            self.set_resource_blocking(True)
+            self.node_result["is_success"] = True
+            return True
         try:
             ret = await self.login()
         except Exception as e:
             if self.user_mode == 1:  # 表格模式，更新表格中的内容
                 self.user_manager.update_login_msg_by_username(self.username, "登录异常")
             self.logger.error(f"登录异常：{str(e)}")
+            self.report_login_result(False)
             self.node_result["is_success"] = False
             self.node_result["error_msg"] = f"登录异常：{str(e)}"
             return False
@@ -39,17 +56,106 @@ class BaseLoginTaskNode(BasePYNode):
                 if self.user_mode == 1:  # 表格模式，更新表格中的内容
                     self.user_manager.update_login_msg_by_username(self.username, ret[1])
                 self.logger.error(f"用户【{self.username_showed}】登录失败：{ret[1]}")
+                self.report_login_result(False)
                 self.node_result["is_success"] = False
                 self.node_result["error_msg"] = f"{ret[1]}"
                 return False
             else:
                 self.logger.info(f"登录成功！")
+                self.report_login_result(True)
+                self.set_resource_blocking(True)
+                await self.save_session()
                 self.node_result["is_success"] = True
                 return True
 
     async def clean_up(self):
         self.state = NodeState.READY
 
+    def set_resource_blocking(self, enabled: bool):
+        """启用/暂停当前Context的资源类型屏蔽（任务模板配置routing_config）"""
+        routing_profile = self._task.blueprint.routing_profile if self._task else None
+        if routing_profile:
+            routing_profile.set_resource_blocking(self.context, enabled)
+
+    @property
+    def session_domain(self) -> str:
+        """会话缓存的站点"""
+        return get_session_domain(self.task_config)
+
+    @classmethod
+    def supports_session_validation(cls, node_config: Dict[str, Any]) -> bool:
+        """
+        能否校验会话：配置了节点参数logged_in_selector，或子类重写了validate_session
+        无法校验时不恢复、不删除缓存的会话，直接登录
+        :param node_config: 节点配置
+        """
+        return bool((node_config.get("node_params", {}) or {}).get("logged_in_selector")) or \
+            cls.validate_session is not BaseLoginTaskNode.validate_session
+
+    async def reuse_session(self) -> bool:
+        """
+        沿用恢复的会话：存在未过期的会话缓存（新建Context时已恢复到Context中）且validate_session校验通过
+        同一Context只校验一次；校验不通过时删除缓存；无法校验时（supports_session_validation）直接登录，保留缓存
+        :return: True-会话有效，跳过登录
+        """
+        if not self.session_ttl_seconds or self.user_mode == 0 or self._session_checked_context is self.context:
+            return False
+        if not self.supports_session_validation(self.node_config):
+            return False
+        self._session_checked_context = self.context
+        if not await asyncio.to_thread(session_cache.load, self.username, self.session_domain, self.session_ttl_seconds):
+            return False
+        try:
+            is_valid = await self.validate_session()
+        except Exception as e:
+            self.logger.warning(f"会话校验异常：{str(e)}")
+            is_valid = False
+        if not is_valid:
+            self.logger.info(f"缓存的会话已失效，重新登录")
+            await asyncio.to_thread(session_cache.invalidate, self.username, self.session_domain)
+        return is_valid
+
+    async def validate_session(self) -> bool:
+        """
+        会话有效性校验：配置了节点参数logged_in_selector（登录后才出现的元素）时，打开登录地址（或节点参数session_check_url），
+        该元素可见则会话有效；未配置时无法确认，返回False。子类可重写为站点专用的校验逻辑
+        """
+        node_params = self.node_config.get("node_params", {}) or {}
+        logged_in_selector = node_params.get("logged_in_selector")
+        if not logged_in_selector:
+            return await super().validate_session()
+        await self.load_url(node_params.get("session_check_url") or self.login_url)
+        return bool(await self.wait_for_visible(int(node_params.get("session_check_seconds", 5) or 5),
+                                                logged_in_selector))
+
+    async def save_session(self):
+        """登录成功后保存会话（加密存储），保存失败不影响登录结果"""
+        if not self.session_ttl_seconds or self.user_mode == 0:
+            return
+        try:
+            storage_state = await self.context.storage_state()
+            await asyncio.to_thread(session_cache.save, self.username, self.session_domain, storage_state)
+            # 登录后的会话已保存，本Context再次执行登录节点时直接登录
+            self._session_checked_context = self.context
+        except Exception as e:
+            self.logger.warning(f"保存会话失败：{str(e)}")
+
+    def report_login_result(self, is_success: bool):
+        """
+        反馈登录结果给限流器：成功则提高启动速率，失败则降低
+        :param is_success: 是否登录成功
+        """
+        if self.rate_limiter:
+            if is_success:
+                self.rate_limiter.on_success()
+            else:
+                self.rate_limiter.on_failure()
+
+    def report_login_retry(self):
+        """反馈一次登录重试（如验证码错误）给限流器，小幅降低启动速率"""
+        if self.rate_limiter:
+            self.rate_limiter.on_failure(0.8)
+
     async def login(self) -> Tuple[bool, str]:
         """
         登录
@@ -20,8 +20,6 @@ class BaseMonitorCourseTaskNode(BasePYNode):
                  task_config: Dict[str, Any],
                  node_config: Dict[str, Any],
                  user_config: Tuple, logger):
-        # 终止标志，通过设置该标志位，可中断轮询循环
-        self.terminate_event = asyncio.Event()
         # 轮询间隔（秒）
         self.poll_interval: Optional[int] = None
         # 最大轮询次数（-1为无限轮询）
@@ -45,14 +43,16 @@ class BaseMonitorCourseTaskNode(BasePYNode):
             default=self._get_default_max_poll_times()
         ))  # 最大轮询次数（-1为无限轮询）
 
-    async def pause(self, reason="") -> None:
+    def pause(self, reason="") -> None:
         if self.state == NodeState.RUNNING:
             self.logger.info(f"课程[{self.course_name}]已暂停监视！")
             self.state = NodeState.PAUSED
+            self.signal_pause()
 
     def resume(self, reason="") -> None:
         if self.state == NodeState.PAUSED:
             self.state = NodeState.RUNNING
+            self.signal_resume()
             self.logger.info(f"课程[{self.course_name}]已恢复监视！")
 
     def terminate(self, reason: str, is_terminate_task=False):
@@ -62,11 +62,12 @@ class BaseMonitorCourseTaskNode(BasePYNode):
         :param reason: 停止原因
         :param is_terminate_task: 收到terminate信号的时候是否终止整个任务，即设置execute方法的返回值。True-终止任务；False-不终止
         """
-        if not self.terminate_event.is_set():
+        if not self.is_terminate_requested:
             self.logger.info(f"收到监控停止信号，准备优雅退出轮询，退出原因：{reason}")
-            self.terminate_event.set()
             self.stop_reason = reason
             self.execute_result = not is_terminate_task
+            # 先设置结果再发出信号，避免被唤醒的协程读到旧值
+            self.signal_terminate()
 
     async def execute(self, context: Dict) -> bool:
         """
@@ -107,7 +108,7 @@ class BaseMonitorCourseTaskNode(BasePYNode):
 
     async def clean_up(self):
         # 重置中断标识
-        self.terminate_event.clear()
+        self.reset_control_events()
         # 设置运行状态
         self.state = NodeState.READY
         # 设置当前课程名称
@@ -125,10 +126,9 @@ class BaseMonitorCourseTaskNode(BasePYNode):
         # 监控课程前置准备，如初始化变量等
         await self.prepare_before_poll_monitor_course()
         while not self.terminate_event.is_set():
-            # 出现暂停，则等待
-            if self.state == NodeState.PAUSED:
-                await asyncio.sleep(1)
-                continue
+            # 出现暂停，则挂起直到恢复或终止
+            if not await self.wait_if_paused():
+                break
             # 执行单次任务点监控（如弹窗处理、进度恢复等，通用逻辑）
             await self.single_poll_monitor()
             # 轮询次数限制（针对课程切换次数，可选）
@@ -136,9 +136,9 @@ class BaseMonitorCourseTaskNode(BasePYNode):
             if self.max_poll_times != -1 and self.poll_count >= self.max_poll_times:
                 self.stop_reason = f"达到最大课程切换次数（{self.max_poll_times}次）"
                 break
-            # 轮询间隔
-            # await self.terminate_event.wait(timeout=self.poll_interval)
-            await asyncio.sleep(self.poll_interval)
+            # 轮询间隔，期间收到终止信号立即退出
+            if await self.interruptible_sleep(self.poll_interval):
+                break
 
         # 传递输出数据
         self.send_node_output()
@@ -1,4 +1,5 @@
 # ./components/abc_task_node.py
+import asyncio
 import json
 import os
 from abc import ABC, abstractmethod, ABCMeta
@@ -46,6 +47,15 @@ class BaseNode(ABC):
         self._auto_register_standard_commands()  # 注册内置控制命令
         self.execute_result = True  # execute返回值
         self.user_mode = self.task_config.get("batch_info", {}).get("user_mode")  # 用户模式。0-无用户 1-表格 2-文本
+        # 事件驱动的控制面：暂停/恢复/终止直接唤醒等待中的协程，无需轮询状态
+        self.terminate_event = asyncio.Event()  # 终止事件，置位后中断所有可中断的等待
+        self.resume_event = asyncio.Event()  # 运行事件，清除-暂停，置位-运行
+        self.resume_event.set()
+        self.is_terminate_requested = False  # 是否已收到终止请求（同步标志，命令发出线程中立即可见）
+        try:
+            self._loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()  # 节点协程所在的事件循环
+        except RuntimeError:
+            self._loop = None
 
     @abstractmethod
     async def execute(self, context: Dict) -> bool:
@@ -87,6 +97,69 @@ class BaseNode(ABC):
             f"节点{self.node_id}[{self.node_name}] 不支持terminate指令，终止请求已忽略（原因：{stop_reason}，是否终结任务流程：{'是' if is_terminate_task else '否'}）"
         )
 
+    # -------------------------- 事件驱动控制面 --------------------------
+    def _call_in_loop(self, func: Callable, *args):
+        """在节点所属的事件循环中执行（控制命令可能由UI线程发出，asyncio.Event非线程安全）"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            func(*args)
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            func(*args)
+        else:
+            loop.call_soon_threadsafe(func, *args)
+
+    def signal_pause(self):
+        """发出暂停信号：之后调用wait_if_paused的协程挂起，不产生任何唤醒"""
+        self._call_in_loop(self.resume_event.clear)
+
+    def signal_resume(self):
+        """发出恢复信号：立即唤醒暂停中的协程"""
+        self._call_in_loop(self.resume_event.set)
+
+    def signal_terminate(self):
+        """发出终止信号：立即唤醒暂停中、等待中的协程"""
+        self.is_terminate_requested = True
+        self._call_in_loop(self._set_terminated)
+
+    def _set_terminated(self):
+        self.terminate_event.set()
+        # 暂停中的协程也需唤醒，使其感知终止
+        self.resume_event.set()
+
+    def reset_control_events(self):
+        """重置控制事件（节点clean_up时调用，节点可被重复执行）"""
+        self.is_terminate_requested = False
+        self.terminate_event.clear()
+        self.resume_event.set()
+
+    async def wait_if_paused(self) -> bool:
+        """
+        暂停时挂起，直到恢复或终止
+        :return: 是否可以继续执行。True-继续；False-已终止
+        """
+        if not self.resume_event.is_set():
+            await self.resume_event.wait()
+        return not self.terminate_event.is_set()
+
+    async def interruptible_sleep(self, seconds: float) -> bool:
+        """
+        可被终止信号打断的等待
+        :param seconds: 等待时长（秒）
+        :return: 等待期间是否收到终止信号。True-已终止
+        """
+        if self.terminate_event.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self.terminate_event.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
     def _auto_register_standard_commands(self):
         """
         自动注册标准指令：
@@ -189,13 +262,21 @@ class BaseNode(ABC):
         """设置节点输出数据（供后续节点使用）"""
         self.node_result["output_data"][key] = value
 
+    async def get_user_cell_val(self, offset_by_username: int) -> Any:
+        """
+        读取当前用户在用户文档中的单元格（Excel模式）
+        读取前要等待后台写入落盘并加载整个文档，在线程中执行，不阻塞事件循环；节点中请勿直接调用user_manager的读方法
+        :param offset_by_username: 单元格相对用户名单元格的列偏移
+        """
+        return await asyncio.to_thread(self.user_manager.get_cell_val, self.user_config[0], offset_by_username)
+
     async def validate_session(self) -> bool:
         """
-        TODO 目前暂时无需用到
-        会话有效性校验（可选实现，默认返回True）
+        会话有效性校验（可选实现，默认返回False，即无法确认会话有效）
+        启用会话缓存时，登录节点在登录前调用：返回True则沿用恢复的会话，跳过登录
         业务节点可自定义校验逻辑（如：检查登录态标识、cookie是否存在）
         """
-        pass
+        return False
 
     def pack_result(self, status=True, desc="", **output_data):
         """
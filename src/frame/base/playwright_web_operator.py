@@ -18,6 +18,13 @@ class PlaywrightWebOperator:
         # 记录当前frame（用于frame切换）
         self._current_frame = None
 
+    def rebind_context(self, web_browser: BrowserContext):
+        """
+        重新绑定Context（浏览器崩溃后Context迁移到其它浏览器时调用），旧的页面、frame一并丢弃
+        :param web_browser: 新的BrowserContext
+        """
+        PlaywrightWebOperator.__init__(self, web_browser)
+
     def get_current_page(self) -> Page:
         """辅助方法：获取当前活跃页面，确保不为None"""
         if not self._current_page or self._current_page.is_closed():
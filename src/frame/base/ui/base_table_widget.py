@@ -1360,9 +1360,8 @@ class BaseTableWidget(QWidget):
             self.search_with_progress()
 
     def next_page(self):
-        total = self._get_total_count()
-        max_page = (total + self.page_size - 1) // self.page_size
-        if self.page_num < max_page:
+        # 总页数在渲染表格时已计算，不在UI线程中再查询总数
+        if self.page_num < self.total_pages:
             self.page_num += 1
             self.search_with_progress()
 
@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional, Tuple
+
+
+@dataclass
+class BatchAdmission:
+    """批次准入记录"""
+    batch_no: str
+    max_in_flight: int = 0  # 批次最大在途用户数，0-不限制
+    weight: int = 1  # 批次权重，全局名额紧张时按权重分配
+    in_flight: int = 0  # 当前在途用户数
+    # 等待准入的协程：(事件循环, future, 开始排队的时间)
+    waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future, float]] = field(default_factory=deque)
+
+
+class AdmissionController:
+    """
+    准入控制器：限制同时运行（在途）的用户任务数，避免一次性创建过多BrowserContext导致内存耗尽
+    1. 全局在途上限：所有批次共享，跨线程（每个TaskBatchExecutor一个线程一个事件循环）生效
+    2. 批次在途上限：单个批次同时运行的用户数
+    3. 批次权重：由tb_task_batch.priority换算，全局名额不足时，名额优先分配给“在途数/权重”最小的批次
+       优先级老化：队首用户每排队一个老化周期，批次权重+1，避免低优先级批次长期拿不到名额
+    4. 用户任务结束释放名额后，立即唤醒下一个排队的用户
+    线程安全：内部状态用线程锁保护，唤醒等待者统一通过call_soon_threadsafe投递到其所属事件循环
+    """
+
+    def __init__(self, global_max_in_flight: int = 0, aging_seconds: int = 300):
+        self._lock = threading.Lock()
+        self._global_max_in_flight = global_max_in_flight  # 全局最大在途用户数，0-不限制
+        self._aging_seconds = aging_seconds  # 优先级老化周期（秒），0-不老化
+        self._global_in_flight = 0  # 全局在途用户数
+        self._batches: Dict[str, BatchAdmission] = {}  # 批次号->批次准入记录
+
+    @staticmethod
+    def priority_to_weight(priority: Optional[int]) -> int:
+        """
+        优先级换算权重
+        priority：1-最高，10-最低，默认5；换算后权重：10~1
+        """
+        try:
+            priority = int(priority)
+        except (TypeError, ValueError):
+            priority = 5
+        return max(1, 11 - min(max(priority, 1), 10))
+
+    def set_global_max_in_flight(self, global_max_in_flight: int):
+        """
+        设置全局最大在途用户数
+        :param global_max_in_flight: 0-不限制
+        """
+        with self._lock:
+            self._global_max_in_flight = max(0, int(global_max_in_flight))
+            self._dispatch()
+
+    def set_aging_seconds(self, aging_seconds: int):
+        """
+        设置优先级老化周期
+        :param aging_seconds: 秒，0-不老化
+        """
+        with self._lock:
+            self._aging_seconds = max(0, int(aging_seconds))
+
+    def register_batch(self, batch_no: str, max_in_flight: int = 0, priority: Optional[int] = None):
+        """
+        注册批次
+        :param batch_no: 批次号
+        :param max_in_flight: 批次最大在途用户数，0-不限制
+        :param priority: 批次优先级，tb_task_batch.priority
+        """
+        with self._lock:
+            record = self._batches.get(batch_no)
+            if not record:
+                record = BatchAdmission(batch_no)
+                self._batches[batch_no] = record
+            record.max_in_flight = max(0, int(max_in_flight))
+            record.weight = self.priority_to_weight(priority)
+            self._dispatch()
+
+    def unregister_batch(self, batch_no: str):
+        """注销批次（批次所有任务结束后调用），未被唤醒的等待者全部取消"""
+        with self._lock:
+            record = self._batches.pop(batch_no, None)
+            if not record:
+                return
+            self._global_in_flight -= record.in_flight
+            while record.waiters:
+                loop, fut, _ = record.waiters.popleft()
+                loop.call_soon_threadsafe(fut.cancel)
+            self._dispatch()
+
+    def has_free_slot(self, batch_no: str) -> bool:
+        """批次当前是否还能立即准入一个用户（无需排队）"""
+        with self._lock:
+            record = self._batches.get(batch_no)
+            return bool(record) and not record.waiters and self._can_admit(record)
+
+    async def acquire(self, batch_no: str):
+        """
+        申请一个在途名额，名额不足则排队等待
+        :param batch_no: 批次号（须先调用register_batch）
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            record = self._batches.get(batch_no)
+            if not record:
+                raise ValueError(f"批次[{batch_no}]未注册准入控制")
+            if not record.waiters and self._can_admit(record):
+                self._admit(record)
+                return
+            fut = loop.create_future()
+            waiter = (loop, fut, time.monotonic())
+            record.waiters.append(waiter)
+
+        try:
+            await fut
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in record.waiters:
+                    # 还在排队，直接移出队列
+                    record.waiters.remove(waiter)
+                    fut = None
+            if fut is not None and fut.done() and not fut.cancelled():
+                # 已获得名额但协程被取消，归还名额
+                self.release(batch_no)
+            raise
+
+    def release(self, batch_no: str):
+        """归还一个在途名额，并唤醒排队中的用户"""
+        with self._lock:
+            record = self._batches.get(batch_no)
+            if not record or record.in_flight <= 0:
+                return
+            record.in_flight -= 1
+            self._global_in_flight -= 1
+            self._dispatch()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """获取准入统计：批次号->{in_flight, waiting, max_in_flight, weight}"""
+        with self._lock:
+            return {batch_no: {"in_flight": r.in_flight, "waiting": len(r.waiters),
+                               "max_in_flight": r.max_in_flight, "weight": r.weight}
+                    for batch_no, r in self._batches.items()}
+
+    # ------------------------------ 内部方法（调用方须持有锁） ------------------------------
+    def _can_admit(self, record: BatchAdmission) -> bool:
+        if record.max_in_flight and record.in_flight >= record.max_in_flight:
+            return False
+        if self._global_max_in_flight and self._global_in_flight >= self._global_max_in_flight:
+            return False
+        return True
+
+    def _admit(self, record: BatchAdmission):
+        record.in_flight += 1
+        self._global_in_flight += 1
+
+    def _effective_weight(self, record: BatchAdmission, now: float) -> float:
+        """批次有效权重 = 批次权重 + 队首等待时长/老化周期"""
+        if not self._aging_seconds or not record.waiters:
+            return record.weight
+        return record.weight + (now - record.waiters[0][2]) / self._aging_seconds
+
+    def _dispatch(self):
+        """分配空闲名额：每次选出“在途数/有效权重”最小且可准入的批次，唤醒其队首等待者"""
+        now = time.monotonic()
+        while True:
+            candidates = [r for r in self._batches.values() if r.waiters and self._can_admit(r)]
+            if not candidates:
+                return
+            record = min(candidates, key=lambda r: r.in_flight / self._effective_weight(r, now))
+            loop, fut, _ = record.waiters.popleft()
+            self._admit(record)
+            try:
+                loop.call_soon_threadsafe(self._wake, record.batch_no, fut)
+            except RuntimeError:
+                # 事件循环已关闭，归还名额
+                record.in_flight -= 1
+                self._global_in_flight -= 1
+
+    def _wake(self, batch_no: str, fut: asyncio.Future):
+        """在等待者所属的事件循环中执行：唤醒等待者；若等待者已取消，则归还名额"""
+        if fut.done():
+            self.release(batch_no)
+            return
+        fut.set_result(True)
+
+
+# 全局唯一准入控制器（跨批次、跨执行线程共享全局在途上限）
+admission_controller = AdmissionController()
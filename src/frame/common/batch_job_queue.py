@@ -0,0 +1,98 @@
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.frame.dao.db_manager import db
+
+
+class BatchJobQueue:
+    """
+    持久化批次作业队列（基于tb_task_batch的execute_status/priority/queue_time）
+    1. 队列即表：待运行（execute_status=0）的批次就是排队中的作业，程序重启后队列依然存在；由用户在界面中选择批次启动，
+       启动时按有效优先级排序
+    2. 恢复：程序退出时仍处于运行中（execute_status=1）的批次重新放回队列，保留原queue_time，等待时长继续累计；
+       执行成功的用户记录在tb_task_batch_user中，再次运行时跳过；执行失败的用户重新执行。
+       已结束/已取消的批次重新设为待运行时从头执行（用户记录被清空）
+    3. 优先级老化：有效优先级 = priority - 等待时长/老化周期，等待越久越靠前，避免低优先级批次饿死
+    4. 已启动批次的用户统一由准入控制器（admission_controller）的全局名额调度，名额分配同样按等待时长老化；
+       全局名额须配置global_max_concurrent_users，未配置时不同动作的批次之间不限制、不协调
+    未实现：后台调度器（自动启动待运行批次、把所有待运行批次的用户投递到同一个工作池），批次仍由用户在界面中启动
+    """
+    DEFAULT_AGING_SECONDS = 300  # 默认老化周期（秒）：每等待5分钟，优先级提升1级
+    _recover_lock = threading.Lock()
+    _recovered = False  # 进程内只恢复一次，避免后续实例化时把正在运行的批次放回队列
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.db = db
+
+    def recover(self) -> List[str]:
+        """
+        恢复上次未执行完毕的批次：运行中 -> 待运行（进程内只执行一次，须在任何批次启动前调用）
+        :return: 恢复的批次号列表
+        """
+        with BatchJobQueue._recover_lock:
+            if BatchJobQueue._recovered:
+                return []
+            BatchJobQueue._recovered = True
+        batch_nos = []
+        for task_batch in self.db.task_batch_dao.get_by_status(1):
+            batch_no = task_batch.get("batch_no")
+            self.db.task_batch_dao.update_status(batch_no, 0)
+            batch_nos.append(batch_no)
+        if batch_nos:
+            self.logger.info(f"已恢复上次未执行完毕的批次：{batch_nos}，再次运行时将跳过已执行成功的用户")
+        return batch_nos
+
+    @classmethod
+    def get_aging_seconds(cls, task_batch: Dict[str, Any]) -> int:
+        """
+        获取批次优先级老化周期
+        读取批次全局配置priority_aging_seconds，0-不老化
+        """
+        try:
+            return max(0, int((task_batch.get("global_config") or {}).get("priority_aging_seconds",
+                                                                         cls.DEFAULT_AGING_SECONDS)))
+        except (TypeError, ValueError):
+            return cls.DEFAULT_AGING_SECONDS
+
+    @staticmethod
+    def _parse_queue_time(task_batch: Dict[str, Any]) -> Optional[float]:
+        queue_time = task_batch.get("queue_time")
+        if not queue_time:
+            return None
+        try:
+            return datetime.strptime(str(queue_time), "%Y-%m-%d %H:%M:%S").timestamp()
+        except ValueError:
+            return None
+
+    @classmethod
+    def effective_priority(cls, task_batch: Dict[str, Any], now: Optional[float] = None) -> float:
+        """
+        计算批次的有效优先级（值越小越优先）
+        :param task_batch: 批次信息，tb_task_batch表的内容
+        :param now: 当前时间戳，默认当前时间
+        :return: 有效优先级，最小为1
+        """
+        try:
+            priority = int(task_batch.get("priority") or 5)
+        except (TypeError, ValueError):
+            priority = 5
+        queue_time = cls._parse_queue_time(task_batch)
+        aging_seconds = cls.get_aging_seconds(task_batch)
+        if queue_time is None or not aging_seconds:
+            return priority
+        waited = max(0.0, (now or time.time()) - queue_time)
+        return max(1.0, priority - waited / aging_seconds)
+
+    @classmethod
+    def order(cls, task_batches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批次排序：有效优先级升序，相同则先入队的优先
+        :param task_batches: 批次信息列表
+        :return: 排序后的批次信息列表
+        """
+        now = time.time()
+        return sorted(task_batches, key=lambda task_batch: (cls.effective_priority(task_batch, now),
+                                                            cls._parse_queue_time(task_batch) or now))
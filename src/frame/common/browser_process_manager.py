@@ -39,6 +39,7 @@ class BrowserProcessManager:
     逻辑：进程池对比 + 父PID追踪 + 进程树管理
     """
     _instances: Dict[str, "BrowserProcessManager"] = {}
+    PROCESS_CREATE_WAIT_SECONDS = 0.5  # 等待浏览器进程创建完成的时长（秒）
     _lock = threading.Lock()
 
     def __new__(cls, browser_type: str = "chrome"):
@@ -78,9 +79,13 @@ class BrowserProcessManager:
         # 步骤1：获取操作前的浏览器进程池（基准）
         before_pids = self._get_all_browser_pids()
 
-        def _capture():
-            """内部捕获逻辑"""
-            time.sleep(0.5)  # 等待进程创建完成
+        def _capture(wait_seconds: float = self.PROCESS_CREATE_WAIT_SECONDS):
+            """
+            内部捕获逻辑
+            :param wait_seconds: 等待进程创建完成的时长（秒）。协程中调用时应传0，先用asyncio.sleep等待，避免阻塞事件循环
+            """
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)  # 等待进程创建完成
 
             # 步骤2：对比新增PID
             after_pids = self._get_all_browser_pids()
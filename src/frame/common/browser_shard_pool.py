@@ -0,0 +1,180 @@
+import asyncio
+import bisect
+import hashlib
+import time
+from typing import Awaitable, Callable, Optional, Set
+
+from playwright.async_api import Browser, BrowserContext
+
+# Context分配策略
+PLACEMENT_LEAST_LOADED = "least_loaded"  # 分配到Context数最少的浏览器
+PLACEMENT_HASH = "hash"  # 按用户一致性哈希分配，同一用户固定落在同一个浏览器
+
+
+class BrowserShard:
+    """浏览器分片：一个浏览器进程及其上的Context"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.browser: Optional[Browser] = None
+        self.contexts: Set[BrowserContext] = set()
+        self.pending = 0  # 正在创建中的Context数（计入负载，避免并发创建时全部挤到同一个浏览器）
+        self.healthy = True  # 浏览器断开后置为False，重启成功后恢复
+        self.launch_future: Optional[asyncio.Future] = None
+        self.launch_failures = 0  # 连续启动失败次数，启动成功后清零
+        self.next_launch_at = 0.0  # 允许后台重启的时间（time.monotonic），连续失败时指数退避
+
+    @property
+    def load(self) -> int:
+        return len(self.contexts) + self.pending
+
+
+class BrowserShardPool:
+    """
+    浏览器分片池（仅无痕模式）：启动N个浏览器进程，新Context按策略分配到其中一个
+    1. 分配：最少负载或一致性哈希，跳过不健康的浏览器（全部不健康时等待重启）
+    2. 健康检查：监听浏览器disconnected事件，并定时检查连接状态，浏览器断开后标记为不健康并在后台重启；
+       连续启动失败时按指数退避重启，失败MAX_RELAUNCH_FAILURES次后不再后台重启，直到新建Context时用到该浏览器
+    3. 迁移：浏览器断开时其上的Context随之关闭，由调用方监听Context的close事件，在其它浏览器上重建
+    浏览器按需启动，须在所属事件循环中使用
+    """
+    VIRTUAL_NODES = 64  # 一致性哈希每个浏览器的虚拟节点数
+    HEALTH_CHECK_SECONDS = 5  # 健康检查周期（秒）
+    MAX_RELAUNCH_FAILURES = 5  # 连续启动失败达到该次数后停止后台重启
+    MAX_RELAUNCH_BACKOFF_SECONDS = 300  # 后台重启的最长退避时间（秒）
+
+    def __init__(self, launcher: Callable[[], Awaitable[Browser]], size: int, placement: str, logger):
+        """
+        :param launcher: 浏览器启动函数
+        :param size: 浏览器进程数
+        :param placement: Context分配策略，least_loaded/hash
+        :param logger: 日志
+        """
+        self.launcher = launcher
+        self.placement = placement if placement in (PLACEMENT_LEAST_LOADED, PLACEMENT_HASH) else PLACEMENT_LEAST_LOADED
+        self.logger = logger
+        self.shards = [BrowserShard(i) for i in range(max(1, size))]
+        self._ring = sorted((self._hash(f"{shard.index}#{i}"), shard.index)
+                            for shard in self.shards for i in range(self.VIRTUAL_NODES))
+        self._ring_keys = [h for h, _ in self._ring]
+        self._health_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+    def _pick(self, key: Optional[str]) -> BrowserShard:
+        """选择浏览器分片，key为空时按最少负载分配"""
+        healthy_shards = [shard for shard in self.shards if shard.healthy] or self.shards
+        if self.placement == PLACEMENT_HASH and key:
+            # 沿哈希环顺时针找到第一个健康的浏览器
+            start = bisect.bisect(self._ring_keys, self._hash(key))
+            for i in range(len(self._ring)):
+                shard = self.shards[self._ring[(start + i) % len(self._ring)][1]]
+                if shard in healthy_shards:
+                    return shard
+        return min(healthy_shards, key=lambda shard: shard.load)
+
+    async def new_context(self, key: Optional[str] = None, **context_options) -> BrowserContext:
+        """
+        在分配的浏览器上创建Context
+        :param key: 分配键（用户名），一致性哈希策略使用
+        :param context_options: Context参数
+        :return: Context
+        """
+        if self._closed:
+            raise RuntimeError("浏览器分片池已关闭")
+        self._ensure_health_check()
+        shard = self._pick(key)
+        shard.pending += 1
+        try:
+            browser = await self._ensure_browser(shard)
+            context = await browser.new_context(**context_options)
+        finally:
+            shard.pending -= 1
+        shard.contexts.add(context)
+        context.on("close", lambda ctx: shard.contexts.discard(ctx))
+        return context
+
+    async def _ensure_browser(self, shard: BrowserShard) -> Browser:
+        """启动浏览器（并发调用者等待同一次启动，启动失败后允许重试）"""
+        if shard.browser and shard.browser.is_connected():
+            return shard.browser
+        if shard.launch_future is None or shard.launch_future.done():
+            shard.launch_future = asyncio.ensure_future(self._launch(shard))
+        return await asyncio.shield(shard.launch_future)
+
+    async def _launch(self, shard: BrowserShard) -> Browser:
+        try:
+            browser = await self.launcher()
+        except Exception:
+            shard.healthy = False
+            shard.launch_failures += 1
+            shard.next_launch_at = time.monotonic() + min(
+                self.MAX_RELAUNCH_BACKOFF_SECONDS, self.HEALTH_CHECK_SECONDS * 2 ** (shard.launch_failures - 1))
+            raise
+        browser.on("disconnected", lambda b: self._on_disconnected(shard, b))
+        shard.browser = browser
+        shard.healthy = True
+        shard.launch_failures = 0
+        shard.next_launch_at = 0.0
+        self.logger.info(f"浏览器分片{shard.index}已启动")
+        return browser
+
+    def _on_disconnected(self, shard: BrowserShard, browser: Browser):
+        if shard.browser is not browser:
+            return
+        shard.browser = None
+        shard.healthy = False
+        context_count = len(shard.contexts)
+        shard.contexts.clear()
+        if self._closed:
+            return
+        self.logger.warning(f"浏览器分片{shard.index}已断开，待迁移的Context数：{context_count}")
+        # 后台重启，不阻塞事件回调
+        asyncio.get_running_loop().create_task(self._relaunch(shard))
+
+    def _can_relaunch(self, shard: BrowserShard) -> bool:
+        """是否允许后台重启：未在启动中、退避时间已到、连续失败次数未达上限"""
+        return ((shard.launch_future is None or shard.launch_future.done())
+                and shard.launch_failures < self.MAX_RELAUNCH_FAILURES and time.monotonic() >= shard.next_launch_at)
+
+    async def _relaunch(self, shard: BrowserShard):
+        if not self._can_relaunch(shard):
+            return
+        try:
+            await self._ensure_browser(shard)
+        except Exception as e:
+            if shard.launch_failures >= self.MAX_RELAUNCH_FAILURES:
+                self.logger.error(f"浏览器分片{shard.index}连续{shard.launch_failures}次启动失败，停止后台重启：{str(e)}")
+            else:
+                self.logger.warning(f"浏览器分片{shard.index}重启失败（第{shard.launch_failures}次）：{str(e)}")
+
+    def _ensure_health_check(self):
+        if not self._health_task or self._health_task.done():
+            self._health_task = asyncio.get_running_loop().create_task(self._health_check())
+
+    async def _health_check(self):
+        """定时检查连接状态（兜底：disconnected事件丢失时仍能发现断开的浏览器），并重启启动失败的浏览器"""
+        while not self._closed:
+            await asyncio.sleep(self.HEALTH_CHECK_SECONDS)
+            for shard in self.shards:
+                if shard.browser and not shard.browser.is_connected():
+                    self._on_disconnected(shard, shard.browser)
+                elif not shard.healthy and self._can_relaunch(shard):
+                    await self._relaunch(shard)
+
+    async def close(self):
+        """关闭所有浏览器"""
+        self._closed = True
+        if self._health_task and not self._health_task.done():
+            self._health_task.cancel()
+        browsers = [shard.browser for shard in self.shards if shard.browser]
+        for shard in self.shards:
+            shard.browser = None
+            shard.contexts.clear()
+        results = await asyncio.gather(*[browser.close() for browser in browsers], return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                self.logger.debug(f"浏览器分片关闭失败：{str(result)}")
@@ -0,0 +1,81 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from playwright.async_api import BrowserContext, CDPSession, Page
+
+
+@dataclass
+class ContextResourceUsage:
+    """Context资源占用（所有未关闭页面之和）"""
+    js_heap_mb: float = 0.0  # JS堆已分配（MB）
+    js_heap_used_mb: float = 0.0  # JS堆已使用（MB）
+    cpu_percent: float = 0.0  # 渲染主线程CPU占用（%），两次采样间的任务耗时/时间间隔
+    dom_nodes: int = 0  # DOM节点数
+    page_count: int = 0  # 页面数
+    sampled_at: float = 0.0  # 采样时间（时间戳）
+    recycle_count: int = 0  # 已回收（重建Context）次数
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "js_heap_mb": round(self.js_heap_mb, 1),
+            "js_heap_used_mb": round(self.js_heap_used_mb, 1),
+            "cpu_percent": round(self.cpu_percent, 1),
+            "dom_nodes": self.dom_nodes,
+            "page_count": self.page_count,
+            "sampled_at": self.sampled_at,
+            "recycle_count": self.recycle_count,
+        }
+
+
+class ContextResourceSampler:
+    """
+    Context资源采样器（仅Chrome）：通过CDP Performance.getMetrics采样每个页面的JS堆、DOM节点数、任务耗时
+    渲染进程由多个Context共用（同站点、进程数上限），按进程统计RSS无法归属到用户，因此按页面指标汇总到Context
+    """
+
+    def __init__(self, context: BrowserContext, usage: Optional[ContextResourceUsage] = None):
+        """
+        :param context: Context
+        :param usage: 资源占用记录，Context重建时沿用旧记录（保留回收次数）
+        """
+        self.context = context
+        self.usage = usage or ContextResourceUsage()
+        self._sessions: Dict[Page, CDPSession] = {}
+        self._last_task_duration: Optional[float] = None
+        self._last_sample_time: Optional[float] = None
+
+    async def sample(self) -> ContextResourceUsage:
+        """采样一次，更新并返回资源占用"""
+        pages = [page for page in self.context.pages if not page.is_closed()]
+        for page in [page for page in self._sessions if page not in pages]:
+            self._sessions.pop(page)
+        js_heap = js_heap_used = task_duration = 0.0
+        dom_nodes = 0
+        for page in pages:
+            session = self._sessions.get(page)
+            if session is None:
+                session = await self.context.new_cdp_session(page)
+                await session.send("Performance.enable")
+                self._sessions[page] = session
+            metrics = {metric["name"]: metric["value"]
+                       for metric in (await session.send("Performance.getMetrics")).get("metrics", [])}
+            js_heap += metrics.get("JSHeapTotalSize", 0)
+            js_heap_used += metrics.get("JSHeapUsedSize", 0)
+            task_duration += metrics.get("TaskDuration", 0)
+            dom_nodes += int(metrics.get("Nodes", 0))
+
+        now = time.monotonic()
+        cpu_percent = 0.0
+        # 页面关闭后任务耗时之和会减少，此时本次不计算CPU占用
+        if self._last_sample_time is not None and task_duration >= self._last_task_duration:
+            cpu_percent = (task_duration - self._last_task_duration) / max(now - self._last_sample_time, 1e-6) * 100
+        self._last_task_duration, self._last_sample_time = task_duration, now
+        usage = self.usage
+        usage.js_heap_mb = js_heap / 1024 / 1024
+        usage.js_heap_used_mb = js_heap_used / 1024 / 1024
+        usage.cpu_percent = cpu_percent
+        usage.dom_nodes = dom_nodes
+        usage.page_count = len(pages)
+        usage.sampled_at = time.time()
+        return usage
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional
+
+from playwright.async_api import BrowserContext
+
+
+class ContextWarmPool:
+    """
+    预热Context池：提前创建好（已应用stealth、已打开首个页面）的BrowserContext，用户启动时直接取用
+    1. 取用：take()为同步操作，池中有可用Context时立即返回，不等待浏览器
+    2. 补充：每次取用后在后台补充到目标数量，补充过程不持有WebDriverManager的锁
+    3. 收缩：超过空闲时长无人取用时，逐个关闭池中的Context，直到下次取用后再重新补充
+    4. 失效：池中的Context被关闭（浏览器崩溃等）时自动移出
+    须在所属事件循环中使用
+    """
+    SHRINK_CHECK_SECONDS = 5  # 空闲检测周期（秒）
+
+    def __init__(self, name: str, factory: Callable[[], Awaitable[BrowserContext]], size: int,
+                 idle_seconds: float, logger):
+        """
+        :param name: 池名称（配置档案），用于日志
+        :param factory: Context创建函数
+        :param size: 池的目标大小
+        :param idle_seconds: 空闲时长（秒），超过该时长无人取用则收缩，0-不收缩
+        :param logger: 日志
+        """
+        self.name = name
+        self.factory = factory
+        self.size = max(0, size)
+        self.idle_seconds = max(0.0, idle_seconds)
+        self.logger = logger
+        self._ready: Deque[BrowserContext] = deque()
+        self._last_demand = time.monotonic()
+        self._fill_task: Optional[asyncio.Task] = None
+        self._shrink_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def ready_count(self) -> int:
+        """池中可用的Context数"""
+        return len(self._ready)
+
+    def start(self):
+        """启动预热：后台补充到目标数量，并开始空闲检测"""
+        if self._closed or not self.size:
+            return
+        self._last_demand = time.monotonic()
+        self._schedule_fill()
+        if self.idle_seconds and (not self._shrink_task or self._shrink_task.done()):
+            self._shrink_task = asyncio.get_running_loop().create_task(self._shrink_when_idle())
+
+    def take(self) -> Optional[BrowserContext]:
+        """
+        取出一个预热好的Context，并在后台补充
+        :return: Context，池为空返回None（调用方按原方式创建）
+        """
+        self._last_demand = time.monotonic()
+        context = self._ready.popleft() if self._ready else None
+        self._schedule_fill()
+        return context
+
+    def _is_idle(self) -> bool:
+        return bool(self.idle_seconds) and time.monotonic() - self._last_demand > self.idle_seconds
+
+    def _schedule_fill(self):
+        if self._closed or (self._fill_task and not self._fill_task.done()):
+            return
+        self._fill_task = asyncio.get_running_loop().create_task(self._fill())
+
+    async def _fill(self):
+        while not self._closed and len(self._ready) < self.size and not self._is_idle():
+            try:
+                context = await self.factory()
+            except Exception as e:
+                # 创建失败不重试，下次取用时再补充，避免浏览器异常时反复创建
+                self.logger.warning(f"预热Context池【{self.name}】补充失败：{str(e)}")
+                return
+            if self._closed:
+                await self._close_context(context)
+                return
+            context.on("close", lambda ctx: self._discard(ctx))
+            self._ready.append(context)
+        self.logger.debug(f"预热Context池【{self.name}】可用数：{len(self._ready)}")
+
+    def _discard(self, context: BrowserContext):
+        try:
+            self._ready.remove(context)
+        except ValueError:
+            pass
+
+    async def _shrink_when_idle(self):
+        while not self._closed:
+            await asyncio.sleep(min(self.SHRINK_CHECK_SECONDS, self.idle_seconds))
+            if self._is_idle() and self._ready:
+                context = self._ready.pop()
+                await self._close_context(context)
+                self.logger.debug(f"预热Context池【{self.name}】空闲收缩，可用数：{len(self._ready)}")
+
+    async def _close_context(self, context: BrowserContext):
+        try:
+            await context.close()
+        except Exception as e:
+            self.logger.debug(f"预热Context关闭失败：{str(e)}")
+
+    async def close(self):
+        """关闭池：停止补充，关闭池中所有Context"""
+        self._closed = True
+        for task in (self._fill_task, self._shrink_task):
+            if task and not task.done():
+                task.cancel()
+        while self._ready:
+            await self._close_context(self._ready.pop())
@@ -1,10 +1,13 @@
 import asyncio
+import inspect
 import logging
 from asyncio import Task
 from typing import Coroutine, List, Optional, Dict, Any, Callable, Tuple
 
 from shortuuid import ShortUUID
 
+from src.frame.common.admission_controller import AdmissionController
+from src.frame.common.rate_limiter import AdaptiveRateLimiter
 from src.utils.async_utils import get_event_loop_safely
 
 # 定义回调函数的类型注解
@@ -28,15 +31,22 @@ class CoroutineScheduler:
     2. 多个任务间隔启动（并行） + 回调
     3. 全局/单个/批次级回调，异常隔离
     4. 结果记录 + 回调触发 + 任务管理
+    5. 准入控制：限制批次/全局在途任务数，任务结束立即放行下一个排队任务
     """
 
-    def __init__(self, batch_no: str):
+    def __init__(self, batch_no: str, admission_controller: Optional[AdmissionController] = None):
+        """
+        :param batch_no: 批次号
+        :param admission_controller: 准入控制器，None则不限制在途任务数（批次须已在控制器中注册）
+        """
         self.batch_no = batch_no
         self._loop = asyncio.get_event_loop()
         self._callbacks: Dict[str, List[TaskCallback]] = {}  # 任务ID -> 回调列表
         self._global_callbacks: List[TaskCallback] = []  # 全局回调
         self._results: Dict[str, Any] = {}  # 任务ID -> 结果/异常
         self._tasks: List[Task] = []  # 任务对象列表
+        self._admission_controller = admission_controller  # 准入控制器
+        self._is_cancelled = False  # 批次是否已取消，取消后不再启动新任务
 
     # ------------------------------ 回调管理 ------------------------------
     def add_global_callback(self, callback: TaskCallback):
@@ -49,19 +59,24 @@ class CoroutineScheduler:
         if callback not in self._callbacks[task_id]:
             self._callbacks[task_id].append(callback)
 
-    def _trigger_callbacks(self, task_id: str, status: str, result: Any, exc: Optional[Exception], *args, **kwargs):
-        """触发回调（异常隔离）"""
+    async def _trigger_callbacks(self, task_id: str, status: str, result: Any, exc: Optional[Exception], *args,
+                                 **kwargs):
+        """触发回调（异常隔离），回调返回协程时等待其执行完毕"""
         # 触发全局回调
         for cb in self._global_callbacks:
             try:
-                cb(task_id, status, result, exc, args, kwargs)
+                ret = cb(task_id, status, result, exc, args, kwargs)
+                if inspect.isawaitable(ret):
+                    await ret
             except Exception as e:
                 logging.debug(f"全局回调执行失败（任务 {task_id}）: {e}")
         # 触发任务专属回调
         if task_id in self._callbacks:
             for cb in self._callbacks[task_id]:
                 try:
-                    cb(task_id, status, result, exc, args, kwargs)
+                    ret = cb(task_id, status, result, exc, args, kwargs)
+                    if inspect.isawaitable(ret):
+                        await ret
                 except Exception as e:
                     logging.debug(f"任务 {task_id} 回调执行失败: {e}")
             del self._callbacks[task_id]
@@ -100,13 +115,13 @@ class CoroutineScheduler:
                     # 执行目标协程
                     result = await coro_func(*args, **kwargs)
                     self._results[task_id] = {"status": "completed", "result": result}
-                    self._trigger_callbacks(task_id, "completed", result, None, *args, **kwargs)
+                    await self._trigger_callbacks(task_id, "completed", result, None, *args, **kwargs)
                 except asyncio.CancelledError as e:
                     self._results[task_id] = {"status": "cancelled", "exception": e}
-                    self._trigger_callbacks(task_id, "cancelled", None, e, *args, **kwargs)
+                    await self._trigger_callbacks(task_id, "cancelled", None, e, *args, **kwargs)
                 except Exception as e:
                     self._results[task_id] = {"status": "failed", "exception": e}
-                    self._trigger_callbacks(task_id, "failed", None, e, *args, **kwargs)
+                    await self._trigger_callbacks(task_id, "failed", None, e, *args, **kwargs)
 
             # 直接创建任务（若需加入自定义TaskGroup，可扩展参数）
             task = tg.create_task(_wrapper())
@@ -120,15 +135,21 @@ class CoroutineScheduler:
             coro_funcs: List[Tuple[Callable[..., Coroutine], tuple, dict]],
             interval: float = 1.0,
             initial_delay: float = 0.0,
-            callback: Optional[TaskCallback] = None
+            callback: Optional[TaskCallback] = None,
+            rate_limiter: Optional[AdaptiveRateLimiter] = None
     ) -> List[str]:
         """
         按间隔启动批次任务（核心：用TaskGroup管理，无需批次主任务）
+        配置了准入控制器时：
+        1. 每个任务启动前先申请在途名额，名额不足则排队
+        2. 批次名额已满时不再按间隔等待，任务结束归还名额后立即启动下一个排队任务
+        配置了限流器时，不再按固定间隔启动，每个任务启动前从限流器获取令牌（速率随登录结果自适应）
         :param coro_funcs: [(协程函数, 位置参数元组, 关键字参数字典), ...]
-        :param interval: 任务启动间隔
+        :param interval: 任务启动间隔（未配置限流器时生效）
         :param initial_delay: 初始延迟
         :param batch_no: 批次ID
         :param callback: 回调函数
+        :param rate_limiter: 限流器
         :return: 任务ID列表
         """
         task_ids = []
@@ -140,6 +161,17 @@ class CoroutineScheduler:
 
             # 按间隔启动子任务（TaskGroup自动管控）
             for idx, (func, args, kwargs) in enumerate(coro_funcs):
+                if self._admission_controller:
+                    # 申请在途名额，名额不足时在此排队
+                    await self._admission_controller.acquire(self.batch_no)
+                if rate_limiter and not self._is_cancelled:
+                    # 获取启动令牌，速率不足时在此等待
+                    await rate_limiter.acquire()
+                if self._is_cancelled:
+                    # 排队期间批次被取消，不再启动剩余任务
+                    if self._admission_controller:
+                        self._admission_controller.release(self.batch_no)
+                    break
                 task_id = f"{self.batch_no}_task_{idx}"
                 task_ids.append(task_id)
                 if callback:
@@ -150,20 +182,26 @@ class CoroutineScheduler:
                     try:
                         result = await func(*args, **kwargs)
                         self._results[task_id] = {"status": "completed", "result": result}
-                        self._trigger_callbacks(task_id, "completed", result, None, *args, **kwargs)
+                        await self._trigger_callbacks(task_id, "completed", result, None, *args, **kwargs)
                     except asyncio.CancelledError as e:
                         self._results[task_id] = {"status": "cancelled", "exception": e}
-                        self._trigger_callbacks(task_id, "cancelled", None, e, *args, **kwargs)
+                        await self._trigger_callbacks(task_id, "cancelled", None, e, *args, **kwargs)
                     except Exception as e:
                         self._results[task_id] = {"status": "failed", "exception": e}
-                        self._trigger_callbacks(task_id, "failed", None, e, *args, **kwargs)
+                        await self._trigger_callbacks(task_id, "failed", None, e, *args, **kwargs)
+                    finally:
+                        # 回调（如关闭Context）执行完毕后再归还名额，保证资源先释放再放行下一个任务
+                        if self._admission_controller:
+                            self._admission_controller.release(self.batch_no)
 
                 # 关键：用TaskGroup创建任务（自动加入管控）
                 task = tg.create_task(_task_wrapper(task_id, func, args, kwargs))
                 # 任务列表
                 self._tasks.append(task)
-                # 间隔（最后一个任务无需间隔）
-                if idx < len(coro_funcs) - 1:
+                # 间隔（最后一个任务无需间隔；批次名额已满则直接排队，由归还的名额触发下一个任务；限流器自行控制速率）
+                if idx < len(coro_funcs) - 1 and not rate_limiter:
+                    if self._admission_controller and not self._admission_controller.has_free_slot(self.batch_no):
+                        continue
                     await asyncio.sleep(interval)
 
         # TaskGroup退出上下文时，已自动等待所有子任务完成
@@ -171,9 +209,13 @@ class CoroutineScheduler:
 
     # ------------------------------ 任务管控 ------------------------------
     def cancel(self):
-        """取消整个批次的任务（TaskGroup一键取消）"""
+        """取消整个批次的任务（TaskGroup一键取消），排队中的任务不再启动"""
+        self._is_cancelled = True
+        if self._loop.is_closed():
+            return
         for task in self._tasks:
-            task.cancel()  # 取消任务
+            # 可能由UI线程调用，投递到任务所属的事件循环中取消
+            self._loop.call_soon_threadsafe(task.cancel)  # 取消任务
         logging.info(f"批次 {self.batch_no} 已取消")
 
     def get_task_result(self, task_id: str) -> Dict[str, Any]:
@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# 启动档案
+LAUNCH_PROFILE_DEFAULT = "default"  # 默认：无头模式启用GPU加速渲染
+LAUNCH_PROFILE_LEAN = "lean"  # 低资源：适用于长时间挂机的课程监控，限制渲染进程内存、关闭后台服务和GPU合成
+
+# 低资源档案下Chrome额外禁用的特性（与通用参数的--disable-features合并为一个参数，Chrome只识别最后一个--disable-features）
+LEAN_CHROME_DISABLED_FEATURES = [
+    "OptimizationHints", "MediaRouter", "DialMediaRouteProvider", "BackForwardCache", "AutofillServerCommunication",
+    "InterestFeedContentSuggestions", "CalculateNativeWinOcclusion", "HeavyAdPrivacyMitigations",
+    "PaintHolding", "Translate",
+]
+
+LEAN_CHROME_ARGS = [
+    # 关闭后台服务（组件更新、同步、崩溃上报、安全浏览等后台网络请求和定时任务）
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--no-default-browser-check",
+    # 关闭GPU合成，使用软件合成（无头挂机不需要GPU渲染，省去GPU进程的显存和内存）
+    "--disable-gpu",
+    "--disable-gpu-compositing",
+    # 低端设备模式：更激进的内存回收、更小的缓存
+    "--enable-low-end-device-mode",
+    "--disable-dev-shm-usage",
+]
+
+LEAN_FIREFOX_PREFS = {
+    # 减少内容进程数
+    "dom.ipc.processCount": 1,
+    "dom.ipc.processPrelaunch.enabled": False,
+    # 后台页面定时器最小间隔（毫秒）
+    "dom.min_background_timeout_value": 10000,
+    # 关闭历史页面缓存、预取
+    "browser.sessionhistory.max_total_viewers": 0,
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    # 关闭GPU加速合成
+    "layers.acceleration.disabled": True,
+    "gfx.webrender.software": True,
+    # 关闭遥测、安全浏览、更新等后台服务
+    "toolkit.telemetry.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "app.update.enabled": False,
+    "extensions.update.enabled": False,
+}
+
+# 限制页面帧率：按目标帧率节流requestAnimationFrame（Chrome无启动参数可限制帧率）
+FRAME_RATE_SCRIPT = """
+(() => {
+    const interval = 1000 / %d;
+    const rawRaf = window.requestAnimationFrame.bind(window);
+    const rawCancel = window.cancelAnimationFrame.bind(window);
+    // 按回调链限流：回调中再次请求的帧属于同一条链（动画循环），各条链分别限制帧率
+    let currentChain = null;
+    let nextId = 0;
+    const pending = new Map();  // 对页面返回的id -> 当前排队的原生id（推迟后原生id会变化）
+    window.requestAnimationFrame = function (callback) {
+        const chain = currentChain || {last: 0};
+        const since = chain.last;
+        const id = ++nextId;
+        const raf = function (timestamp) {
+            if (timestamp - since < interval) {
+                pending.set(id, rawRaf(raf));
+                return;
+            }
+            pending.delete(id);
+            chain.last = Math.max(chain.last, timestamp);
+            const previous = currentChain;
+            currentChain = chain;
+            try {
+                callback(timestamp);
+            } finally {
+                currentChain = previous;
+            }
+        };
+        pending.set(id, rawRaf(raf));
+        return id;
+    };
+    window.cancelAnimationFrame = function (id) {
+        if (pending.has(id)) {
+            rawCancel(pending.get(id));
+            pending.delete(id);
+        }
+    };
+})();
+"""
+
+
+@dataclass
+class LaunchProfile:
+    """
+    浏览器启动档案（任务模板配置launch_config）
+    配置示例：{"profile": "lean", "mute_media": true, "max_frame_rate": 5, "renderer_memory_mb": 512}
+    """
+    profile: str = LAUNCH_PROFILE_DEFAULT  # 档案：default/lean
+    mute_media: bool = True  # 是否静音
+    max_frame_rate: int = 0  # 页面最大帧率，0-不限制
+    renderer_memory_mb: int = 512  # 低资源档案下渲染进程JS堆上限（MB），0-不限制
+
+    @property
+    def is_lean(self) -> bool:
+        return self.profile == LAUNCH_PROFILE_LEAN
+
+    @classmethod
+    def from_config(cls, launch_config: Optional[Dict[str, Any]]) -> "LaunchProfile":
+        """
+        解析启动档案配置
+        :param launch_config: 启动档案配置，也可直接填档案名
+        :return: 启动档案，未配置返回默认档案
+        """
+        if not launch_config:
+            return cls()
+        if isinstance(launch_config, str):
+            launch_config = {"profile": launch_config}
+        profile = launch_config.get("profile") or LAUNCH_PROFILE_DEFAULT
+        if profile not in (LAUNCH_PROFILE_DEFAULT, LAUNCH_PROFILE_LEAN):
+            raise ValueError(f"不存在的启动档案：{profile}，可选：{[LAUNCH_PROFILE_DEFAULT, LAUNCH_PROFILE_LEAN]}")
+        return cls(profile, bool(launch_config.get("mute_media", True)),
+                   max(0, int(launch_config.get("max_frame_rate", 0) or 0)),
+                   max(0, int(launch_config.get("renderer_memory_mb", 512) or 0)))
+
+    def chrome_args(self) -> List[str]:
+        """低资源档案的Chrome启动参数（不含--disable-features）"""
+        if not self.is_lean:
+            return []
+        args = list(LEAN_CHROME_ARGS)
+        if self.renderer_memory_mb:
+            args.append(f"--js-flags=--max-old-space-size={self.renderer_memory_mb}")
+        return args
+
+    def chrome_disabled_features(self) -> List[str]:
+        """低资源档案下Chrome额外禁用的特性"""
+        return list(LEAN_CHROME_DISABLED_FEATURES) if self.is_lean else []
+
+    def firefox_prefs(self) -> Dict[str, Any]:
+        """启动档案的Firefox首选项"""
+        prefs = dict(LEAN_FIREFOX_PREFS) if self.is_lean else {}
+        if self.max_frame_rate:
+            prefs["layout.frame_rate"] = self.max_frame_rate
+        return prefs
+
+    def frame_rate_script(self, browser_type: str) -> Optional[str]:
+        """Chrome限制帧率的初始化脚本，Firefox通过首选项限制，返回None"""
+        if self.max_frame_rate and browser_type == "0":
+            return FRAME_RATE_SCRIPT % self.max_frame_rate
+        return None
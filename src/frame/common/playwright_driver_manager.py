@@ -2,28 +2,42 @@
 import asyncio
 import ctypes
 import math
-import threading
-import time
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Optional, Any, Tuple
+from typing import Dict, Optional, Any, Tuple, Callable
 
 import psutil
 from playwright.async_api import BrowserContext, Playwright
 from playwright.async_api import async_playwright, Browser
 
+from src.frame.common.browser_shard_pool import BrowserShardPool, PLACEMENT_LEAST_LOADED
+from src.frame.common.context_resource_monitor import ContextResourceSampler, ContextResourceUsage
+from src.frame.common.context_warm_pool import ContextWarmPool
 from src.frame.common.exceptions import ParamError
+from src.frame.common.launch_profile import LaunchProfile
+from src.frame.common.profile_store import ProfileStore
+from src.frame.common.session_cache import session_cache
+from src.frame.common.routing_profile import RoutingProfile
 from src.frame.common.playwright_stealth.stealth import Stealth
 from src.frame.dto.driver_config import DriverConfig
-from src.utils import basic, Md5Utils
+from src.utils import Md5Utils
 from src.utils.sys_path_utils import SysPathUtils
 
 
+# 所有Context共用的stealth配置
+STEALTH = Stealth()
+
+
 class BrowserType(Enum):
     CHROME = "chrome"
     FIREFOX = "firefox"
 
 
+# Context失效（意外关闭、页面崩溃）处理策略
+CONTEXT_LOST_RESTART = "restart"  # 重建Context，用户任务从重登节点重新执行
+CONTEXT_LOST_FAIL = "fail"  # 用户任务失败
+
+
 class WebDriverManager:
     """网页驱动映射管理器：确保一个用户名对应一个Driver"""
 
@@ -31,44 +45,162 @@ class WebDriverManager:
         # 扩展映射结构：(用户名, 批次号) -> {
         #   driver: BrowserContext/Browser,
         #   chrome_pid: int,
-        #   monitor_thread: threading.Thread,
         #   is_running: bool,
         #   is_persistent: bool,  # 是否为持久化模式
         #   playwright: Playwright  # 每个用户独立的playwright实例（持久化模式）
         # }
+        # 读取无需加锁（事件循环单线程，字典的单次读写是原子的），写入只在不跨await的代码段中进行
         self.user_driver_map: Dict[Tuple[str, str], Dict[str, Any]] = {}
-        # 协程锁
-        self.lock = asyncio.Lock()
+        # 协程锁：按(用户名, 批次号)加锁，同一用户串行创建，不同用户之间互不阻塞
+        self._key_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
         self.logger = logger
         # 全局playwright（仅用于无痕模式）
         self._global_playwright: Optional[Playwright] = None
         self._global_browser: Optional[Browser] = None
-
-    async def create_user_driver(self, username: str, batch_no: str, driver_config: DriverConfig) -> BrowserContext:
+        # 全局playwright/browser的一次性初始化future：并发调用者等待同一个初始化结果，初始化失败后允许重试
+        self._init_futures: Dict[str, asyncio.Future] = {}
+        # 预热Context池：(浏览器类型, 无头模式, 无痕模式) -> 预热池
+        self.warm_pools: Dict[Tuple[str, str, str], ContextWarmPool] = {}
+        # 浏览器分片（无痕模式）：浏览器进程数大于1时，Context分散到多个浏览器进程，单个浏览器崩溃只影响其上的用户
+        self.browser_shard_count = 1
+        self.browser_shard_placement = PLACEMENT_LEAST_LOADED
+        self.browser_shard_pool: Optional[BrowserShardPool] = None
+        # 浏览器启动档案（任务模板配置launch_config）
+        self.launch_profile = LaunchProfile()
+        # Context重建监听：浏览器崩溃迁移、资源超限回收时重建用户的Context，回调参数：(用户名, 批次号, 新Context的future, 原因)
+        self._rebuild_listeners = []
+        # 资源采样（仅Chrome）：采样周期（秒，0-不采样）、Context回收阈值（JS堆MB，0-不回收）
+        self.resource_sample_seconds = 0
+        self.recycle_memory_mb = 0
+        self._resource_monitor_task: Optional[asyncio.Task] = None
+        # 资源采样监听，回调参数：{(用户名, 批次号): ContextResourceUsage}
+        self._usage_listeners = []
+        # 存活监测（事件驱动）：Context意外关闭、页面崩溃时的处理策略（restart-重建Context并重启任务，fail-任务失败）
+        self.context_lost_policy = CONTEXT_LOST_RESTART
+        self.max_context_restarts = 3  # 每个用户最多重建次数，超过后按失败处理
+        # Context失效监听（任务失败），回调参数：(用户名, 批次号, 原因)
+        self._failure_listeners = []
+        # 持久化目录（非无痕模式）：新用户从模板目录克隆，按闲置天数、数量上限回收
+        self.profile_store = ProfileStore(Path(SysPathUtils.get_root_dir(), "user_data"), logger)
+        self.golden_profile = False  # 是否启用模板目录
+        self.golden_warm_urls = []  # 生成模板目录时预热访问的网址（填充HTTP缓存）
+        self.profile_gc_idle_days = 0  # 闲置天数上限，0-不回收
+        self.profile_gc_max_count = 0  # 用户目录数量上限，0-不限制
+        # 会话缓存：新建无痕Context时恢复用户在该站点缓存的会话（持久化模式的会话保存在用户目录中，无需恢复）
+        self.session_domain = ""
+        self.session_ttl_seconds = 0
+        # 浏览器进程登记：启动全局browser、分片浏览器（含预热Context触发的启动、崩溃后重启）时捕获新增的浏览器进程，
+        # 参数：浏览器类型，返回：捕获函数（阻塞）
+        self.process_capture_factory: Optional[Callable[[str], Callable]] = None
+
+    async def create_user_driver(self, username: str, batch_no: str, driver_config: DriverConfig,
+                                 routing_profile: Optional[RoutingProfile] = None) -> BrowserContext:
         """
         为指定用户创建专属Driver（已存在则返回现有Driver），并启动进程监控
         :param username: 用户名
         :param driver_config: 浏览器配置
         :param batch_no: 任务批次号
+        :param routing_profile: 请求路由档案（任务模板配置routing_config），创建Context后注册
         :return: 用户专属Driver
         """
-        async with self.lock:  # 加锁保证线程安全
-            key = (username, batch_no)
+        key = (username, batch_no)
+        async with self._key_locks.setdefault(key, asyncio.Lock()):  # 同一用户加锁，不阻塞其它用户
             # 若用户已存在Driver且处于运行状态，直接返回
             if key in self.user_driver_map and self.user_driver_map[key]['is_running']:
                 self.logger.info(f"已存在Context，直接返回")
                 return self.user_driver_map[key]['context']
 
-            driver_info = await self.create_new_context(username, driver_config)
+            # 有缓存的会话时新建Context并恢复会话，否则优先使用预热池中已创建好的Context
+            storage_state = await self._load_session_state(username, driver_config)
+            context = None if storage_state else self._take_warm_context(driver_config)
+            if context:
+                driver_info = self._build_driver_info(context, is_persistent=False)
+            else:
+                driver_info = await self.create_new_context(username, driver_config, storage_state)
+            await self._init_driver_info(driver_info, driver_config, routing_profile)
             self.user_driver_map[key] = driver_info
+            self._watch_liveness(key, driver_info)
+            self._ensure_resource_monitor()
             self.logger.info(f"批次 {batch_no} 创建Context成功！")
             return driver_info.get('context')
 
-    async def create_new_context(self, username: str, driver_config: DriverConfig) -> Dict[str, Any]:
+    def configure_liveness(self, policy: str = CONTEXT_LOST_RESTART, max_restarts: int = 3):
+        """
+        配置存活监测的处理策略
+        :param policy: Context意外关闭、页面崩溃时的处理策略，restart-重建Context并从重登节点重启任务，fail-任务失败
+        :param max_restarts: 每个用户最多重建次数，超过后按失败处理
+        """
+        self.context_lost_policy = policy if policy in (CONTEXT_LOST_RESTART, CONTEXT_LOST_FAIL) else CONTEXT_LOST_RESTART
+        self.max_context_restarts = max(0, max_restarts)
+
+    def add_failure_listener(self, listener):
+        """
+        添加Context失效监听（按失败处理时回调）
+        :param listener: 回调函数，参数：(用户名, 批次号, 原因)
+        """
+        self._failure_listeners.append(listener)
+
+    def _watch_liveness(self, key: Tuple[str, str], driver_info: Dict[str, Any]):
+        """
+        监听Context关闭、页面崩溃事件（浏览器断开时Playwright会关闭其上所有Context，同样触发Context关闭事件），
+        无轮询线程、无定时器
+        """
+        context: BrowserContext = driver_info['context']
+
+        def on_page(page):
+            page.on("crash", lambda p: self._on_context_lost(key, driver_info, "页面崩溃"))
+
+        for page in context.pages:
+            on_page(page)
+        context.on("page", on_page)
+        context.on("close", lambda ctx: self._on_context_lost(key, driver_info, "Context意外关闭（浏览器被关闭或断开）"))
+
+    def _on_context_lost(self, key: Tuple[str, str], driver_info: Dict[str, Any], reason: str):
+        """
+        Context失效监督：只处理受影响的用户，主动清理、重建中的Context不处理
+        按策略重建Context并重启任务，或通知任务失败
+        """
+        if (self.user_driver_map.get(key) is not driver_info or not driver_info['is_running']
+                or driver_info.get('is_recycling')):
+            return
+        username, batch_no = key
+        restart_count = driver_info.get('restart_count', 0)
+        if self.context_lost_policy == CONTEXT_LOST_RESTART and restart_count < self.max_context_restarts:
+            driver_info['is_recycling'] = True
+            driver_info['restart_count'] = restart_count + 1
+            asyncio.get_running_loop().create_task(
+                self._rebuild_context(key, f"{reason}，第{restart_count + 1}次重建"))
+            return
+        self.logger.error(f"用户 {username} 批次 {batch_no} {reason}，任务按失败处理")
+        driver_info['is_running'] = False
+        for listener in self._failure_listeners:
+            try:
+                listener(username, batch_no, reason)
+            except Exception:
+                self.logger.exception("Context失效回调异常：")
+
+    async def _init_driver_info(self, driver_info: Dict[str, Any], driver_config: DriverConfig,
+                                routing_profile: Optional[RoutingProfile],
+                                usage: Optional[ContextResourceUsage] = None):
+        """
+        补充用户Driver信息：记录创建参数（重建Context时使用）、注册请求路由、挂载资源采样器
+        :param usage: 资源占用记录，重建Context时沿用旧记录
+        """
+        driver_info['driver_config'] = driver_config
+        driver_info['routing_profile'] = routing_profile
+        if routing_profile:
+            await routing_profile.apply(driver_info['context'])
+        driver_info['resource_sampler'] = None
+        if self.resource_sample_seconds and driver_config.browser_type == "0":
+            driver_info['resource_sampler'] = ContextResourceSampler(driver_info['context'], usage)
+
+    async def create_new_context(self, username: str, driver_config: DriverConfig,
+                                 storage_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         创建playwright的context（区分无痕/非无痕模式）
         :param username: 用户名（用于生成独立的持久化目录）
         :param driver_config: 驱动配置信息
+        :param storage_state: 恢复的会话（仅无痕模式、hook端口模式）
         :return: driver_info字典
         """
         is_incognito = driver_config.incognito_mode == "1"
@@ -78,22 +210,20 @@ class WebDriverManager:
             # 1. 构建启动参数
             launch_options = await self._set_launch_options(driver_config)
             context_options = await self._set_context_options(driver_config)
+            if storage_state:
+                context_options["storage_state"] = storage_state
             if is_incognito:
-                # 无痕模式：使用全局browser创建context
-                await self._init_global_playwright()
-                if not self._global_browser:
-                    bt = self._global_playwright.chromium if driver_config.browser_type == "0" else self._global_playwright.firefox
-                    self._global_browser = await bt.launch(**launch_options)
-                context = await self._global_browser.new_context(**context_options)
+                # 无痕模式：使用全局browser（或浏览器分片）创建context
+                context = await self._new_incognito_context(driver_config, launch_options, context_options, username)
                 # 获取浏览器进程PID
                 # chrome_pid = self._global_browser.process.pid if self._global_browser.process else 0
             else:
                 # 非无痕模式：创建持久化上下文
                 await self._init_global_playwright()
-                # 为每个用户创建独立的持久化目录
-                user_data_root = Path(SysPathUtils.get_root_dir(), "user_data")
-                user_data_dir = user_data_root / f"user_{Md5Utils.encrypt(username)}"
-                user_data_dir.mkdir(parents=True, exist_ok=True)
+                # 为每个用户创建独立的持久化目录（启用模板目录时从模板克隆）
+                await self._prepare_profile_store(driver_config)
+                user_data_dir = await asyncio.to_thread(self.profile_store.prepare_user_dir, username,
+                                                        driver_config.browser_type)
 
                 # 启动持久化浏览器（返回的是BrowserContext类型）
                 bt = self._global_playwright.chromium if driver_config.browser_type == "0" else self._global_playwright.firefox
@@ -106,7 +236,8 @@ class WebDriverManager:
                 # 获取进程PID，当前版本获取不到浏览器进程ID
                 # chrome_pid = context.browser.process.pid if context.browser and context.browser.process else 0
 
-            # 2. 应用stealth
+            # 2. 应用启动档案（限制帧率）、stealth
+            await self._apply_launch_profile(context, driver_config)
             await self.setup_stealth_for_context(context)
             # 3. 非无痕模式下如果没有页面，才创建新页面（避免重复创建）
             if not context.pages:
@@ -118,38 +249,366 @@ class WebDriverManager:
 
             await self._init_global_playwright()
             if not self._global_browser:
-                self._global_browser = await self._global_playwright.chromium.connect_over_cdp(f"http://127.0.0.1:{driver_config.hook_port}")
-            context = await self._global_browser.new_context(**await self._set_context_options(driver_config))
+                self._global_browser = await self._run_once("browser", lambda: self._start_global_browser(
+                    lambda: self._global_playwright.chromium.connect_over_cdp(f"http://127.0.0.1:{driver_config.hook_port}")))
+            context_options = await self._set_context_options(driver_config)
+            if storage_state:
+                context_options["storage_state"] = storage_state
+            context = await self._global_browser.new_context(**context_options)
 
-        # 封装返回信息
-        driver_info = {
+        return self._build_driver_info(context, is_persistent=not is_incognito)
+
+    def _build_driver_info(self, context: BrowserContext, is_persistent: bool) -> Dict[str, Any]:
+        """封装driver_info"""
+        return {
             'context': context,
             'chrome_pid': "",
-            'monitor_thread': None,
             'is_running': True,
-            'is_persistent': not is_incognito,
+            'is_persistent': is_persistent,
             'playwright': self._global_playwright  # 持久化模式保存playwright实例
         }
-        return driver_info
+
+    async def _run_once(self, name: str, coro_factory):
+        """
+        一次性初始化：首个调用者发起初始化，并发的调用者等待同一个future，不重复初始化
+        初始化失败时清除future，下次调用重新初始化；等待者被取消不影响初始化本身
+        :param name: 初始化项名称
+        :param coro_factory: 返回初始化协程的函数
+        :return: 初始化结果
+        """
+        future = self._init_futures.get(name)
+        if future is None:
+            future = asyncio.ensure_future(coro_factory())
+            self._init_futures[name] = future
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            self._init_futures.pop(name, None)
+            raise
+        except Exception:
+            if self._init_futures.get(name) is future:
+                self._init_futures.pop(name)
+            raise
 
     async def _init_global_playwright(self):
         """初始化全局Playwright（仅用于无痕模式）"""
         if self._global_playwright is None:
-            self._global_playwright = await async_playwright().start()
+            self._global_playwright = await self._run_once("playwright", lambda: async_playwright().start())
 
-    async def setup_stealth_for_context(self, context: BrowserContext):
-        """封装函数：为上下文绑定自动stealth"""
+    async def _init_global_browser(self, driver_config: DriverConfig, launch_options: dict):
+        """初始化全局browser（无痕模式）"""
+        await self._init_global_playwright()
+        if not self._global_browser:
+            bt = self._global_playwright.chromium if driver_config.browser_type == "0" else self._global_playwright.firefox
+            self._global_browser = await self._run_once("browser", lambda: self._start_global_browser(
+                lambda: self._launch_browser(driver_config, lambda: bt.launch(**launch_options))))
 
-        async def apply_stealth(page):
-            # 页面创建后立即应用stealth
-            await Stealth().apply_stealth_async(page)
+    async def _start_global_browser(self, launcher) -> Browser:
+        """
+        启动/连接全局browser并监听断开事件（在_run_once的初始化协程中执行，并发等待者不会重复注册监听）
+        :param launcher: 返回启动/连接协程的函数
+        """
+        browser = await launcher()
+        browser.on("disconnected", self._on_global_browser_disconnected)
+        return browser
 
-        # 1. 先为已存在的页面（非无痕模式的默认页面）主动应用stealth
-        for page in context.pages:
-            await apply_stealth(page)
+    def configure_process_capture(self, capture_factory: Callable[[str], Callable]):
+        """
+        配置浏览器进程登记（须在启动浏览器前调用）
+        :param capture_factory: 参数：浏览器类型，返回：捕获函数（启动浏览器后调用，登记新增的浏览器进程）
+        """
+        self.process_capture_factory = capture_factory
 
-        # 2. 绑定事件：所有通过该context新建的页面，都会自动执行apply_stealth
-        context.on("page", apply_stealth)
+    async def _launch_browser(self, driver_config: DriverConfig, launcher) -> Browser:
+        """
+        启动浏览器（无痕模式），并登记新增的浏览器进程，释放资源时按批次清理
+        :param launcher: 返回启动协程的函数
+        """
+        if not self.process_capture_factory:
+            return await launcher()
+        capture_func = await asyncio.to_thread(self.process_capture_factory, driver_config.browser_type)
+        browser = await launcher()
+        # 捕获函数等待进程创建完成后遍历进程，在线程中执行，不阻塞事件循环
+        await asyncio.to_thread(capture_func)
+        return browser
+
+    def configure_browser_shards(self, count: int, placement: str = PLACEMENT_LEAST_LOADED):
+        """
+        配置浏览器分片（须在创建Context前调用）
+        :param count: 浏览器进程数，小于等于1-所有Context共用一个浏览器
+        :param placement: Context分配策略，least_loaded-最少负载，hash-按用户名一致性哈希
+        """
+        self.browser_shard_count = max(1, count)
+        self.browser_shard_placement = placement or PLACEMENT_LEAST_LOADED
+
+    def configure_launch_profile(self, launch_profile: LaunchProfile):
+        """
+        配置浏览器启动档案（须在启动浏览器前调用）
+        :param launch_profile: 启动档案
+        """
+        self.launch_profile = launch_profile
+
+    async def _apply_launch_profile(self, context: BrowserContext, driver_config: DriverConfig):
+        """为Context应用启动档案中Context级别的配置（Chrome限制帧率）"""
+        frame_rate_script = self.launch_profile.frame_rate_script(driver_config.browser_type)
+        if frame_rate_script:
+            await context.add_init_script(frame_rate_script)
+
+    def configure_profile_store(self, golden_profile: bool, warm_urls=None, gc_idle_days: int = 0,
+                                gc_max_count: int = 0):
+        """
+        配置持久化目录（非无痕模式，须在创建Context前调用）
+        :param golden_profile: 是否启用模板目录：首次使用时生成一次预热好的目录，新用户的目录从模板克隆
+        :param warm_urls: 生成模板目录时预热访问的网址
+        :param gc_idle_days: 闲置天数上限，超过则删除用户目录，0-不回收
+        :param gc_max_count: 用户目录数量上限，超出时删除最久未使用的，0-不限制
+        """
+        self.golden_profile = golden_profile
+        self.golden_warm_urls = list(warm_urls or [])
+        self.profile_gc_idle_days = max(0, gc_idle_days)
+        self.profile_gc_max_count = max(0, gc_max_count)
+
+    async def _prepare_profile_store(self, driver_config: DriverConfig):
+        """首次创建持久化Context前：回收过期的用户目录（每个管理器一次），生成模板目录（不存在时）"""
+        if self.profile_gc_idle_days or self.profile_gc_max_count:
+            await self._run_once("profile_gc", lambda: asyncio.to_thread(
+                self.profile_store.collect_garbage, self.profile_gc_idle_days, self.profile_gc_max_count))
+        browser_type = driver_config.browser_type
+        if not self.golden_profile or self.profile_store.has_golden(browser_type):
+            return
+        try:
+            await self._run_once(f"golden_{browser_type}", lambda: self.profile_store.build_golden(
+                browser_type, lambda profile_dir: self._warm_golden_profile(profile_dir, driver_config)))
+        except Exception as e:
+            # 生成失败不影响用户任务，本批次不再使用模板目录
+            self.logger.warning(f"生成持久化模板目录失败：{str(e)}，新用户使用空目录")
+            self.golden_profile = False
+
+    async def _warm_golden_profile(self, profile_dir: Path, driver_config: DriverConfig):
+        """在模板目录上启动一次浏览器：完成首次运行初始化，并访问预热网址填充缓存"""
+        await self._init_global_playwright()
+        launch_options = await self._set_launch_options(driver_config)
+        bt = self._global_playwright.chromium if driver_config.browser_type == "0" else self._global_playwright.firefox
+        context = await bt.launch_persistent_context(user_data_dir=str(profile_dir), **launch_options)
+        try:
+            page = context.pages[0] if context.pages else await context.new_page()
+            for url in self.golden_warm_urls:
+                try:
+                    await page.goto(url, wait_until="load")
+                except Exception as e:
+                    self.logger.warning(f"模板目录预热访问失败：{url}，{str(e)}")
+        finally:
+            await context.close()
+
+    def configure_session_cache(self, domain: str, ttl_seconds: int):
+        """
+        配置会话缓存（须在创建Context前调用）
+        :param domain: 会话缓存的站点，见session_cache.get_session_domain，为空-不恢复会话
+        :param ttl_seconds: 会话缓存有效期（秒），0-不恢复会话
+        """
+        self.session_domain = domain or ""
+        self.session_ttl_seconds = max(0, ttl_seconds)
+
+    async def _load_session_state(self, username: str, driver_config: DriverConfig) -> Optional[Dict[str, Any]]:
+        """读取用户缓存的会话，用于新建Context时恢复（持久化模式返回None）"""
+        if not self.session_ttl_seconds or not self.session_domain:
+            return None
+        if driver_config.incognito_mode != "1" and not driver_config.hook_port:
+            return None
+        try:
+            return await asyncio.to_thread(session_cache.load, username, self.session_domain, self.session_ttl_seconds)
+        except Exception as e:
+            self.logger.warning(f"读取缓存的会话失败：{str(e)}")
+            return None
+
+    def add_rebuild_listener(self, listener):
+        """
+        添加Context重建监听（重建开始时回调，关闭旧Context之前）
+        :param listener: 回调函数，参数：(用户名, 批次号, 新Context的future, 原因)，future在重建失败时抛出异常
+        """
+        self._rebuild_listeners.append(listener)
+
+    def configure_resource_monitor(self, sample_seconds: float, recycle_memory_mb: int = 0):
+        """
+        配置资源采样和Context回收（须在创建Context前调用）
+        :param sample_seconds: 采样周期（秒），0-不采样
+        :param recycle_memory_mb: Context的JS堆超过该值（MB）时重建Context，用户任务从重登节点重新执行，0-不回收
+        """
+        self.resource_sample_seconds = max(0, sample_seconds)
+        self.recycle_memory_mb = max(0, recycle_memory_mb)
+
+    def add_usage_listener(self, listener):
+        """
+        添加资源采样监听（每轮采样后回调）
+        :param listener: 回调函数，参数：{(用户名, 批次号): ContextResourceUsage}
+        """
+        self._usage_listeners.append(listener)
+
+    def _ensure_resource_monitor(self):
+        if self.resource_sample_seconds and (not self._resource_monitor_task or self._resource_monitor_task.done()):
+            self._resource_monitor_task = asyncio.get_running_loop().create_task(self._monitor_resources())
+
+    async def _monitor_resources(self):
+        """定时采样所有用户Context的资源占用，超过回收阈值的Context在后台重建"""
+        while self.user_driver_map:
+            await asyncio.sleep(self.resource_sample_seconds)
+            items = [(key, driver_info) for key, driver_info in list(self.user_driver_map.items())
+                     if driver_info['is_running'] and driver_info.get('resource_sampler')]
+            results = await asyncio.gather(*[driver_info['resource_sampler'].sample() for _, driver_info in items],
+                                           return_exceptions=True)
+            usages = {}
+            for (key, driver_info), result in zip(items, results):
+                if isinstance(result, BaseException):
+                    self.logger.debug(f"用户 {key[0]} 批次 {key[1]} 资源采样失败：{str(result)}")
+                    continue
+                usages[key] = result
+                if (self.recycle_memory_mb and result.js_heap_mb >= self.recycle_memory_mb
+                        and not driver_info.get('is_recycling')):
+                    driver_info['is_recycling'] = True
+                    asyncio.get_running_loop().create_task(self._rebuild_context(
+                        key, f"JS堆占用{result.js_heap_mb:.0f}MB超过回收阈值{self.recycle_memory_mb}MB，回收Context"))
+            for listener in self._usage_listeners:
+                try:
+                    listener(usages)
+                except Exception:
+                    self.logger.exception("资源采样回调异常：")
+
+    async def _new_incognito_context(self, driver_config: DriverConfig, launch_options: dict, context_options: dict,
+                                     username: Optional[str] = None) -> BrowserContext:
+        """
+        创建无痕模式的Context：配置了浏览器分片则分配到其中一个浏览器，否则使用全局browser
+        :param username: 用户名，一致性哈希分配使用，预热Context不传
+        """
+        if self.browser_shard_count <= 1:
+            await self._init_global_browser(driver_config, launch_options)
+            return await self._global_browser.new_context(**context_options)
+        if not self.browser_shard_pool:
+            await self._init_global_playwright()
+        if not self.browser_shard_pool:
+            bt = self._global_playwright.chromium if driver_config.browser_type == "0" else self._global_playwright.firefox
+            # 浏览器断开时Playwright关闭其上所有Context，由存活监测按用户重建，分片池无需回调
+            self.browser_shard_pool = BrowserShardPool(
+                lambda: self._launch_browser(driver_config, lambda: bt.launch(**launch_options)),
+                self.browser_shard_count, self.browser_shard_placement, self.logger)
+        return await self.browser_shard_pool.new_context(username, **context_options)
+
+    async def _rebuild_context(self, key: Tuple[str, str], reason: str):
+        """
+        重建用户的Context：先通知监听方（用户任务中断当前节点，等待新Context后从重登节点重新执行），再创建新Context、关闭旧Context
+        :param key: (用户名, 批次号)
+        :param reason: 重建原因
+        """
+        username, batch_no = key
+        async with self._key_locks.setdefault(key, asyncio.Lock()):
+            old_driver_info = self.user_driver_map.get(key)
+            # 重建前已被清理（用户任务已结束）
+            if not old_driver_info or not old_driver_info['is_running']:
+                return
+            self.logger.warning(f"用户 {username} 批次 {batch_no} 重建Context：{reason}")
+            # 重建期间旧Context的关闭事件不再处理
+            old_driver_info['is_recycling'] = True
+            rebuilt = asyncio.get_running_loop().create_future()
+            # 无人等待时不提示异常未读取
+            rebuilt.add_done_callback(lambda f: f.cancelled() or f.exception())
+            for listener in self._rebuild_listeners:
+                try:
+                    listener(username, batch_no, rebuilt, reason)
+                except Exception:
+                    self.logger.exception("Context重建回调异常：")
+            try:
+                old_sampler = old_driver_info.get('resource_sampler')
+                usage = old_sampler.usage if old_sampler else None
+                if usage:
+                    usage.recycle_count += 1
+                if old_driver_info['is_persistent']:
+                    # 持久化目录同一时间只能被一个浏览器使用，须先关闭旧Context
+                    await self._close_context_quietly(old_driver_info['context'])
+                driver_config = old_driver_info['driver_config']
+                storage_state = await self._load_session_state(username, driver_config)
+                driver_info = await self.create_new_context(username, driver_config, storage_state)
+                await self._init_driver_info(driver_info, driver_config, old_driver_info['routing_profile'], usage)
+                # 重建过程中用户任务结束，丢弃新建的Context
+                if self.user_driver_map.get(key) is not old_driver_info:
+                    await self._close_context_quietly(driver_info['context'])
+                    raise RuntimeError("用户任务已结束")
+                driver_info['restart_count'] = old_driver_info.get('restart_count', 0)
+                self.user_driver_map[key] = driver_info
+                self._watch_liveness(key, driver_info)
+                rebuilt.set_result(driver_info['context'])
+            except Exception as e:
+                self.logger.warning(f"用户 {username} 批次 {batch_no} 重建Context失败：{str(e)}")
+                rebuilt.set_exception(e)
+                return
+        if not old_driver_info['is_persistent']:
+            await self._close_context_quietly(old_driver_info['context'])
+        self.logger.info(f"用户 {username} 批次 {batch_no} Context重建完成")
+
+    async def _close_context_quietly(self, context: BrowserContext):
+        try:
+            await context.close()
+        except Exception as e:
+            self.logger.debug(f"Context关闭失败：{str(e)}")
+
+    def _on_global_browser_disconnected(self, browser: Browser):
+        """全局browser断开：丢弃失效的browser，下次创建Context时重新启动（其上Context的关闭事件由存活监测处理）"""
+        if self._global_browser is not browser:
+            return
+        self.logger.warning("浏览器已断开")
+        self._global_browser = None
+        self._init_futures.pop("browser", None)
+
+    @staticmethod
+    def _get_profile_key(driver_config: DriverConfig) -> Tuple[str, str, str]:
+        """浏览器配置档案：(浏览器类型, 无头模式, 无痕模式)"""
+        return driver_config.browser_type, driver_config.headless_mode, driver_config.incognito_mode
+
+    def start_warm_pool(self, driver_config: DriverConfig, size: int, idle_seconds: float = 60):
+        """
+        启动预热Context池（后台创建，不阻塞）
+        仅支持无痕模式：非无痕模式的Context与用户的持久化目录绑定，hook端口模式连接的是外部浏览器，均无法提前创建
+        :param driver_config: 驱动配置信息
+        :param size: 池的目标大小，0-不预热
+        :param idle_seconds: 空闲时长（秒），超过该时长无人取用则收缩，0-不收缩
+        """
+        if size <= 0:
+            return
+        if driver_config.incognito_mode != "1" or driver_config.hook_port:
+            self.logger.info("预热Context池仅支持无痕模式（且未配置hook端口），不启用预热")
+            return
+        profile_key = self._get_profile_key(driver_config)
+        warm_pool = self.warm_pools.get(profile_key)
+        if not warm_pool:
+            warm_pool = ContextWarmPool("|".join(profile_key), lambda: self._create_warm_context(driver_config), size,
+                                        idle_seconds, self.logger)
+            self.warm_pools[profile_key] = warm_pool
+        warm_pool.start()
+
+    def _take_warm_context(self, driver_config: DriverConfig) -> Optional[BrowserContext]:
+        """从预热池中取出Context，无可用的返回None"""
+        if driver_config.incognito_mode != "1" or driver_config.hook_port:
+            return None
+        warm_pool = self.warm_pools.get(self._get_profile_key(driver_config))
+        return warm_pool.take() if warm_pool else None
+
+    async def _create_warm_context(self, driver_config: DriverConfig) -> BrowserContext:
+        """创建预热Context（无痕模式）：应用stealth并打开首个页面"""
+        context = await self._new_incognito_context(driver_config, await self._set_launch_options(driver_config),
+                                                    await self._set_context_options(driver_config))
+        await self._apply_launch_profile(context, driver_config)
+        await self.setup_stealth_for_context(context)
+        if not context.pages:
+            await context.new_page()
+        return context
+
+    async def setup_stealth_for_context(self, context: BrowserContext):
+        """
+        封装函数：为上下文应用stealth
+        在Context级别注册一次初始化脚本（脚本按选项缓存，所有Context共用），该Context下的所有页面（含已存在的页面、
+        站点打开的弹窗和新标签页）在创建、跳转时自动执行，新页面无需任何Python侧处理
+        """
+        await STEALTH.apply_stealth_async(context)
 
     def get_screen_resolution(self):
         """
@@ -184,25 +643,35 @@ class WebDriverManager:
     async def close(self):
         """关闭全局资源"""
         try:
-            # 先清理所有用户driver
+            # 先关闭预热池，再清理所有用户driver
+            for warm_pool in self.warm_pools.values():
+                await warm_pool.close()
+            self.warm_pools.clear()
+            if self._resource_monitor_task and not self._resource_monitor_task.done():
+                self._resource_monitor_task.cancel()
             await self.clear_all_drivers()
 
-            # 关闭全局browser和playwright
+            # 关闭浏览器分片、全局browser和playwright
+            if self.browser_shard_pool:
+                await self.browser_shard_pool.close()
+                self.browser_shard_pool = None
             if self._global_browser:
                 await self._global_browser.close()
 
             if self._global_playwright:
                 await self._global_playwright.stop()
+            self._global_browser = None
+            self._global_playwright = None
+            self._init_futures.clear()
         except:
             self.logger.debug("关闭全局资源失败", exec_info=True)
 
     async def get_user_driver(self, username: str, batch_no: str) -> Optional[BrowserContext]:
-        """获取用户专属Driver（仅返回运行中的Driver）"""
-        async with self.lock:
-            driver_info = self.user_driver_map.get((username, batch_no))
-            if driver_info and driver_info['is_running']:
-                return driver_info['context']
-            return None
+        """获取用户专属Driver（仅返回运行中的Driver），无锁读取"""
+        driver_info = self.user_driver_map.get((username, batch_no))
+        if driver_info and driver_info['is_running']:
+            return driver_info['context']
+        return None
 
     async def _set_launch_options(self, driver_config: DriverConfig) -> dict:
         """构建 Playwright 浏览器启动参数（自动区分无痕/非无痕模式参数）"""
@@ -221,9 +690,9 @@ class WebDriverManager:
                 "--lang=zh-CN",  # 语言设置
                 # 设置接受的语言优先级（中文第一，英文兜底）
                 "--accept-lang=zh-CN,zh;q=0.9,en;q=0.8",
-                # 禁用语言自动检测（可选，避免覆盖手动设置）
-                "--disable-features=TranslateUI,LanguageDetection",
-                "--mute-audio",  # 静音
+                # 禁用语言自动检测（可选，避免覆盖手动设置），启动档案禁用的特性一并合并到该参数
+                "--disable-features=" + ",".join(["TranslateUI", "LanguageDetection"] +
+                                                 self.launch_profile.chrome_disabled_features()),
                 "--start-maximized",  # 窗口最大化。配合context的no_viewport=True属性实现最大化
                 "--disable-popup-blocking",  # 禁用弹窗拦截（防止新窗口被拦截）
                 # 核心反检测（必须保留）
@@ -238,7 +707,12 @@ class WebDriverManager:
                 # "--password-store=basic",
             ]
 
-            if driver_config.headless_mode == "1":
+            if self.launch_profile.mute_media:
+                common_args.append("--mute-audio")  # 静音
+            # 低资源档案：关闭后台服务、GPU合成，限制渲染进程内存
+            common_args.extend(self.launch_profile.chrome_args())
+
+            if driver_config.headless_mode == "1" and not self.launch_profile.is_lean:
                 common_args.extend(['--enable-gpu',
                                     '--use-gl=angle',  # 或 'egl'、'desktop'
                                     '--enable-webgl',
@@ -280,14 +754,10 @@ class WebDriverManager:
             args.extend(non_incognito_args)
 
         if driver_config.browser_type == "1":  # 火狐
-            launch_options["firefox_user_prefs"] = {
-                # 禁用所有音频输出
-                "media.volume_scale": "0.0",
+            firefox_user_prefs = {
                 # 禁用自动播放音频
                 # "media.autoplay.default": 5,
                 # "media.autoplay.blocking_policy": 2,
-                # 禁用WebAudio API（覆盖更多音频场景）
-                "dom.webaudio.enabled": False,
 
                 # 禁用JIT编译器的一些优化（减少CPU波动）
                 "javascript.options.baselinejit": False,
@@ -300,6 +770,14 @@ class WebDriverManager:
                 # "browser.cache.disk.enable": False,
                 # "browser.cache.memory.enable": False,
             }
+            if self.launch_profile.mute_media:
+                # 禁用所有音频输出
+                firefox_user_prefs["media.volume_scale"] = "0.0"
+                # 禁用WebAudio API（覆盖更多音频场景）
+                firefox_user_prefs["dom.webaudio.enabled"] = False
+            # 启动档案：低资源首选项、限制帧率
+            firefox_user_prefs.update(self.launch_profile.firefox_prefs())
+            launch_options["firefox_user_prefs"] = firefox_user_prefs
 
             launch_options["env"] = {
                 # "MOZ_DISABLE_CONTENT_PROCESS_SANDBOX": "1",  # 禁用沙箱（减少系统调用）
@@ -340,77 +818,34 @@ class WebDriverManager:
         #     self.logger.error("请指定用户和批次号")
         #     return
         # elif not batch_no:
-        async with self.lock:
-            if username:
-                keys = [key for key in self.user_driver_map.keys() if key[0] == username]
-            elif batch_no:
-                keys = [key for key in self.user_driver_map.keys() if key[1] == batch_no]
-            else:
-                # 均不传，则不清除
-                return
-
-            for key in keys:
-                await self._cleanup_driver(key)
+        if username:
+            keys = [key for key in self.user_driver_map.keys() if key[0] == username]
+        elif batch_no:
+            keys = [key for key in self.user_driver_map.keys() if key[1] == batch_no]
+        else:
+            # 均不传，则不清除
+            return
+        await self._cleanup_drivers(keys)
 
     async def clear_all_drivers(self):
         """清空所有用户的Driver（批量清理）"""
         self.logger.debug("开始清空所有用户的Context")
-        async with self.lock:
-            for key in list(self.user_driver_map.keys()):
-                await self._cleanup_driver(key)
+        await self._cleanup_drivers(list(self.user_driver_map.keys()))
 
-    async def _start_monitor_thread(self, username: str, batch_no: str):
-        """为指定用户启动浏览器监控线程（后台检测浏览器是否被手动关闭）"""
-        key = (username, batch_no,)
-
-        # 定义监控逻辑
-        async def monitor_func():
-            while True:
-                # 每次循环先检查锁，确认用户Driver是否仍在运行
-                async with self.lock:
-                    driver_info = self.user_driver_map.get(key)
-                    # 终止条件：用户Driver已被清理/不再运行
-                    if not driver_info or not driver_info['is_running']:
-                        self.logger.info(f"监控线程：Context已停止，退出监控")
-                        return
-
-                try:
-                    # 1. 检测Chrome浏览器进程是否存活
-                    if not psutil.pid_exists(driver_info['chrome_pid']):
-                        self.logger.warning(
-                            f"Chrome浏览器（PID:{driver_info['chrome_pid']}）已被手动关闭")
-                        # 自动清理该用户的Driver
-                        async with self.lock:
-                            await self._cleanup_driver(key)
-                        return
-
-                    # 2. 额外检测：Driver是否还能正常通信（防止进程存在但浏览器无响应）
-                    try:
-                        # TODO 此处有bug，从selenium搬过来的！未修改！
-                        driver_info['context'].current_url
-                    except Exception:
-                        self.logger.warning(f"Context与浏览器通信失败")
-                        async with self.lock:
-                            await self._cleanup_driver(key)
-                        return
-
-                    time.sleep(1)  # 每秒检测一次，可根据需求调整
-                except Exception:
-                    self.logger.exception(f"监控线程异常：")
-                    async with self.lock:
-                        await self._cleanup_driver(key)
-                    return
-
-        # 启动守护线程（主程序退出时自动结束）
-        monitor_thread = threading.Thread(target=monitor_func, name=f"Monitor-[{basic.mask_username(username)}]")
-        monitor_thread.daemon = True
-        self.user_driver_map[key]['monitor_thread'] = monitor_thread
-        monitor_thread.start()
-        self.logger.info(f"浏览器监控线程已启动")
+    async def _cleanup_drivers(self, keys):
+        """并发清理多个用户的Driver资源"""
+        results = await asyncio.gather(*[self._cleanup_driver(key) for key in keys], return_exceptions=True)
+        for key, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                self.logger.warning(f"用户 {key[0]} 批次 {key[1]} 资源清理失败：{str(result)}")
 
     async def _cleanup_driver(self, key: Tuple[str, str]):
         """清理单个用户的Driver资源"""
-        driver_info = self.user_driver_map.get(key)
+        # 先从映射中移除（不跨await，并发清理同一用户时只有一个能取到）
+        driver_info = self.user_driver_map.pop(key, None)
+        key_lock = self._key_locks.get(key)
+        if key_lock and not key_lock.locked():
+            self._key_locks.pop(key)
         if not driver_info:
             return
 
@@ -449,8 +884,6 @@ class WebDriverManager:
         #     except Exception as e:
         #         self.logger.warning(f"终止Chrome进程失败: {str(e)}")
 
-        # 4. 移除映射
-        self.user_driver_map.pop(key)
         self.logger.debug(f"用户 {username} 批次 {batch_no} 资源清理完成")
 
     async def kill_residual_chromedriver(self):
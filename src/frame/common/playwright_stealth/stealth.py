@@ -4,7 +4,7 @@ import json
 import random
 import re
 import warnings
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from copy import deepcopy
 from pathlib import Path
 from typing import Dict, List, Union, Any, Tuple, Optional
@@ -21,28 +21,116 @@ def from_file(name) -> str:
     return Path(SysPathUtils.get_config_file_dir(), "playwright_stealth_js", name).read_text()
 
 
-SCRIPTS: Dict[str, str] = {
-    "generate_magic_arrays": from_file("generate.magic.arrays.js"),
-    "utils": from_file("utils.js"),
-    "chrome_app": from_file("evasions/chrome.app.js"),
-    "chrome_csi": from_file("evasions/chrome.csi.js"),
-    "chrome_hairline": from_file("evasions/chrome.hairline.js"),
-    "chrome_load_times": from_file("evasions/chrome.load.times.js"),
-    "chrome_runtime": from_file("evasions/chrome.runtime.js"),
-    "iframe_content_window": from_file("evasions/iframe.contentWindow.js"),
-    "media_codecs": from_file("evasions/media.codecs.js"),
-    "navigator_hardware_concurrency": from_file("evasions/navigator.hardwareConcurrency.js"),
-    "navigator_languages": from_file("evasions/navigator.languages.js"),
-    "navigator_permissions": from_file("evasions/navigator.permissions.js"),
-    "navigator_platform": from_file("evasions/navigator.platform.js"),
-    "navigator_plugins": from_file("evasions/navigator.plugins.js"),
-    "navigator_user_agent": from_file("evasions/navigator.userAgent.js"),
-    "navigator_vendor": from_file("evasions/navigator.vendor.js"),
-    "navigator_webdriver": from_file("evasions/navigator.webdriver.js"),
-    "error_prototype": from_file("evasions/error.prototype.js"),
-    "webgl_vendor": from_file("evasions/webgl.vendor.js"),
+# 脚本名 -> 脚本文件（相对playwright_stealth_js目录）
+SCRIPT_FILES: Dict[str, str] = {
+    "generate_magic_arrays": "generate.magic.arrays.js",
+    "utils": "utils.js",
+    "chrome_app": "evasions/chrome.app.js",
+    "chrome_csi": "evasions/chrome.csi.js",
+    "chrome_hairline": "evasions/chrome.hairline.js",
+    "chrome_load_times": "evasions/chrome.load.times.js",
+    "chrome_runtime": "evasions/chrome.runtime.js",
+    "iframe_content_window": "evasions/iframe.contentWindow.js",
+    "media_codecs": "evasions/media.codecs.js",
+    "navigator_hardware_concurrency": "evasions/navigator.hardwareConcurrency.js",
+    "navigator_languages": "evasions/navigator.languages.js",
+    "navigator_permissions": "evasions/navigator.permissions.js",
+    "navigator_platform": "evasions/navigator.platform.js",
+    "navigator_plugins": "evasions/navigator.plugins.js",
+    "navigator_user_agent": "evasions/navigator.userAgent.js",
+    "navigator_vendor": "evasions/navigator.vendor.js",
+    "navigator_webdriver": "evasions/navigator.webdriver.js",
+    "error_prototype": "evasions/error.prototype.js",
+    "webgl_vendor": "evasions/webgl.vendor.js",
 }
 
+# 预编译脚本包（打包时由build_bundle生成，脚本名 -> 精简后的脚本），存在时只读这一个文件
+BUNDLE_FILE = "stealth_bundle.json"
+
+
+class _LazyScripts(Mapping):
+    """
+    按脚本名懒加载的脚本表：导入模块时不读文件，首次取用时加载并缓存
+    存在预编译脚本包时一次读入全部脚本，否则按需逐个读取脚本文件
+    """
+
+    def __init__(self, script_files: Dict[str, str]):
+        self._script_files = script_files
+        self._scripts: Dict[str, str] = {}
+        self._bundle_loaded = False
+
+    def _load_bundle(self):
+        self._bundle_loaded = True
+        bundle_path = Path(SysPathUtils.get_config_file_dir(), "playwright_stealth_js", BUNDLE_FILE)
+        if bundle_path.exists():
+            bundle = json.loads(bundle_path.read_text(encoding="utf-8"))
+            for name, script in bundle.items():
+                self._scripts.setdefault(name, script)
+
+    def __getitem__(self, name: str) -> str:
+        script = self._scripts.get(name)
+        if script is None:
+            if name not in self._script_files:
+                raise KeyError(name)
+            if not self._bundle_loaded:
+                self._load_bundle()
+                script = self._scripts.get(name)
+            if script is None:
+                script = self._scripts[name] = from_file(self._script_files[name])
+        return script
+
+    def __iter__(self):
+        return iter(self._script_files)
+
+    def __len__(self):
+        return len(self._script_files)
+
+
+SCRIPTS: Mapping = _LazyScripts(SCRIPT_FILES)
+
+
+def minify_script(source: str) -> str:
+    """
+    保守精简脚本：去掉空行、整行注释和行尾空白，模板字符串（反引号）内的行原样保留
+    不改写语句本身，精简前后脚本行为一致
+    """
+    lines = []
+    in_template = False
+    for line in source.splitlines():
+        line_in_template = in_template
+        # 反引号为奇数个时，下一行处于模板字符串内（转义的反引号不计）
+        if (line.count("`") - line.count("\\`")) % 2:
+            in_template = not in_template
+        if line_in_template:
+            lines.append(line)
+            continue
+        stripped = line.strip()
+        if not stripped or stripped.startswith("//"):
+            # 整行注释中的反引号不影响模板字符串的判断
+            in_template = line_in_template
+            continue
+        # 行尾在模板字符串内时，行尾空白属于字符串内容，不去掉
+        lines.append(line if in_template else line.rstrip())
+    return "\n".join(lines)
+
+
+def build_bundle(output_path: Optional[Union[str, Path]] = None) -> Path:
+    """
+    生成预编译脚本包（打包前调用），运行时冷启动只需读取一个文件
+    :param output_path: 输出路径，默认为playwright_stealth_js目录下的stealth_bundle.json
+    :return: 输出路径
+    """
+    if output_path is None:
+        output_path = Path(SysPathUtils.get_config_file_dir(), "playwright_stealth_js", BUNDLE_FILE)
+    output_path = Path(output_path)
+    bundle = {name: minify_script(from_file(file_name)) for name, file_name in SCRIPT_FILES.items()}
+    output_path.write_text(json.dumps(bundle, ensure_ascii=False), encoding="utf-8")
+    return output_path
+
+
+# 已编译的脚本：选项 -> 脚本（同一组选项只拼接、序列化一次）
+_SCRIPT_PAYLOAD_CACHE: Dict[Tuple, str] = {}
+
 
 class Stealth:
     """
@@ -140,11 +228,28 @@ class Stealth:
         """
         Generates an immediately invoked function expression for all enabled scripts
         Returns: string of enabled scripts in IIFE
+        同一组选项的脚本只生成一次，之后直接从缓存中读取
         """
-        scripts_block = "\n".join(self.enabled_scripts)
-        if len(scripts_block) == 0:
-            return ""
-        return "(() => {\n" + scripts_block + "\n})();"
+        options_key = self._options_key()
+        payload = _SCRIPT_PAYLOAD_CACHE.get(options_key)
+        if payload is None:
+            scripts_block = "\n".join(self.enabled_scripts)
+            payload = "" if len(scripts_block) == 0 else "(() => {\n" + scripts_block + "\n})();"
+            _SCRIPT_PAYLOAD_CACHE[options_key] = payload
+        return payload
+
+    def _options_key(self) -> Tuple:
+        """影响脚本内容的所有选项"""
+        return (
+            type(self),
+            self.chrome_app, self.chrome_csi, self.chrome_load_times, self.chrome_runtime, self.hairline,
+            self.iframe_content_window, self.media_codecs, self.navigator_hardware_concurrency,
+            self.navigator_languages, self.navigator_permissions, self.navigator_platform, self.navigator_plugins,
+            self.navigator_user_agent, self.navigator_vendor, self.navigator_webdriver, self.error_prototype,
+            self.webgl_vendor, tuple(self.navigator_languages_override), self.navigator_platform_override,
+            self.navigator_user_agent_override, self.navigator_vendor_override, self.webgl_renderer_override,
+            self.webgl_vendor_override, self.script_logging,
+        )
 
     @property
     def options_payload(self) -> str:
@@ -237,13 +342,15 @@ class Stealth:
         return SyncWrappingContextManager(self, ctx)
 
     async def apply_stealth_async(self, page_or_context: Union[async_api.Page, async_api.BrowserContext]) -> None:
-        if len(self.script_payload) > 0 and not self.warn_if_stealth_applied(page_or_context):
-            await page_or_context.add_init_script(self.script_payload)
+        script_payload = self.script_payload
+        if len(script_payload) > 0 and not self.warn_if_stealth_applied(page_or_context):
+            await page_or_context.add_init_script(script_payload)
             setattr(page_or_context, self._STEALTH_APPLIED_KEY, True)
 
     def apply_stealth_sync(self, page_or_context: Union[sync_api.Page, sync_api.BrowserContext]) -> None:
-        if len(self.script_payload) > 0 and not self.warn_if_stealth_applied(page_or_context):
-            page_or_context.add_init_script(self.script_payload)
+        script_payload = self.script_payload
+        if len(script_payload) > 0 and not self.warn_if_stealth_applied(page_or_context):
+            page_or_context.add_init_script(script_payload)
             setattr(page_or_context, self._STEALTH_APPLIED_KEY, True)
 
     def hook_playwright_context(self, ctx: Union[async_api.Playwright, sync_api.Playwright]) -> None:
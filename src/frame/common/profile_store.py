@@ -0,0 +1,232 @@
+import asyncio
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+from src.utils import Md5Utils
+
+# 不从模板目录克隆的文件/目录：浏览器运行时锁、会话与登录态（各用户独立）、崩溃转储
+PROFILE_EXCLUDES = frozenset({
+    # Chrome
+    "SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile", "Crashpad", "Sessions", "Session Storage",
+    "Local Storage", "IndexedDB", "Cookies", "Cookies-journal", "Login Data", "Login Data-journal", "History",
+    "History-journal", "Web Data", "Web Data-journal",
+    # Firefox
+    "parent.lock", ".parentlock", "lock", "cookies.sqlite", "cookies.sqlite-wal", "webappsstore.sqlite",
+    "sessionstore.jsonlz4", "sessionstore-backups", "storage", "places.sqlite", "places.sqlite-wal",
+    "formhistory.sqlite", "minidumps",
+})
+
+# 浏览器运行中的锁文件（目录正在被浏览器使用），垃圾回收跳过
+PROFILE_LOCKS = ("SingletonLock", "lockfile", "parent.lock", ".parentlock")
+
+# 不支持reflink时只从模板复制的首次运行文件（相对路径）：完整复制模板（含HTTP缓存）比新建空目录还慢，
+# 只复制体积小、又能省去首次运行初始化的文件：首次运行标记、本地状态、偏好设置、字体/着色器缓存
+FIRST_RUN_ALLOWLIST = (
+    # Chrome
+    "First Run", "Local State", "Default/Preferences", "Default/Secure Preferences", "FontLookupTableCache",
+    "ShaderCache", "GrShaderCache", "GraphiteDawnCache",
+    # Firefox
+    "prefs.js", "times.json", "compatibility.ini", "xulstore.json", "startupCache",
+)
+
+LAST_USED_FILE = ".last_used"  # 用户目录最近使用时间标记（取文件修改时间）
+GOLDEN_READY_FILE = ".golden_ready"  # 模板目录生成完成标记
+
+# Linux FICLONE ioctl（btrfs/xfs等支持reflink的文件系统上克隆文件，写时复制，不占用额外空间）
+_FICLONE = 0x40049409
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """写时复制克隆文件，文件系统不支持时返回False"""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def clone_file(src: str, dst: str) -> str:
+    """
+    克隆文件：优先reflink（写时复制），不支持时复制
+    不使用硬链接：浏览器会原地修改数据库、缓存文件，硬链接会让所有用户共用同一份数据
+    """
+    if not _reflink(src, dst):
+        shutil.copy2(src, dst)
+    return dst
+
+
+class ProfileStore:
+    """
+    持久化目录管理（非无痕模式）：
+    1. 模板目录：按浏览器类型生成一次预热好的目录（首次运行状态、字体缓存、HTTP缓存），新用户的目录从模板克隆，
+       免去冷启动初始化；克隆时排除登录态、会话、锁文件。文件系统不支持reflink时（如Windows NTFS）
+       只复制FIRST_RUN_ALLOWLIST中的首次运行文件
+    2. 垃圾回收：删除超过闲置天数、或超出数量上限（按最近使用时间）的用户目录，浏览器正在使用的目录跳过
+    文件操作均为同步方法，协程中请用asyncio.to_thread调用
+    """
+
+    def __init__(self, root: Path, logger):
+        """
+        :param root: 持久化目录的根目录
+        :param logger: 日志
+        """
+        self.root = Path(root)
+        self.logger = logger
+        self._reflink_supported: Optional[bool] = None
+        self._reflink_lock = threading.Lock()  # 多个线程同时准备用户目录时，只探测一次
+
+    def user_dir(self, username: str) -> Path:
+        return self.root / f"user_{Md5Utils.encrypt(username)}"
+
+    def golden_dir(self, browser_type: str) -> Path:
+        return self.root / f"golden_{'chrome' if browser_type == '0' else 'firefox'}"
+
+    def has_golden(self, browser_type: str) -> bool:
+        return (self.golden_dir(browser_type) / GOLDEN_READY_FILE).exists()
+
+    def supports_reflink(self) -> bool:
+        """持久化目录所在的文件系统是否支持reflink（首次调用时用临时文件探测，线程安全）"""
+        if self._reflink_supported is not None:
+            return self._reflink_supported
+        with self._reflink_lock:
+            if self._reflink_supported is not None:
+                return self._reflink_supported
+            self.root.mkdir(parents=True, exist_ok=True)
+            src = self.root / f".reflink_probe_{os.getpid()}"
+            dst = src.with_name(src.name + ".clone")
+            try:
+                src.write_bytes(b"probe")
+                self._reflink_supported = _reflink(str(src), str(dst))
+            finally:
+                for path in (src, dst):
+                    path.unlink(missing_ok=True)
+        return self._reflink_supported
+
+    async def build_golden(self, browser_type: str, builder: Callable[[Path], Awaitable[None]]) -> Path:
+        """
+        生成模板目录：builder在临时目录上启动一次浏览器完成预热，之后清理锁文件和会话数据，再替换为模板目录
+        :param browser_type: 浏览器类型。0：chrome；1：firefox
+        :param builder: 预热函数，参数为临时目录
+        :return: 模板目录
+        """
+        golden_dir = self.golden_dir(browser_type)
+        tmp_dir = golden_dir.with_name(golden_dir.name + ".tmp")
+        await asyncio.to_thread(shutil.rmtree, tmp_dir, True)
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        await builder(tmp_dir)
+        await asyncio.to_thread(self._finish_golden, tmp_dir, golden_dir)
+        self.logger.info(f"持久化模板目录已生成：{golden_dir}")
+        return golden_dir
+
+    def _finish_golden(self, tmp_dir: Path, golden_dir: Path):
+        for path in sorted(tmp_dir.rglob("*"), reverse=True):
+            if path.name in PROFILE_EXCLUDES:
+                self._remove(path)
+        (tmp_dir / GOLDEN_READY_FILE).touch()
+        shutil.rmtree(golden_dir, ignore_errors=True)
+        os.replace(tmp_dir, golden_dir)
+
+    def prepare_user_dir(self, username: str, browser_type: str) -> Path:
+        """
+        准备用户的持久化目录：已存在则直接使用，不存在时从模板目录克隆（无模板目录则新建空目录），并记录使用时间
+        :return: 用户目录
+        """
+        user_dir = self.user_dir(username)
+        if not user_dir.exists():
+            if self.has_golden(browser_type):
+                started = time.monotonic()
+                # 先克隆到临时目录再改名，克隆中断不会留下不完整的用户目录
+                tmp_dir = user_dir.with_name(user_dir.name + ".tmp")
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                if self.supports_reflink():
+                    shutil.copytree(self.golden_dir(browser_type), tmp_dir, copy_function=clone_file,
+                                    ignore=lambda _, names: [name for name in names
+                                                             if name in PROFILE_EXCLUDES or name == GOLDEN_READY_FILE])
+                else:
+                    self._copy_first_run_files(self.golden_dir(browser_type), tmp_dir)
+                os.replace(tmp_dir, user_dir)
+                self.logger.info(f"用户 {username} 的持久化目录已从模板克隆，耗时：{time.monotonic() - started:.2f}秒")
+            else:
+                user_dir.mkdir(parents=True, exist_ok=True)
+        (user_dir / LAST_USED_FILE).touch()
+        return user_dir
+
+    @staticmethod
+    def _copy_first_run_files(golden_dir: Path, tmp_dir: Path):
+        """只复制首次运行文件（不支持reflink时）"""
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        for relative_path in FIRST_RUN_ALLOWLIST:
+            src = golden_dir / relative_path
+            dst = tmp_dir / relative_path
+            if src.is_dir():
+                shutil.copytree(src, dst)
+            elif src.is_file():
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(src, dst)
+
+    def collect_garbage(self, max_idle_days: int = 0, max_count: int = 0) -> List[Path]:
+        """
+        回收用户目录
+        :param max_idle_days: 闲置天数上限，超过则删除，0-不限制
+        :param max_count: 用户目录数量上限，超出时删除最久未使用的，0-不限制
+        :return: 已删除的目录
+        """
+        if not self.root.exists() or (not max_idle_days and not max_count):
+            return []
+        profiles = []
+        for path in self.root.iterdir():
+            if not path.is_dir():
+                continue
+            # 中断后残留的临时目录（一小时前的，避免删除其它进程正在克隆的目录）
+            if path.name.endswith(".tmp") and path.name.startswith("user_"):
+                if time.time() - self._last_used(path) > 3600:
+                    self._remove(path)
+                continue
+            if path.name.startswith("user_"):
+                profiles.append((self._last_used(path), path))
+        profiles.sort(reverse=True)
+        now = time.time()
+        removed = []
+        for index, (last_used, path) in enumerate(profiles):
+            expired = max_idle_days and now - last_used > max_idle_days * 86400
+            if not expired and not (max_count and index >= max_count):
+                continue
+            if any(os.path.lexists(path / lock) for lock in PROFILE_LOCKS):
+                continue
+            if self._remove(path):
+                removed.append(path)
+        if removed:
+            self.logger.info(f"已回收持久化目录：{len(removed)}个")
+        return removed
+
+    @staticmethod
+    def _last_used(path: Path) -> float:
+        marker = path / LAST_USED_FILE
+        try:
+            return (marker if marker.exists() else path).stat().st_mtime
+        except OSError:
+            return 0
+
+    def _remove(self, path: Path) -> bool:
+        try:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+            return True
+        except OSError as e:
+            self.logger.debug(f"删除失败：{path}，{str(e)}")
+            return False
+
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class AdaptiveRateLimiter:
+    """
+    自适应令牌桶限流器（按目标站点限制用户启动/登录速率）
+    1. 令牌按当前速率匀速生成，桶容量为burst，取不到令牌时等待
+    2. 加性增：登录成功一次，速率增加一个步长，直到最大速率，站点能承受时尽快达到满并发
+    3. 乘性减：登录失败、验证码重试时速率按比例下降，直到最小速率，避免触发站点风控
+    线程安全：同一站点的多个批次（多个执行线程/事件循环）共享一个限流器
+    """
+
+    def __init__(self, domain: str, initial_interval: float, min_interval: float, max_interval: float,
+                 burst: int = 1):
+        """
+        :param domain: 目标站点
+        :param initial_interval: 初始启动间隔（秒）
+        :param min_interval: 最小启动间隔（秒），即最大速率
+        :param max_interval: 最大启动间隔（秒），即最小速率
+        :param burst: 桶容量（允许的突发启动数）
+        """
+        self.domain = domain
+        self._lock = threading.Lock()
+        self._max_rate = 1 / max(min_interval, 0.001)
+        self._min_rate = 1 / max(max_interval, min_interval, 0.001)
+        self._rate = min(max(1 / max(initial_interval, 0.001), self._min_rate), self._max_rate)  # 令牌/秒
+        self._step = self._rate / 2  # 加性增步长
+        self._burst = max(1, burst)
+        self._tokens = 1.0  # 首个用户无需等待
+        self._last_refill = time.monotonic()
+
+    @property
+    def interval(self) -> float:
+        """当前启动间隔（秒）"""
+        return 1 / self._rate
+
+    def _refill(self, now: float):
+        self._tokens = min(self._burst, self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """获取一个令牌，令牌不足时等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self._rate
+            await asyncio.sleep(wait_seconds)
+
+    def on_success(self):
+        """登录成功：加性增"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._rate = min(self._max_rate, self._rate + self._step)
+
+    def on_failure(self, factor: float = 0.5):
+        """
+        登录失败/验证码重试：乘性减
+        :param factor: 速率下降比例，越小降得越多
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._rate = max(self._min_rate, self._rate * factor)
+
+
+class RateLimiterRegistry:
+    """限流器注册表：目标站点 -> 限流器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+    @staticmethod
+    def normalize_domain(domain: str) -> str:
+        """站点标准化：https://www.xxx.com/login -> www.xxx.com"""
+        domain = (domain or "").strip().lower()
+        if "//" not in domain:
+            domain = f"//{domain}"
+        return urlparse(domain).netloc or domain.strip("/")
+
+    def get(self, domain: str, initial_interval: float, min_interval: float,
+            max_interval: float) -> AdaptiveRateLimiter:
+        """
+        获取站点的限流器，不存在则创建（已存在则沿用其已学习到的速率）
+        :param domain: 目标站点，tb_task_tmpl.domain
+        :param initial_interval: 初始启动间隔（秒）
+        :param min_interval: 最小启动间隔（秒）
+        :param max_interval: 最大启动间隔（秒）
+        """
+        key = self.normalize_domain(domain)
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if not limiter:
+                limiter = AdaptiveRateLimiter(key, initial_interval, min_interval, max_interval)
+                self._limiters[key] = limiter
+            return limiter
+
+    def find(self, domain: str) -> Optional[AdaptiveRateLimiter]:
+        """查找站点的限流器，不存在返回None"""
+        with self._lock:
+            return self._limiters.get(self.normalize_domain(domain))
+
+
+# 全局唯一限流器注册表
+rate_limiter_registry = RateLimiterRegistry()
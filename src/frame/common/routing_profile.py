@@ -0,0 +1,131 @@
+import mimetypes
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from playwright.async_api import BrowserContext, Route
+
+from src.utils.sys_path_utils import SysPathUtils
+
+# 内置路由档案：任务模板配置routing_config可直接填档案名
+ROUTING_PRESETS: Dict[str, Dict[str, Any]] = {
+    # 屏蔽图片、字体和常见统计脚本（保留视频，课程监控类任务可直接使用；任务含登录节点时登录成功后才屏蔽，不影响验证码图片）
+    "lean": {
+        "block_resource_types": ["image", "font"],
+        "block_url_patterns": ["**/hm.baidu.com/**", "**/*google-analytics.com/**", "**/*googletagmanager.com/**",
+                               "**/*cnzz.com/**"],
+    },
+    # 在lean基础上屏蔽音视频（仅适用于不校验视频真实播放的站点）
+    "no_media": {
+        "block_resource_types": ["image", "font", "media"],
+        "block_url_patterns": ["**/hm.baidu.com/**", "**/*google-analytics.com/**", "**/*googletagmanager.com/**",
+                               "**/*cnzz.com/**", "**/*.ts", "**/*.m4s"],
+    },
+}
+
+
+@dataclass
+class StubRule:
+    """桩响应规则：匹配的请求直接返回本地文件内容，不访问网络"""
+    url_pattern: str  # URL匹配规则（Playwright glob）
+    body: bytes  # 响应内容（编译时从本地文件读取，常驻内存）
+    content_type: Optional[str] = None  # 响应类型，未配置按文件后缀推断
+    status: int = 200  # 响应状态码
+
+
+@dataclass
+class RoutingProfile:
+    """
+    请求路由档案：按任务模板配置屏蔽资源类型、URL，或以本地文件作为桩响应
+    配置示例（tb_task_tmpl_config.routing_config，也可直接填内置档案名，如"lean"）：
+    {
+        "block_resource_types": ["image", "font", "media"],
+        "block_url_patterns": ["**/*.woff2", "**/hm.baidu.com/**"],
+        "stub_rules": [{"url_pattern": "**/analytics.js", "path": "stubs/empty.js",
+                        "content_type": "application/javascript", "status": 200}]
+    }
+    资源类型屏蔽在登录节点执行期间暂停（验证码图片、滑块等须正常加载），登录成功后生效，见set_resource_blocking
+    """
+    block_resource_types: FrozenSet[str] = frozenset()  # 屏蔽的资源类型（Playwright request.resource_type）
+    block_url_patterns: List[str] = field(default_factory=list)  # 屏蔽的URL（Playwright glob）
+    stub_rules: List[StubRule] = field(default_factory=list)  # 桩响应规则
+    # 任务含登录节点时为True：新建的Context先不屏蔽资源类型，由登录节点在登录成功后启用
+    defer_resource_blocking: bool = False
+    # 已启用资源类型屏蔽的Context
+    _blocking_contexts: "weakref.WeakSet[BrowserContext]" = field(default_factory=weakref.WeakSet, repr=False,
+                                                                  compare=False)
+
+    def __bool__(self):
+        return bool(self.block_resource_types or self.block_url_patterns or self.stub_rules)
+
+    @classmethod
+    def from_config(cls, routing_config) -> Optional["RoutingProfile"]:
+        """
+        编译路由档案（读取桩响应文件，协程中请用asyncio.to_thread调用）
+        :param routing_config: 路由配置（字典）或内置档案名
+        :return: 路由档案，未配置返回None
+        """
+        if not routing_config:
+            return None
+        if isinstance(routing_config, str):
+            if routing_config not in ROUTING_PRESETS:
+                raise ValueError(f"不存在的路由档案：{routing_config}，可选：{list(ROUTING_PRESETS.keys())}")
+            routing_config = ROUTING_PRESETS[routing_config]
+        stub_rules = []
+        for stub_cfg in routing_config.get("stub_rules", []) or []:
+            stub_path = Path(stub_cfg["path"])
+            if not stub_path.is_absolute():
+                stub_path = Path(SysPathUtils.get_root_dir(), stub_path)
+            stub_rules.append(StubRule(stub_cfg["url_pattern"], stub_path.read_bytes(),
+                                       stub_cfg.get("content_type") or mimetypes.guess_type(stub_path.name)[0],
+                                       int(stub_cfg.get("status", 200))))
+        profile = cls(frozenset(routing_config.get("block_resource_types", []) or []),
+                      list(routing_config.get("block_url_patterns", []) or []),
+                      stub_rules)
+        return profile or None
+
+    async def apply(self, context: BrowserContext):
+        """
+        为Context注册路由（Context创建后、访问页面前调用）
+        只有配置了资源类型屏蔽时才拦截全部请求；仅配置URL规则时只拦截匹配的请求，其余请求不经过Python，无额外开销
+        """
+        if self.block_resource_types:
+            self.set_resource_blocking(context, not self.defer_resource_blocking)
+            # 最先注册，最后执行：URL规则未命中的请求再按资源类型判断
+            await context.route("**/*", self._make_block_resource_type(context))
+        for url_pattern in self.block_url_patterns:
+            await context.route(url_pattern, self._abort)
+        for stub_rule in self.stub_rules:
+            await context.route(stub_rule.url_pattern, self._make_fulfill(stub_rule))
+
+    def set_resource_blocking(self, context: BrowserContext, enabled: bool):
+        """
+        启用/暂停Context的资源类型屏蔽（登录节点执行期间暂停，登录成功后启用）
+        :param context: Context
+        :param enabled: 是否屏蔽
+        """
+        if enabled:
+            self._blocking_contexts.add(context)
+        else:
+            self._blocking_contexts.discard(context)
+
+    def _make_block_resource_type(self, context: BrowserContext):
+        async def _block_resource_type(route: Route):
+            if context in self._blocking_contexts and route.request.resource_type in self.block_resource_types:
+                await route.abort("blockedbyclient")
+            else:
+                await route.fallback()
+
+        return _block_resource_type
+
+    @staticmethod
+    async def _abort(route: Route):
+        await route.abort("blockedbyclient")
+
+    @staticmethod
+    def _make_fulfill(stub_rule: StubRule):
+        async def _fulfill(route: Route):
+            await route.fulfill(status=stub_rule.status, body=stub_rule.body, content_type=stub_rule.content_type)
+
+        return _fulfill
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+
+from src.frame.common.rate_limiter import RateLimiterRegistry
+from src.utils import MACUtils, Md5Utils
+from src.utils.sys_path_utils import SysPathUtils
+
+
+class SessionCache:
+    """
+    会话缓存：登录成功后保存Context的storage_state（cookies、localStorage），按(用户名, 站点)存储，
+    新建Context时恢复，登录节点校验会话有效后跳过登录（省去验证码识别和登录页加载）
+    1. 加密：AES-GCM，密钥由本机随机密钥文件和MAC地址派生，缓存文件复制到其它机器无法解密
+    2. 过期：超过有效期的缓存读取时删除
+    线程安全：同一站点的多个批次（多个执行线程）共享同一份缓存；文件读写为同步操作，协程中请用asyncio.to_thread调用
+    """
+    KEY_FILE = "session.key"
+    NONCE_SIZE = 12
+    TAG_SIZE = 16
+
+    def __init__(self, root: Optional[Path] = None):
+        """
+        :param root: 缓存目录，默认为数据目录下的session_cache
+        """
+        self._root = Path(root) if root else None
+        self._lock = threading.Lock()
+        self._key: Optional[bytes] = None
+
+    @property
+    def root(self) -> Path:
+        if self._root is None:
+            self._root = Path(SysPathUtils.get_data_file_dir(), "session_cache")
+        return self._root
+
+    def _get_key(self) -> bytes:
+        """加载密钥（首次使用时生成随机密钥文件）"""
+        with self._lock:
+            if self._key is None:
+                self.root.mkdir(parents=True, exist_ok=True)
+                key_path = self.root / self.KEY_FILE
+                if not key_path.exists():
+                    # 多个进程同时生成密钥时只有一个生效：临时文件硬链接到密钥文件，已存在则失败
+                    tmp_path = key_path.with_name(f"{self.KEY_FILE}.{os.getpid()}.tmp")
+                    tmp_path.write_bytes(get_random_bytes(32))
+                    try:
+                        os.link(tmp_path, key_path)
+                    except FileExistsError:
+                        pass
+                    finally:
+                        tmp_path.unlink()
+                self._key = hashlib.sha256(key_path.read_bytes() + MACUtils.get_mac_address().encode()).digest()
+            return self._key
+
+    def _path(self, username: str, domain: str) -> Path:
+        return self.root / f"{Md5Utils.encrypt(f'{username}|{RateLimiterRegistry.normalize_domain(domain)}')}.session"
+
+    def load(self, username: str, domain: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的会话
+        :param username: 用户名
+        :param domain: 目标站点，tb_task_tmpl.domain
+        :param ttl_seconds: 有效期（秒）
+        :return: storage_state，不存在、已过期或无法解密时返回None
+        """
+        path = self._path(username, domain)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            nonce, tag, ciphertext = (data[:self.NONCE_SIZE], data[self.NONCE_SIZE:self.NONCE_SIZE + self.TAG_SIZE],
+                                      data[self.NONCE_SIZE + self.TAG_SIZE:])
+            cipher = AES.new(self._get_key(), AES.MODE_GCM, nonce=nonce)
+            # 文件名作为附加数据，缓存文件不能被替换为其它用户的文件
+            cipher.update(path.name.encode())
+            payload = json.loads(cipher.decrypt_and_verify(ciphertext, tag))
+        except (ValueError, KeyError):
+            # 密钥变化（更换机器）或文件损坏
+            self._remove(path)
+            return None
+        if time.time() - payload.get("saved_at", 0) > ttl_seconds:
+            self._remove(path)
+            return None
+        return payload.get("storage_state")
+
+    def save(self, username: str, domain: str, storage_state: Dict[str, Any]):
+        """
+        保存会话
+        :param username: 用户名
+        :param domain: 目标站点
+        :param storage_state: Context的storage_state
+        """
+        path = self._path(username, domain)
+        cipher = AES.new(self._get_key(), AES.MODE_GCM, nonce=get_random_bytes(self.NONCE_SIZE))
+        cipher.update(path.name.encode())
+        ciphertext, tag = cipher.encrypt_and_digest(
+            json.dumps({"saved_at": time.time(), "storage_state": storage_state}, ensure_ascii=False).encode("utf-8"))
+        self._write_atomic(path, cipher.nonce + tag + ciphertext)
+
+    def invalidate(self, username: str, domain: str):
+        """删除缓存的会话（会话已失效）"""
+        self._remove(self._path(username, domain))
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        # 先写临时文件再替换，并发读取时不会读到写了一半的文件
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}_{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def get_session_ttl_seconds(global_config: Optional[Dict[str, Any]]) -> int:
+    """
+    读取批次全局配置session_cache_ttl_minutes（会话缓存有效期，分钟），0、未配置或配置有误-不启用会话缓存
+    :return: 有效期（秒）
+    """
+    try:
+        return max(0, int((global_config or {}).get("session_cache_ttl_minutes", 0) or 0)) * 60
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_session_domain(task_config: Optional[Dict[str, Any]]) -> str:
+    """
+    会话缓存的站点（缓存键）：任务模板的站点domain，未配置时取登录节点的登录地址login_url
+    登录节点保存/校验会话、驱动管理器新建Context时恢复会话，须使用同一个站点
+    :param task_config: 任务批次配置
+    """
+    task_config = task_config or {}
+    domain = (task_config.get("task_tmpl") or {}).get("domain")
+    if domain:
+        return domain
+    for node_config in task_config.get("task_nodes") or []:
+        login_url = (node_config.get("node_params") or {}).get("login_url")
+        if login_url:
+            return login_url
+    return ""
+
+
+# 全局唯一会话缓存
+session_cache = SessionCache()
@@ -1,7 +1,7 @@
 import logging
 import threading
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Any, List, Tuple
 
 from openpyxl import Workbook, load_workbook
 from openpyxl.cell import Cell
@@ -24,10 +24,29 @@ class UserInfoLocation:
     password_end_cell: str
 
 
+@dataclass
+class CellUpdate:
+    """单元格更新：定位用户名所在单元格后，按列偏移更新"""
+    # 用户名
+    username: str
+    # 更新的值
+    value: Any
+    # 相对用户名单元格的列偏移
+    offset: int
+    # 是否追加到原内容后（;分隔）
+    is_append: bool = False
+    # 仅当单元格为空时更新
+    only_if_empty: bool = False
+
+
 class UserManager:
     """
     用户信息操作类
     """
+    # 写Excel的方法（跨进程代理、后台写入代理据此区分读写）
+    WRITE_METHODS = frozenset({"batch_update_learning_status", "update_login_msg_by_username",
+                               "update_subject_by_username", "update_record_by_username",
+                               "update_user_realname_by_username", "update_learning_status"})
     lock = threading.RLock()
     default_load_counts = 10
     realname_cell_to_username_offset = 2
@@ -83,6 +102,51 @@ class UserManager:
             self.lock.release()
         return ret
 
+    def batch_update_by_username(self, cell_updates: List[CellUpdate]) -> bool:
+        """
+        批量更新单元格：只加载、保存一次文档
+        :param cell_updates: 单元格更新列表，按顺序执行
+        :return: True-全部更新成功；False-存在更新失败
+        """
+        self.lock.acquire()
+        ret = True
+        error_msg_prefix = "批量更新用户文档失败"
+        workbook: Workbook = None
+        try:
+            workbook: Workbook = load_workbook(filename=self.workbook_addr)
+            worksheet: Worksheet = workbook[self.sheet_name]
+            if worksheet is not None:
+                for cell_update in cell_updates:
+                    if cell_update.only_if_empty:
+                        username_cell = self._locate_username_cell(cell_update.username, worksheet)
+                        if username_cell is not None:
+                            target_cell: Cell = username_cell.offset(0, cell_update.offset)
+                            if target_cell.value is not None and len(str(target_cell.value).strip()) > 0:
+                                continue
+                    if not self._update_val_by_username(workbook, worksheet, cell_update.username, cell_update.value,
+                                                        cell_update.offset, cell_update.is_append):
+                        ret = False
+            else:
+                # 找不到工作簿的情况
+                logging.error("%s，文档【%s】中找不到工作簿【%s】" % (error_msg_prefix, self.workbook_addr, self.sheet_name))
+                ret = False
+        except PermissionError:
+            logging.error("%s，文档【%s】保存失败，请关闭文档！" % (error_msg_prefix, self.workbook_addr))
+            ret = False
+        except Exception as e:
+            logging.error("%s，文档【%s】保存失败：" % (error_msg_prefix, self.workbook_addr), exc_info=True)
+            ret = False
+        finally:
+            if workbook is not None:
+                try:
+                    workbook.save(self.workbook_addr)
+                    workbook.close()
+                except:
+                    ret = False
+                    logging.error("用户文件未关闭，无法更新")
+            self.lock.release()
+        return ret
+
     def update_login_msg_by_username(self, username, login_error_desc: str, is_append_update_info=True):
         """
         更新用户登录信息
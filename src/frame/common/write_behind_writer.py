@@ -0,0 +1,194 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.frame.common.user_manager import CellUpdate, UserManager
+from src.frame.dao.db_manager import db
+
+# 写入操作类型
+OP_USER_COUNT = "user_count"  # 批次成功/失败用户数累加：(OP_USER_COUNT, 批次号, 是否成功)
+OP_USER_FINISHED = "user_finished"  # 用户执行完毕记录：(OP_USER_FINISHED, 批次号, 用户名, 是否成功)
+OP_CELL_UPDATE = "cell_update"  # Excel单元格更新：(OP_CELL_UPDATE, 用户管理器, [CellUpdate])
+OP_FLUSH = "flush"  # 落盘屏障：(OP_FLUSH, threading.Event)
+
+
+class WriteBehindWriter:
+    """
+    后台写入器（write-behind）：自动化任务所在的事件循环只负责投递写入操作，由专属写入线程落盘，事件循环从不等待磁盘
+    1. 投递：线程安全的无界队列，put不阻塞，任何线程/事件循环中均可直接调用
+    2. 合并：写入线程每次取出队列中积压的全部操作（并等待一个合并窗口），
+       同批次的成功/失败用户数累加合并为一条UPDATE，用户执行记录、同一文档的单元格更新各合并为一个事务/一次加载保存
+    3. 落盘屏障：flush()等待此前投递的所有操作落盘，批次结束、读取执行记录前调用，保证数据一致
+    """
+    COALESCE_SECONDS = 0.2  # 合并窗口（秒）
+
+    def __init__(self, logger=logging):
+        self.logger = logger
+        self._queue: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_started(self):
+        if self._thread:
+            return
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._run, name="WriteBehindWriter", daemon=True)
+            self._thread.start()
+            # 程序正常退出前落盘
+            atexit.register(self.flush)
+
+    def _put(self, op: tuple):
+        self._ensure_started()
+        self._queue.put(op)
+
+    def add_user_count(self, batch_no: str, is_success: bool):
+        """
+        累加批次成功/失败用户数
+        :param batch_no: 批次号
+        :param is_success: 是否成功
+        """
+        self._put((OP_USER_COUNT, batch_no, is_success))
+
+    def mark_user_finished(self, batch_no: str, username: str, is_success: bool):
+        """
+        记录用户执行完毕
+        :param batch_no: 批次号
+        :param username: 用户名
+        :param is_success: 是否成功
+        """
+        self._put((OP_USER_FINISHED, batch_no, username, is_success))
+
+    def update_cells(self, user_manager: UserManager, cell_updates: List[CellUpdate]):
+        """
+        更新用户文档的单元格
+        :param user_manager: 用户管理器
+        :param cell_updates: 单元格更新列表
+        """
+        if cell_updates:
+            self._put((OP_CELL_UPDATE, user_manager, cell_updates))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待此前投递的所有写入操作落盘（阻塞，协程中请用asyncio.to_thread调用）
+        :param timeout: 最长等待时间（秒），None-一直等待
+        :return: 是否已落盘
+        """
+        if not self._thread or threading.current_thread() is self._thread:
+            return True
+        done_event = threading.Event()
+        self._queue.put((OP_FLUSH, done_event))
+        return done_event.wait(timeout)
+
+    def _run(self):
+        while True:
+            ops = [self._queue.get()]
+            if ops[0][0] != OP_FLUSH:
+                # 等待合并窗口，让短时间内的连续写入合并到同一个事务
+                time.sleep(self.COALESCE_SECONDS)
+            while True:
+                try:
+                    ops.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(ops)
+
+    def _write(self, ops: List[tuple]):
+        user_counts: Dict[str, List[int]] = {}
+        finished_users: Dict[Tuple[str, str], bool] = {}
+        cell_updates: Dict[int, Tuple[UserManager, List[CellUpdate]]] = {}
+        flush_events: List[threading.Event] = []
+        for op in ops:
+            op_type = op[0]
+            if op_type == OP_USER_COUNT:
+                _, batch_no, is_success = op
+                counts = user_counts.setdefault(batch_no, [0, 0])
+                counts[0 if is_success else 1] += 1
+            elif op_type == OP_USER_FINISHED:
+                _, batch_no, username, is_success = op
+                # 同一用户以最后一次结果为准
+                finished_users[(batch_no, username)] = is_success
+            elif op_type == OP_CELL_UPDATE:
+                _, user_manager, updates = op
+                cell_updates.setdefault(id(user_manager), (user_manager, []))[1].extend(updates)
+            elif op_type == OP_FLUSH:
+                flush_events.append(op[1])
+
+        try:
+            if user_counts:
+                db.task_batch_dao.add_user_counts(
+                    {batch_no: (success, fail) for batch_no, (success, fail) in user_counts.items()})
+        except Exception as e:
+            self.logger.error(f"后台写入批次用户数失败：{str(e)}")
+        try:
+            if finished_users:
+                db.task_batch_user_dao.mark_finished_many(
+                    [(batch_no, username, is_success) for (batch_no, username), is_success in finished_users.items()])
+        except Exception as e:
+            self.logger.error(f"后台写入用户执行记录失败：{str(e)}")
+        for user_manager, updates in cell_updates.values():
+            try:
+                if not user_manager.batch_update_by_username(updates):
+                    self.logger.warning(f"后台更新用户文档【{user_manager.workbook_addr}】存在失败的单元格")
+            except Exception as e:
+                self.logger.error(f"后台更新用户文档【{user_manager.workbook_addr}】失败：{str(e)}")
+        for flush_event in flush_events:
+            flush_event.set()
+
+
+class WriteBehindUserManager:
+    """
+    用户管理器的后台写入代理
+    写操作转换为单元格更新投递给后台写入器，立即返回（按成功处理，失败由写入线程记录日志）；
+    读操作先等待待写入数据落盘，再在调用线程中直接执行，保证读到最新值（阻塞，协程中请用asyncio.to_thread调用，
+    节点中使用BaseNode.get_user_cell_val）
+    """
+
+    def __init__(self, user_manager: UserManager, writer: "WriteBehindWriter" = None):
+        self._user_manager = user_manager
+        self._writer = writer or write_behind_writer
+
+    def __getattr__(self, name):
+        attr = getattr(self._user_manager, name)
+        if not callable(attr) or name in UserManager.WRITE_METHODS:
+            return attr
+
+        def _read(*args, **kwargs):
+            self._writer.flush()
+            return attr(*args, **kwargs)
+
+        return _read
+
+    def _update(self, *cell_updates: CellUpdate) -> bool:
+        self._writer.update_cells(self._user_manager, list(cell_updates))
+        return True
+
+    def batch_update_learning_status(self, user_update_infos: List[Tuple[str, Any]]) -> bool:
+        return self._update(*[CellUpdate(username, learning_status, UserManager.remark_cell_to_username_offset, True)
+                              for username, learning_status in user_update_infos or []])
+
+    def update_login_msg_by_username(self, username, login_error_desc: str, is_append_update_info=True) -> bool:
+        return self._update(CellUpdate(username, login_error_desc, UserManager.login_error_desc_cell_to_username_offset,
+                                       is_append_update_info))
+
+    def update_subject_by_username(self, username, subject_str: str) -> bool:
+        return self._update(CellUpdate(username, subject_str, UserManager.subject_cell_to_username_offset))
+
+    def update_record_by_username(self, username, field_dict: dict, is_append_update_info=False) -> bool:
+        return self._update(*[CellUpdate(username, v, k, is_append_update_info) for k, v in field_dict.items()])
+
+    def update_user_realname_by_username(self, username, realname) -> bool:
+        return self._update(CellUpdate(username, realname, UserManager.realname_cell_to_username_offset,
+                                       only_if_empty=True))
+
+    def update_learning_status(self, username: str, status_des: str, is_append_update_info=True) -> bool:
+        return self._update(CellUpdate(username, status_des, UserManager.remark_cell_to_username_offset,
+                                       is_append_update_info))
+
+
+# 全局唯一后台写入器
+write_behind_writer = WriteBehindWriter()
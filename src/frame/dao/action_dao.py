@@ -32,7 +32,7 @@ CREATE TABLE IF NOT EXISTS tb_action (
     def get_by_id(self, action_id: int) -> Optional[Dict[str, Any]]:
         """根据主键ID获取记录"""
         sql = "SELECT * FROM tb_action WHERE id = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (action_id,)).fetchone()
             node = self.dict_from_row(row)
         return node
@@ -46,7 +46,7 @@ CREATE TABLE IF NOT EXISTS tb_action (
         sql = "SELECT COUNT(*) AS total FROM tb_action"
         where_criteria, params = self.create_query_criteria(batch_no, project_id)
         sql += where_criteria
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, params).fetchone()
         return row["total"] if row else 0
 
@@ -102,7 +102,7 @@ CREATE TABLE IF NOT EXISTS tb_action (
         params.extend([page_size, offset])
 
         # 执行查询
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql, params).fetchall()
         return [self.dict_from_row(row) for row in rows]
 
@@ -132,7 +132,7 @@ CREATE TABLE IF NOT EXISTS tb_action (
 
     def get_all(self) -> List[Dict[str, Any]]:
         sql = """SELECT * FROM tb_action"""
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql).fetchall()
             rows_ = [self.dict_from_row(row) for row in rows]
             return rows_
@@ -2,11 +2,13 @@ import json
 import logging
 import os
 import sqlite3
+import threading
 from abc import abstractmethod
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
+from src.frame.dao.search_index import SearchIndex
 from src.utils.sys_path_utils import SysPathUtils
 
 
@@ -35,13 +37,137 @@ data_dir.mkdir(parents=True, exist_ok=True)
 DB_FILE_PATH = str(data_dir.joinpath("frame_config.db"))
 # logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 # logger = logging.getLogger("BaseDB")
-SQLITE_CONNECT_ARGS = {"check_same_thread": False}
+# 长连接复用预编译语句：语句缓存按SQL文本命中，IN (?, ?, ...)的占位符个数不同即为不同语句，调大缓存数
+SQLITE_CONNECT_ARGS = {"check_same_thread": False, "timeout": 10, "cached_statements": 256}
+# 连接参数：WAL模式下读写互不阻塞；NORMAL同步级别在WAL模式下断电最多丢失最后的事务，不会损坏数据库；页缓存16MB
+SQLITE_PRAGMAS = ("PRAGMA foreign_keys = ON", "PRAGMA synchronous = NORMAL", "PRAGMA cache_size = -16000",
+                  "PRAGMA temp_store = MEMORY")
+
+
+class ConnectionPool:
+    """
+    SQLite连接池（每个数据库文件一个）：连接长期复用，不再每次操作都建立、关闭连接
+    1. 写连接：全局共用一个，同一时间只有一个线程持有（进程内写操作串行，避免写锁竞争导致的database is locked）
+    2. 读连接：按需创建，线程取用期间独占，用完归还复用（UI的数据库工作线程是一次性线程，按线程缓存连接无法复用）
+    3. 持有写连接的线程再取读连接时，直接使用写连接（读到本事务尚未提交的数据）
+    子进程（多进程批次）中首次使用时重建连接，不复用父进程的连接
+    """
+    MAX_IDLE_READERS = 8  # 最多保留的空闲读连接数
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._pid = os.getpid()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0  # 写连接的嵌套层数，只在最外层提交
+        self._writer_owner: Optional[int] = None
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, **SQLITE_CONNECT_ARGS)
+        if not readonly:
+            # WAL模式持久保存在数据库文件中，由写连接设置
+            conn.execute("PRAGMA journal_mode = WAL")
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            # fork出的子进程：丢弃父进程的连接（不关闭，避免影响父进程）
+            self._pid = os.getpid()
+            self._writer = None
+            self._writer_lock = threading.RLock()
+            self._writer_depth = 0
+            self._writer_owner = None
+            self._readers = []
+
+    @contextmanager
+    def writer(self):
+        """独占写连接：退出时提交（嵌套时在最外层提交），异常时回滚"""
+        self._check_pid()
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+            conn = self._writer
+            self._writer_depth += 1
+            self._writer_owner = threading.get_ident()
+            try:
+                yield conn
+                if self._writer_depth == 1:
+                    conn.commit()
+            except BaseException:
+                if self._writer_depth == 1:
+                    conn.rollback()
+                raise
+            finally:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer_owner = None
+
+    @contextmanager
+    def reader(self):
+        """取用读连接，用完归还"""
+        self._check_pid()
+        if self._writer_owner == threading.get_ident():
+            # 当前线程正在写事务中
+            yield self._writer
+            return
+        with self._readers_lock:
+            conn = self._readers.pop() if self._readers else None
+        if conn is None:
+            conn = self._connect(readonly=True)
+        try:
+            yield conn
+        finally:
+            # 结束可能未结束的读事务，释放WAL快照
+            if conn.in_transaction:
+                conn.rollback()
+            with self._readers_lock:
+                if len(self._readers) < self.MAX_IDLE_READERS:
+                    self._readers.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def close(self):
+        """关闭所有连接"""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(db_path: str = DB_FILE_PATH) -> ConnectionPool:
+    """获取数据库文件的连接池（所有DAO共用）"""
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = _pools[db_path] = ConnectionPool(db_path)
+    return pool
 
 
 class BaseDB:
+    db_path = DB_FILE_PATH  # 数据库文件
+
     def __init__(self, logger=logging):
         """实例化时自动初始化数据库（建表+建索引+建触发器）"""
         self.logger = logger
+        self.pool = get_connection_pool(self.db_path)
         self.init_database()
 
     def init_database(self) -> None:
@@ -51,29 +177,32 @@ class BaseDB:
             # 读取并执行修正后的完整建表SQL
             init_sql = self.get_init_sql()
             cursor.executescript(init_sql)
+            for search_index in self.get_search_indexes():
+                search_index.create(conn, self.logger)
         self.logger.info("数据库初始化完成：表、索引、触发器已创建/更新")
 
     @abstractmethod
     def get_init_sql(self):
         pass
 
+    def get_search_indexes(self) -> List[SearchIndex]:
+        """模糊查询的全文索引，初始化数据库时创建"""
+        return []
+
     @contextmanager
-    def get_db_connection(self):
-        conn = None
+    def get_db_connection(self, readonly: bool = False):
+        """
+        从连接池取用连接（连接不关闭，归还后复用）
+        :param readonly: True-只读查询，使用读连接，与写操作并发执行；False-写连接，退出时提交，异常时回滚
+        """
         try:
-            conn = sqlite3.connect(str(os.path.join(SysPathUtils.get_config_file_dir(), DB_FILE_PATH)), **SQLITE_CONNECT_ARGS)
-            conn.execute("PRAGMA foreign_keys = ON")
-            conn.row_factory = sqlite3.Row
-            # 开启SQL执行日志
-            # conn.set_trace_callback(print)
-            yield conn
-            conn.commit()
+            with (self.pool.reader() if readonly else self.pool.writer()) as conn:
+                # 开启SQL执行日志
+                # conn.set_trace_callback(print)
+                yield conn
         except sqlite3.Error as e:
-            if conn: conn.rollback()
             self.logger.error(f"数据库错误：{str(e)}")
             raise e
-        finally:
-            if conn: conn.close()
 
     @staticmethod
     def json_serialize(data: Any) -> str:
@@ -1,12 +1,20 @@
+import logging
 import math
 from typing import Dict, Any, Optional, List, Tuple
 
 from src.frame.common.exceptions import BusinessException
 from src.frame.dao.base_db import BaseDB
+from src.frame.dao.pagination import KeysetPaginator, table_stats_sql
+from src.frame.dao.search_index import SearchIndex
 
 
 class DataDictDAO(BaseDB):
 
+    def __init__(self, logger=logging):
+        self.paginator = KeysetPaginator("tb_data_dict")
+        self.search_index = SearchIndex("tb_data_dict", ("key",))
+        super().__init__(logger)
+
     def get_init_sql(self):
         """返回完整的建表/索引/触发器SQL"""
         sql = """
@@ -19,8 +27,12 @@ class DataDictDAO(BaseDB):
             remark TEXT DEFAULT NULL,
             create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );"""
-        return sql.strip()
+        );
+        CREATE INDEX IF NOT EXISTS idx_tb_data_dict_create_time ON tb_data_dict(create_time);  -- 分页：按创建时间倒序"""
+        return sql.strip() + "\n" + table_stats_sql("tb_data_dict", ("create_time", "key"))
+
+    def get_search_indexes(self) -> List[SearchIndex]:
+        return [self.search_index]
 
     def add_one(self, data_dict_info: Dict[str, Any]) -> int | None:
         sql = """INSERT INTO tb_data_dict (key, value, name, remark) VALUES (?, ?, ?, ?)"""
@@ -79,7 +91,7 @@ class DataDictDAO(BaseDB):
 
     def get_by_id(self, data_dict_id: str):
         sql = """SELECT * FROM tb_data_dict WHERE id = ?"""
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (data_dict_id,)).fetchone()
             return self.dict_from_row(row)
 
@@ -119,7 +131,7 @@ class DataDictDAO(BaseDB):
 
     def get_by_key(self, key: str) -> Optional[Dict[str, Any]]:
         sql = "SELECT * FROM tb_data_dict WHERE key = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (key,)).fetchone()
         return self.dict_from_row(row)
 
@@ -129,7 +141,7 @@ class DataDictDAO(BaseDB):
         :return:
         """
         sql = "select * from tb_data_dict"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql).fetchall()
         return [self.dict_from_row(row) for row in rows]
 
@@ -140,16 +152,15 @@ class DataDictDAO(BaseDB):
         :param filter_key: 可选筛选条件 - 按字典key模糊匹配，None查全部
         :return: 符合条件的总条数
         """
-        sql = "SELECT COUNT(*) AS total FROM tb_data_dict"
-        params = []
+        where_conditions, params = [], []
         # 支持按key模糊筛选（数据字典高频筛选场景）
         if filter_key and filter_key.strip():
-            sql += " WHERE `key` LIKE ?"
-            params.append(f"%{filter_key.strip()}%")
+            condition, param = self.search_index.like_condition("key", filter_key.strip())
+            where_conditions.append(condition)
+            params.append(param)
 
-        with self.get_db_connection() as conn:
-            row = conn.execute(sql, params).fetchone()
-        return row["total"] if row else 0
+        with self.get_db_connection(readonly=True) as conn:
+            return self.paginator.count(conn, where_conditions, params)
 
     def get_list_by_page(self,
                          page_num: int = 1,
@@ -168,22 +179,17 @@ class DataDictDAO(BaseDB):
         if page_size < 1 or page_size > 100:  # 限制最大页条数，保护性能
             page_size = 10
 
-        # SQLite分页核心：LIMIT 条数 OFFSET 偏移量（偏移量=(页码-1)*页大小）
-        offset = (page_num - 1) * page_size
-        sql = "SELECT * FROM tb_data_dict"
-        params = []
+        where_conditions, params = [], []
 
         # 拼接筛选条件
         if filter_key and filter_key.strip():
-            sql += " WHERE `key` LIKE ?"
-            params.append(f"%{filter_key.strip()}%")
+            condition, param = self.search_index.like_condition("key", filter_key.strip())
+            where_conditions.append(condition)
+            params.append(param)
 
-        # 排序+分页（按创建时间倒序，最新新增的在前）
-        sql += " ORDER BY create_time DESC LIMIT ? OFFSET ?"
-        params.extend([page_size, offset])
-
-        with self.get_db_connection() as conn:
-            rows = conn.execute(sql, params).fetchall()
+        # 排序+分页（按创建时间倒序，最新新增的在前），键集分页
+        with self.get_db_connection(readonly=True) as conn:
+            rows = self.paginator.fetch_page(conn, where_conditions, params, page_num, page_size)
         return [self.dict_from_row(row) for row in rows]
 
     def get_page_data(self,
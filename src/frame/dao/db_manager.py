@@ -9,6 +9,7 @@ from src.frame.dao.base_db import BaseDB
 from src.frame.dao.data_dict_dao import DataDictDAO
 from src.frame.dao.project_dao import ProjectDAO
 from src.frame.dao.task_batch_dao import TaskBatchDAO
+from src.frame.dao.task_batch_user_dao import TaskBatchUserDAO
 from src.frame.dao.task_tmpl_dao import TaskTmplDAO
 from src.frame.dao.task_node_mapping_dao import TaskTmplNodeMappingDAO
 from src.frame.dao.task_tmpl_config_dao import TaskTmplConfigDAO
@@ -27,6 +28,7 @@ class DBManager(BaseDB):
         self.task_tmpl_config_dao = TaskTmplConfigDAO(logger)
         self.data_dict_dao = DataDictDAO(logger)
         self.task_batch_dao = TaskBatchDAO(logger)
+        self.task_batch_user_dao = TaskBatchUserDAO(logger)
         self.action_dao = ActionDAO(logger)
 
     def get_init_sql(self):
@@ -62,7 +64,7 @@ class DBManager(BaseDB):
             ORDER BY t2.create_time ASC
         """
         try:
-            with self.get_db_connection() as conn:
+            with self.get_db_connection(readonly=True) as conn:
                 rows = conn.execute(sql, (task_tmpl_id,)).fetchall()
 
             # 数据二次加工：JSON字符串反序列化为字典 + 字段整合（UI直接使用）
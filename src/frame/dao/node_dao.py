@@ -1,16 +1,39 @@
-import json
+import logging
 from typing import Dict, List, Optional, Any, Tuple
 
 from src.frame.common.decorator.singleton import singleton
 from src.frame.common.exceptions import BusinessException
 from src.frame.dao.base_db import BaseDB
+from src.frame.dao.pagination import KeysetPaginator, table_stats_sql
+from src.frame.dao.search_index import SearchIndex
+from src.frame.dao.row_mapper import JsonField, RowRecord
 from src.frame.dao.task_node_mapping_dao import TaskTmplNodeMappingDAO
 
 
+class NodeRecord(RowRecord):
+    """tb_node 行记录"""
+    __slots__ = ("id", "code", "name", "component_path", "type", "description", "node_params", "status",
+                 "create_time", "update_time")
+    JSON_FIELDS = {"node_params": JsonField("tb_node", "node_params")}
+
+
+class TaskTmplNodeRecord(RowRecord):
+    """任务模板绑定的节点：tb_node 关联 tb_task_tmpl_node_mapping"""
+    __slots__ = ("id", "node_id", "code", "name", "component_path", "type", "description", "native_node_params",
+                 "status", "task_tmpl_id", "pre_node_id", "next_node_id", "bind_node_params", "node_params")
+    JSON_FIELDS = {"bind_node_params": JsonField("tb_task_tmpl_node_mapping", "node_params", update_time_field=None),
+                   "native_node_params": JsonField("tb_node", "node_params", "node_id", None)}
+
+
 @singleton
 class NodeDAO(BaseDB):
     """tb_node 表专属操作类"""
 
+    def __init__(self, logger=logging):
+        self.paginator = KeysetPaginator("tb_node")
+        self.search_index = SearchIndex("tb_node", ("name", "code"))
+        super().__init__(logger)
+
     def get_init_sql(self) -> str:
         """返回完整的建表/索引/触发器SQL"""
         sql = """
@@ -29,8 +52,14 @@ CREATE TABLE IF NOT EXISTS tb_node (
 CREATE INDEX IF NOT EXISTS idx_tb_node_type ON tb_node(type);
 CREATE INDEX IF NOT EXISTS idx_tb_code ON tb_node(code); -- 业务码加唯一索引
 CREATE INDEX IF NOT EXISTS idx_tb_node_status ON tb_node(status); -- 新增状态索引，方便筛选启用节点
+-- 分页：按创建时间倒序，以及按类型+创建时间
+CREATE INDEX IF NOT EXISTS idx_tb_node_create_time ON tb_node(create_time);
+CREATE INDEX IF NOT EXISTS idx_tb_node_type_create_time ON tb_node(type, create_time);
 """
-        return sql.strip()
+        return sql.strip() + "\n" + table_stats_sql("tb_node", ("create_time", "type", "name", "code"))
+
+    def get_search_indexes(self) -> List[SearchIndex]:
+        return [self.search_index]
 
     def add_one(self, node_info: Dict[str, Any]) -> int | None:
         # ✅ 第一步：校验ID是否已存在
@@ -48,11 +77,9 @@ CREATE INDEX IF NOT EXISTS idx_tb_node_status ON tb_node(status); -- 新增状
 
     def get_by_id(self, node_id: str) -> Optional[Dict[str, Any]]:
         sql = "SELECT * FROM tb_node WHERE id = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (node_id,)).fetchone()
-            node = self.dict_from_row(row)
-            if node: node["node_params"] = self.json_deserialize(node["node_params"])
-        return node
+        return NodeRecord.from_row(row) or {}
 
     def get_by_task_tmpl_id(self, task_tmpl_id: int):
         sql = """
@@ -62,38 +89,27 @@ FROM tb_node t1
 LEFT JOIN tb_task_tmpl_node_mapping t2 ON t1.id = t2.node_id
 WHERE t2.task_tmpl_id = ?
 """
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql, (task_tmpl_id,)).fetchall()
-        # 数据二次加工：JSON字符串反序列化为字典 + 字段整合（UI直接使用）
-        result_list = []
-        for row in rows:
-            row_dict = self.dict_from_row(row)  # 转为字典（复用BaseDB的方法）
-            # JSON反序列化（绑定参数+节点原生参数）
-            row_dict["bind_node_params"] = json.loads(row_dict["bind_node_params"]) if row_dict[
-                "bind_node_params"] else {}
-            row_dict["native_node_params"] = json.loads(row_dict["native_node_params"]) if row_dict[
-                "native_node_params"] else {}
-            row_dict["node_params"] = {**row_dict["native_node_params"], **row_dict["bind_node_params"]}
-            result_list.append(row_dict)
+        # 数据二次加工：JSON字符串反序列化为字典（按行缓存） + 字段整合（UI直接使用）
+        result_list = TaskTmplNodeRecord.from_rows(rows)
+        for record in result_list:
+            record["node_params"] = {**record["native_node_params"], **record["bind_node_params"]}
         return result_list
 
     def get_list(self, node_type: Optional[str] = None) -> List[Dict[str, Any]]:
         sql = "SELECT * FROM tb_node"
         params = []
         if node_type: sql += " WHERE type = ?"; params.append(node_type)
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql, params).fetchall()
-        node_list = [self.dict_from_row(row) for row in rows]
-        for node in node_list: node["node_params"] = self.json_deserialize(node["node_params"])
-        return node_list
+        return NodeRecord.from_rows(rows)
 
     def get_by_code(self, code: str) -> Optional[Dict[str, Any]]:
         sql = "SELECT * FROM tb_node WHERE code = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (code,)).fetchone()
-            node = self.dict_from_row(row)
-            if node: node["node_params"] = self.json_deserialize(node["node_params"])
-        return node
+        return NodeRecord.from_row(row) or {}
 
     def delete_node(self, node_id: str) -> bool:
         """删除节点时，先检查该节点是否被任务引用，如果被引用则不允许删除"""
@@ -186,7 +202,6 @@ WHERE t2.task_tmpl_id = ?
     def get_total_count(self, node_type: Optional[str] = None, name: Optional[str] = None,
                         code: Optional[str] = None) -> int:
         """获取节点总条数（支持按业务类型筛选，分页必备）"""
-        sql = "SELECT COUNT(*) AS total FROM tb_node"
         params = []
         where_conditions = []  # 条件集合，自动拼接
 
@@ -196,20 +211,17 @@ WHERE t2.task_tmpl_id = ?
             params.append(node_type.strip())
         # 条件2：新增任务名称模糊筛选（核心优化）
         if name and name.strip():
-            where_conditions.append("name LIKE ?")
-            params.append(f"%{name.strip()}%")
+            condition, param = self.search_index.like_condition("name", name.strip())
+            where_conditions.append(condition)
+            params.append(param)
         # 条件3：新增编号模糊筛选（核心优化）
         if code and code.strip():
-            where_conditions.append("code LIKE ?")
-            params.append(f"%{code.strip()}%")
-
-        # 拼接多条件（多个条件用AND连接，无则不拼接）
-        if where_conditions:
-            sql += " WHERE " + " AND ".join(where_conditions)
+            condition, param = self.search_index.like_condition("code", code.strip())
+            where_conditions.append(condition)
+            params.append(param)
 
-        with self.get_db_connection() as conn:
-            row = conn.execute(sql, params).fetchone()
-        return row["total"] if row else 0
+        with self.get_db_connection(readonly=True) as conn:
+            return self.paginator.count(conn, where_conditions, params)
 
     def get_list_by_page(self,
                          page_num: int = 1,
@@ -230,9 +242,6 @@ WHERE t2.task_tmpl_id = ?
         if page_num < 1: page_num = 1
         if page_size < 1 or page_size > 100: page_size = 10  # 限制最大页条数，防性能问题
 
-        # SQLite分页核心语法：LIMIT 条数 OFFSET 偏移量（偏移量=(页码-1)*页大小）
-        offset = (page_num - 1) * page_size
-        sql = "SELECT * FROM tb_node"
         params = []
         where_conditions = []
 
@@ -241,22 +250,19 @@ WHERE t2.task_tmpl_id = ?
             where_conditions.append("type = ?")
             params.append(node_type.strip())
         if name and name.strip():
-            where_conditions.append("name LIKE ?")
-            params.append(f"%{name.strip()}%")
+            condition, param = self.search_index.like_condition("name", name.strip())
+            where_conditions.append(condition)
+            params.append(param)
         if code and code.strip():
-            where_conditions.append("code LIKE ?")
-            params.append(f"%{code.strip()}%")
+            condition, param = self.search_index.like_condition("code", code.strip())
+            where_conditions.append(condition)
+            params.append(param)
 
-        if where_conditions:
-            sql += " WHERE " + " AND ".join(where_conditions)
-        # 拼接分页+排序（按创建时间倒序，最新任务在前，符合业务习惯）
-        sql += " ORDER BY create_time DESC LIMIT ? OFFSET ?"
-        params.extend([page_size, offset])
-
-        # 执行查询
-        with self.get_db_connection() as conn:
-            rows = conn.execute(sql, params).fetchall()
-            return [self.dict_from_row(row) for row in rows]
+        # 按创建时间倒序（最新节点在前），键集分页
+        with self.get_db_connection(readonly=True) as conn:
+            rows = self.paginator.fetch_page(conn, where_conditions, params, page_num, page_size)
+        # 列表展示原始JSON字符串，不解码
+        return NodeRecord.from_rows(rows, decode_json=False)
 
     def get_page_data(self,
                       page_num: int = 1,
@@ -275,7 +281,7 @@ WHERE t2.task_tmpl_id = ?
 
     def get_all(self) -> List[Dict[str, Any]]:
         sql = """SELECT * FROM tb_node"""
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql).fetchall()
             rows_ = [self.dict_from_row(row) for row in rows]
             return rows_
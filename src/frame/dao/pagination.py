@@ -0,0 +1,179 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+STATS_TABLE = "tb_table_stats"
+
+
+def table_stats_sql(table: str, watch_columns: Sequence[str]) -> str:
+    """
+    表统计的建表/触发器SQL：触发器维护表的总行数和版本号
+    版本号在新增、删除、修改筛选字段或排序字段时递增，分页的总数缓存、翻页位置以版本号判断是否失效
+    :param table: 表名
+    :param watch_columns: 筛选字段和排序字段，修改这些字段时递增版本号
+    """
+    return f"""
+CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+    table_name TEXT PRIMARY KEY,
+    row_count INTEGER NOT NULL DEFAULT 0,  -- 总行数
+    version INTEGER NOT NULL DEFAULT 0  -- 数据版本：新增、删除、修改筛选字段时递增
+);
+INSERT OR IGNORE INTO {STATS_TABLE} (table_name, row_count)
+    SELECT '{table}', COUNT(*) FROM {table} WHERE NOT EXISTS (SELECT 1 FROM {STATS_TABLE} WHERE table_name = '{table}');
+CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_insert AFTER INSERT ON {table} BEGIN
+    UPDATE {STATS_TABLE} SET row_count = row_count + 1, version = version + 1 WHERE table_name = '{table}';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_delete AFTER DELETE ON {table} BEGIN
+    UPDATE {STATS_TABLE} SET row_count = row_count - 1, version = version + 1 WHERE table_name = '{table}';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_update AFTER UPDATE OF {', '.join(watch_columns)} ON {table} BEGIN
+    UPDATE {STATS_TABLE} SET version = version + 1 WHERE table_name = '{table}';
+END;
+""".strip()
+
+
+class _PageState:
+    """同一查询条件的分页状态：总数、已访问页的首尾位置(create_time, id)"""
+    __slots__ = ("version", "total", "anchors")
+
+    def __init__(self, version: int):
+        self.version = version
+        self.total: Optional[int] = None
+        self.anchors: Dict[Tuple[int, int], Tuple[tuple, tuple]] = {}  # (页大小, 页码) -> (首行位置, 末行位置)
+
+
+class KeysetPaginator:
+    """
+    分页查询（按create_time DESC, id DESC排序）：
+    1. 键集分页：记录已访问页的首尾位置，上一页/下一页从相邻页的位置定位（WHERE (create_time, id) < (?, ?)），
+       与页码无关，翻到多深都是常数时间
+    2. 跳页：从最近的已访问页、首页、末页（倒序查询）中选跳过行数最少的起点，跳过的行只走(筛选字段, create_time)索引
+    3. 总数：无筛选条件时取触发器维护的总行数，有筛选条件时按表版本号缓存
+    先查出当前页的ID（只查索引），再按ID取整行（可关联其它表）
+    线程安全；排序字段create_time不能为NULL
+    """
+    MAX_STATES = 64  # 最多缓存的查询条件数
+    MAX_ANCHORS = 512  # 每个查询条件最多记录的页数
+
+    def __init__(self, table: str, select_sql: Optional[str] = None, id_column: str = "id"):
+        """
+        :param table: 表名
+        :param select_sql: 取整行的SQL（不含WHERE），默认SELECT * FROM 表名
+        :param id_column: select_sql中主键的字段名（有表别名时需带别名，如t1.id）
+        """
+        self.table = table
+        self.select_sql = select_sql or f"SELECT * FROM {table}"
+        self.id_column = id_column
+        self._states: "OrderedDict[tuple, _PageState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _version(self, conn: sqlite3.Connection) -> Tuple[Optional[int], Optional[int]]:
+        """:return: (总行数, 版本号)，未建统计表时为(None, None)"""
+        try:
+            row = conn.execute(f"SELECT row_count, version FROM {STATS_TABLE} WHERE table_name = ?",
+                               (self.table,)).fetchone()
+        except sqlite3.OperationalError:
+            return None, None
+        return (row[0], row[1]) if row else (None, None)
+
+    def _state(self, key: tuple, version: Optional[int]) -> Optional[_PageState]:
+        if version is None:
+            return None
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or state.version != version:
+                state = self._states[key] = _PageState(version)
+            self._states.move_to_end(key)
+            while len(self._states) > self.MAX_STATES:
+                self._states.popitem(last=False)
+            return state
+
+    @staticmethod
+    def _where(conditions: Sequence[str]) -> str:
+        return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+    def count(self, conn: sqlite3.Connection, conditions: Sequence[str], params: Sequence[Any]) -> int:
+        """
+        查询总数
+        :param conn: 数据库连接
+        :param conditions: 筛选条件（AND连接），只能引用本表字段
+        :param params: 筛选条件的参数
+        """
+        row_count, version = self._version(conn)
+        if not conditions and row_count is not None:
+            return row_count
+        state = self._state((tuple(conditions), tuple(params)), version)
+        if state is not None and state.total is not None:
+            return state.total
+        total = conn.execute(f"SELECT COUNT(*) FROM {self.table}{self._where(conditions)}", params).fetchone()[0]
+        if state is not None:
+            state.total = total
+        return total
+
+    def fetch_page(self, conn: sqlite3.Connection, conditions: Sequence[str], params: Sequence[Any],
+                   page_num: int, page_size: int) -> List[sqlite3.Row]:
+        """
+        查询一页
+        :param conn: 数据库连接
+        :param conditions: 筛选条件（AND连接），只能引用本表字段
+        :param params: 筛选条件的参数
+        :param page_num: 页码，从1开始
+        :param page_size: 每页条数
+        :return: 当前页的行（按create_time DESC, id DESC排序）
+        """
+        row_count, version = self._version(conn)
+        state = self._state((tuple(conditions), tuple(params)), version)
+        total = row_count if not conditions else (state.total if state is not None else None)
+        seek, descending, skip, limit = self._plan(state, total, page_num, page_size)
+        if limit <= 0:
+            return []
+
+        where_conditions, where_params = list(conditions), list(params)
+        if seek is not None:
+            where_conditions.append(f"(create_time, id) {'<' if descending else '>'} (?, ?)")
+            where_params.extend(seek)
+        order = "DESC" if descending else "ASC"
+        keys = conn.execute(f"SELECT create_time, id FROM {self.table}{self._where(where_conditions)} "
+                            f"ORDER BY create_time {order}, id {order} LIMIT ? OFFSET ?",
+                            where_params + [limit, skip]).fetchall()
+        keys = [tuple(key) for key in (keys if descending else reversed(keys))]
+        if not keys:
+            return []
+        if state is not None and keys[0][0] is not None and keys[-1][0] is not None:
+            with self._lock:
+                if len(state.anchors) >= self.MAX_ANCHORS:
+                    state.anchors.clear()
+                state.anchors[(page_size, page_num)] = (keys[0], keys[-1])
+
+        ids = [key[1] for key in keys]
+        rows = conn.execute(f"{self.select_sql} WHERE {self.id_column} IN ({', '.join(['?'] * len(ids))})",
+                            ids).fetchall()
+        positions = {row_id: index for index, row_id in enumerate(ids)}
+        return sorted(rows, key=lambda row: positions[row["id"]])
+
+    def _plan(self, state: Optional[_PageState], total: Optional[int], page_num: int,
+              page_size: int) -> Tuple[Optional[tuple], bool, int, int]:
+        """
+        选择跳过行数最少的起点
+        :return: (定位位置, 是否倒序, 跳过行数, 查询行数)
+        """
+        # 从首页开始
+        best = (None, True, (page_num - 1) * page_size, page_size)
+        if total is not None:
+            # 从末页开始（正序查询后反转），最后一页不满一页时只取剩余的行
+            skip = total - page_num * page_size
+            if max(skip, 0) < best[2]:
+                best = (None, False, max(skip, 0), page_size + min(skip, 0))
+        if state is None or best[2] == 0:
+            return best
+        with self._lock:
+            anchors = [(page, anchor) for (size, page), anchor in state.anchors.items() if size == page_size]
+        for page, (first_key, last_key) in anchors:
+            if page < page_num and (page_num - 1 - page) * page_size < best[2]:
+                # 从前面的已访问页往后
+                best = (last_key, True, (page_num - 1 - page) * page_size, page_size)
+            elif page > page_num and (page - page_num - 1) * page_size < best[2]:
+                # 从后面的已访问页往前（正序查询后反转）
+                best = (first_key, False, (page - page_num - 1) * page_size, page_size)
+        return best
@@ -1,8 +1,11 @@
+import logging
 from typing import Dict, Optional, Any, List, Tuple
 
 from src.frame.common.decorator.singleton import singleton
 from src.frame.common.exceptions import BusinessException
 from src.frame.dao.base_db import BaseDB
+from src.frame.dao.pagination import KeysetPaginator, table_stats_sql
+from src.frame.dao.search_index import SearchIndex
 from src.frame.dao.task_tmpl_dao import TaskTmplDAO
 
 
@@ -10,6 +13,11 @@ from src.frame.dao.task_tmpl_dao import TaskTmplDAO
 class ProjectDAO(BaseDB):
     """tb_project 表专属操作类"""
 
+    def __init__(self, logger=logging):
+        self.paginator = KeysetPaginator("tb_project")
+        self.search_index = SearchIndex("tb_project", ("name",))
+        super().__init__(logger)
+
     def get_init_sql(self) -> str:
         """返回完整的建表/索引/触发器SQL"""
         sql = """
@@ -20,8 +28,12 @@ CREATE TABLE IF NOT EXISTS tb_project (
     create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS idx_tb_project_create_time ON tb_project(create_time);  -- 分页：按创建时间倒序
 """
-        return sql.strip()
+        return sql.strip() + "\n" + table_stats_sql("tb_project", ("create_time", "name"))
+
+    def get_search_indexes(self) -> List[SearchIndex]:
+        return [self.search_index]
 
     def add_one(self, project_info: Dict[str, Any]) -> int | None:
         if not project_info.get("name") or not project_info.get("name").strip():
@@ -43,14 +55,14 @@ CREATE TABLE IF NOT EXISTS tb_project (
 
     def get_by_name(self, project_name: str) -> Optional[Dict[str, Any]]:
         sql = """SELECT * FROM tb_project WHERE name = ?"""
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (project_name,)).fetchone()
             node = self.dict_from_row(row)
         return node
 
     def get_by_id(self, project_id: str) -> Optional[Dict[str, Any]]:
         sql = "SELECT * FROM tb_project WHERE id = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (project_id,)).fetchone()
             node = self.dict_from_row(row)
         return node
@@ -106,22 +118,17 @@ CREATE TABLE IF NOT EXISTS tb_project (
 
     def get_total_count(self, name: Optional[str] = None) -> int:
         """获取项目总条数（支持按名称模糊筛选，分页必备）"""
-        sql = "SELECT COUNT(*) AS total FROM tb_project"
         params = []
         where_conditions = []  # 条件集合，自动拼接
 
         # 条件1：新增任务名称模糊筛选（核心优化）
         if name and name.strip():
-            where_conditions.append("name LIKE ?")
-            params.append(f"%{name.strip()}%")
+            condition, param = self.search_index.like_condition("name", name.strip())
+            where_conditions.append(condition)
+            params.append(param)
 
-        # 拼接多条件（多个条件用AND连接，无则不拼接）
-        if where_conditions:
-            sql += " WHERE " + " ".join(where_conditions)
-
-        with self.get_db_connection() as conn:
-            row = conn.execute(sql, params).fetchone()
-        return row["total"] if row else 0
+        with self.get_db_connection(readonly=True) as conn:
+            return self.paginator.count(conn, where_conditions, params)
 
     def get_list_by_page(self,
                          page_num: int = 1,
@@ -138,26 +145,18 @@ CREATE TABLE IF NOT EXISTS tb_project (
         if page_num < 1: page_num = 1
         if page_size < 1 or page_size > 100: page_size = 10  # 限制最大页条数，防性能问题
 
-        # SQLite分页核心语法：LIMIT 条数 OFFSET 偏移量（偏移量=(页码-1)*页大小）
-        offset = (page_num - 1) * page_size
-        sql = "SELECT * FROM tb_project"
         params = []
         where_conditions = []
 
         # 拼接筛选条件
         if name and name.strip():
-            where_conditions.append("name LIKE ?")
-            params.append(f"%{name.strip()}%")
-
-        if where_conditions:
-            sql += " WHERE " + " ".join(where_conditions)
-        # 拼接分页+排序（按创建时间倒序，最新任务在前，符合业务习惯）
-        sql += " ORDER BY create_time DESC LIMIT ? OFFSET ?"
-        params.extend([page_size, offset])
+            condition, param = self.search_index.like_condition("name", name.strip())
+            where_conditions.append(condition)
+            params.append(param)
 
-        # 执行查询
-        with self.get_db_connection() as conn:
-            rows = conn.execute(sql, params).fetchall()
+        # 按创建时间倒序（最新项目在前，符合业务习惯），键集分页
+        with self.get_db_connection(readonly=True) as conn:
+            rows = self.paginator.fetch_page(conn, where_conditions, params, page_num, page_size)
         return [self.dict_from_row(row) for row in rows]
 
     def get_page_data(self,
@@ -185,7 +184,7 @@ CREATE TABLE IF NOT EXISTS tb_project (
 
     def get_all(self) -> List[Dict[str, Any]]:
         sql = """SELECT * FROM tb_project"""
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql).fetchall()
             rows_ = [self.dict_from_row(row) for row in rows]
             return rows_
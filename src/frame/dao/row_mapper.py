@@ -0,0 +1,204 @@
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class JsonField(NamedTuple):
+    """JSON字段的来源：解码结果按(表名, 字段名, 行ID, 更新时间)缓存"""
+    table: str  # 来源表
+    column: str  # 来源表中的字段名（关联查询中可能是别名）
+    id_field: str = "id"  # 记录中来源表主键的字段名
+    update_time_field: Optional[str] = "update_time"  # 记录中来源表更新时间的字段名，无更新时间的表为None
+
+
+def _shallow_copy(value: Any) -> Any:
+    return dict(value) if isinstance(value, dict) else list(value) if isinstance(value, list) else value
+
+
+class JsonFieldCache:
+    """
+    JSON字段解码缓存（LRU）：同一行的JSON字段未变化时不再重复解析，如分页刷新批次列表、500个用户加载同一模板的节点
+    1. 键为(表名, 字段名, 行ID, 更新时间)，命中时再比较原始字符串（更新时间精确到秒，同一秒内的两次修改也能识别）
+    2. 返回顶层副本（dict/list），调用方可以增删、替换键；嵌套的对象是共用的，不要原地修改
+    线程安全
+    """
+    MAX_SIZE = 4096  # 最多缓存的字段数
+
+    def __init__(self, max_size: int = MAX_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def loads(raw: Optional[str]) -> Any:
+        """解析JSON字符串，空值或格式错误时返回{}（同BaseDB.json_deserialize）"""
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except (TypeError, ValueError):
+            return {}
+
+    def decode(self, table: str, column: str, row_id: Any, update_time: Any, raw: Optional[str]) -> Any:
+        """
+        解码JSON字段
+        :param table: 表名
+        :param column: 字段名
+        :param row_id: 行ID，为None时不缓存
+        :param update_time: 行的更新时间，无更新时间的表传None
+        :param raw: JSON字符串
+        :return: 解码结果（顶层副本）
+        """
+        if not raw or row_id is None:
+            return self.loads(raw)
+        key = (table, column, row_id, update_time)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == raw:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _shallow_copy(entry[1])
+            self.misses += 1
+        value = self.loads(raw)
+        with self._lock:
+            self._entries[key] = (raw, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return _shallow_copy(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+# 全局唯一JSON字段解码缓存（所有DAO共用）
+json_field_cache = JsonFieldCache()
+
+
+class RowRecord(MutableMapping):
+    """
+    行记录基类：子类在__slots__中声明表的字段，比dict节省内存；实现了dict的读写接口（[]、get、keys、items、in等），
+    调用方按原来使用dict的方式使用即可，需要真正的dict时（如json.dumps）调用to_dict()
+    1. 查询结果中未声明的字段（如关联查询的别名）、调用方新增的键存放在_extra中
+    2. JSON_FIELDS中的字段在from_row时解码，解码结果经json_field_cache缓存
+    """
+    __slots__ = ("_extra",)
+    JSON_FIELDS: Dict[str, JsonField] = {}
+    _fields: Tuple[str, ...] = ()
+    _field_set: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        slots = cls.__dict__.get("__slots__", ())
+        for name in slots:
+            # 字段名不能覆盖dict的接口（如keys、items、get）
+            if hasattr(RowRecord, name):
+                raise TypeError(f"{cls.__name__}的字段名{name}与记录的方法重名")
+        cls._fields = cls._fields + tuple(slots)
+        cls._field_set = frozenset(cls._fields)
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **kwargs):
+        self._extra = None
+        if data:
+            self.update(data)
+        if kwargs:
+            self.update(kwargs)
+
+    @classmethod
+    def from_row(cls, row: Optional[sqlite3.Row], decode_json: bool = True) -> Optional["RowRecord"]:
+        """
+        由查询结果行创建记录
+        :param row: 查询结果行
+        :param decode_json: 是否解码JSON_FIELDS中的字段
+        :return: 记录，row为空时返回None
+        """
+        if row is None:
+            return None
+        record = cls.__new__(cls)
+        record._extra = None
+        field_set = cls._field_set
+        for name, value in zip(row.keys(), row):
+            if name in field_set:
+                object.__setattr__(record, name, value)
+            else:
+                record[name] = value
+        if decode_json:
+            for name, spec in cls.JSON_FIELDS.items():
+                raw = record.get(name)
+                if isinstance(raw, str) or raw is None:
+                    record[name] = json_field_cache.decode(
+                        spec.table, spec.column, record.get(spec.id_field),
+                        record.get(spec.update_time_field) if spec.update_time_field else None, raw)
+        return record
+
+    @classmethod
+    def from_rows(cls, rows: List[sqlite3.Row], decode_json: bool = True) -> List["RowRecord"]:
+        return [cls.from_row(row, decode_json) for row in rows]
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._field_set:
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._field_set:
+            try:
+                object.__delattr__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._fields:
+            try:
+                object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+            yield name
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._field_set:
+            try:
+                object.__getattribute__(self, key)
+            except AttributeError:
+                return False
+            return True
+        return self._extra is not None and key in self._extra
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: self[name] for name in self}
+
+    def copy(self) -> Dict[str, Any]:
+        """同dict.copy：返回dict"""
+        return self.to_dict()
@@ -0,0 +1,79 @@
+import sqlite3
+from typing import Sequence, Tuple
+
+
+class SearchIndex:
+    """
+    模糊查询的全文索引：FTS5外部内容表（trigram分词），触发器随业务表新增、删除、修改同步
+    trigram分词支持对FTS5表执行LIKE '%关键字%'并走索引（关键字至少3个字符），匹配规则与业务表上的LIKE相同
+    （不区分大小写，%和_为通配符），只是不再全表扫描
+    关键字不足3个字符、含通配符（trigram无法走索引，反而要扫描整个全文索引）、或SQLite不支持FTS5/trigram时仍在业务表上LIKE
+    """
+    MIN_KEYWORD_LENGTH = 3  # trigram分词可以走索引的最短关键字
+
+    def __init__(self, table: str, columns: Sequence[str]):
+        """
+        :param table: 业务表（主键为id）
+        :param columns: 需要模糊查询的字段
+        """
+        self.table = table
+        self.columns = tuple(columns)
+        self.fts_table = f"fts_{table}"
+        self.enabled = False  # 全文索引是否可用，create成功后为True
+
+    @property
+    def trigger_names(self) -> Tuple[str, ...]:
+        return tuple(f"trg_{self.table}_fts_{action}" for action in ("insert", "delete", "update"))
+
+    def get_init_sql(self) -> str:
+        """返回全文索引的建表/触发器SQL"""
+        columns = ", ".join(self.columns)
+        new_values = ", ".join(f"new.{column}" for column in self.columns)
+        old_values = ", ".join(f"old.{column}" for column in self.columns)
+        insert_trigger, delete_trigger, update_trigger = self.trigger_names
+        return f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5({columns}, content='{self.table}', content_rowid='id',
+    tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS {insert_trigger} AFTER INSERT ON {self.table} BEGIN
+    INSERT INTO {self.fts_table}(rowid, {columns}) VALUES (new.id, {new_values});
+END;
+CREATE TRIGGER IF NOT EXISTS {delete_trigger} AFTER DELETE ON {self.table} BEGIN
+    INSERT INTO {self.fts_table}({self.fts_table}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+END;
+CREATE TRIGGER IF NOT EXISTS {update_trigger} AFTER UPDATE OF {columns} ON {self.table} BEGIN
+    INSERT INTO {self.fts_table}({self.fts_table}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+    INSERT INTO {self.fts_table}(rowid, {columns}) VALUES (new.id, {new_values});
+END;
+""".strip()
+
+    def create(self, conn: sqlite3.Connection, logger) -> bool:
+        """
+        创建全文索引和同步触发器：首次创建（或触发器缺失，索引可能已过期）时从业务表重建索引
+        SQLite不支持FTS5/trigram时删除同步触发器（否则业务表无法写入），模糊查询退回业务表上的LIKE
+        :return: 全文索引是否可用
+        """
+        existing = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE name IN ({})".format(", ".join(["?"] * 4)),
+            (self.fts_table,) + self.trigger_names).fetchall()}
+        try:
+            conn.executescript(self.get_init_sql())
+            if self.fts_table not in existing or not existing.issuperset(self.trigger_names):
+                conn.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+            self.enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"全文索引不可用，模糊查询使用LIKE | 表：{self.table}，原因：{str(e)}")
+            for trigger_name in self.trigger_names:
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+            self.enabled = False
+        return self.enabled
+
+    def like_condition(self, column: str, keyword: str) -> Tuple[str, str]:
+        """
+        模糊查询条件：column LIKE '%keyword%'
+        :param column: 字段，须在columns中
+        :param keyword: 关键字（已去除首尾空格）
+        :return: (查询条件, 参数)
+        """
+        if self.enabled and len(keyword) >= self.MIN_KEYWORD_LENGTH and "%" not in keyword and "_" not in keyword:
+            return f"id IN (SELECT rowid FROM {self.fts_table} WHERE {column} LIKE ?)", f"%{keyword}%"
+        return f"{column} LIKE ?", f"%{keyword}%"
@@ -1,14 +1,32 @@
+import logging
 from typing import Dict, Optional, Any, List, Tuple
 
 from src.frame.common.decorator.singleton import singleton
 from src.frame.common.exceptions import BusinessException
 from src.frame.dao.base_db import BaseDB
+from src.frame.dao.pagination import KeysetPaginator, table_stats_sql
+from src.frame.dao.row_mapper import JsonField, RowRecord
+from src.frame.dao.search_index import SearchIndex
+
+
+class TaskBatchRecord(RowRecord):
+    """tb_task_batch 行记录"""
+    __slots__ = ("id", "task_tmpl_id", "task_tmpl_name", "business_type", "project_id", "project_name", "user_info",
+                 "priority", "queue_time", "execute_status", "run_mode", "user_mode", "global_config", "batch_no",
+                 "action_id", "total_user", "success_user", "fail_user", "remark", "create_time", "update_time")
+    JSON_FIELDS = {"user_info": JsonField("tb_task_batch", "user_info"),
+                   "global_config": JsonField("tb_task_batch", "global_config")}
 
 
 @singleton
 class TaskBatchDAO(BaseDB):
     """tb_task_batch 表专属操作类"""
 
+    def __init__(self, logger=logging):
+        self.paginator = KeysetPaginator("tb_task_batch")
+        self.search_index = SearchIndex("tb_task_batch", ("batch_no", "project_name"))
+        super().__init__(logger)
+
     def get_init_sql(self) -> str:
         """返回完整的建表/索引/触发器SQL"""
         sql = """
@@ -39,8 +57,17 @@ CREATE TABLE IF NOT EXISTS tb_task_batch (
 CREATE INDEX IF NOT EXISTS idx_tb_task_batch_tmpl_id ON tb_task_batch(task_tmpl_id);
 CREATE INDEX IF NOT EXISTS idx_tb_task_batch_batch_no ON tb_task_batch(batch_no);
 CREATE INDEX IF NOT EXISTS idx_tb_task_batch_status ON tb_task_batch(execute_status);
+-- 分页：按创建时间倒序，以及按筛选字段+创建时间
+CREATE INDEX IF NOT EXISTS idx_tb_task_batch_create_time ON tb_task_batch(create_time);
+CREATE INDEX IF NOT EXISTS idx_tb_task_batch_run_mode_create_time ON tb_task_batch(run_mode, create_time);
+CREATE INDEX IF NOT EXISTS idx_tb_task_batch_project_id_create_time ON tb_task_batch(project_id, create_time);
+CREATE INDEX IF NOT EXISTS idx_tb_task_batch_status_queue_time ON tb_task_batch(execute_status, queue_time);
 """
-        return sql.strip()
+        return sql.strip() + "\n" + table_stats_sql(
+            "tb_task_batch", ("create_time", "batch_no", "project_name", "project_id", "run_mode"))
+
+    def get_search_indexes(self) -> List[SearchIndex]:
+        return [self.search_index]
 
     def add_one(self, task_batch: Dict[str, Any]) -> int:
         if self.get_by_batch_no(task_batch["batch_no"]):
@@ -80,52 +107,46 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_batch_status ON tb_task_batch(execute_sta
 
     def get_by_batch_no(self, batch_no: str) -> Optional[Dict[str, Any]]:
         sql = """SELECT * FROM tb_task_batch WHERE batch_no = ?"""
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (batch_no,)).fetchone()
-            row_ = self.dict_from_row(row)
-            if row_:
-                row_["user_info"] = self.json_deserialize(row_["user_info"])
-                row_["global_config"] = self.json_deserialize(row_["global_config"])
-        return row_
+        return TaskBatchRecord.from_row(row) or {}
 
     def get_by_batch_nos(self, batch_nos: List[str]) -> List[Dict[str, Any]]:
         """根据批次号列表批量获取记录"""
         sql = "SELECT * FROM tb_task_batch WHERE batch_no IN ({})".format(", ".join(["?"] * len(batch_nos)))
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql, batch_nos).fetchall()
-            rows_ = [self.dict_from_row(row) for row in rows]
-            for row in rows_:
-                row["user_info"] = self.json_deserialize(row["user_info"])
-                row["global_config"] = self.json_deserialize(row["global_config"])
-        return rows_
+        return TaskBatchRecord.from_rows(rows)
+
+    def get_by_status(self, execute_status: int) -> List[Dict[str, Any]]:
+        """根据批次状态获取记录（按加入队列的时间升序）"""
+        sql = "SELECT * FROM tb_task_batch WHERE execute_status = ? ORDER BY queue_time ASC"
+        with self.get_db_connection(readonly=True) as conn:
+            rows = conn.execute(sql, (execute_status,)).fetchall()
+        return TaskBatchRecord.from_rows(rows)
 
     def get_by_id(self, batch_id: str) -> Optional[Dict[str, Any]]:
         """根据主键ID获取记录"""
         sql = "SELECT * FROM tb_task_batch WHERE id = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (batch_id,)).fetchone()
-            row_ = self.dict_from_row(row)
-            if row_:
-                row_["user_info"] = self.json_deserialize(row_["user_info"])
-                row_["global_config"] = self.json_deserialize(row_["global_config"])
-        return row_
+        return TaskBatchRecord.from_row(row) or {}
 
     def get_by_ids(self, batch_ids: List[str]) -> List[Dict[str, Any]]:
         """根据主键ID列表批量获取记录"""
         sql = "SELECT * FROM tb_task_batch WHERE id IN ({})".format(", ".join(["?"] * len(batch_ids)))
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql, batch_ids).fetchall()
-            rows_ = [self.dict_from_row(row) for row in rows]
-            for row in rows_:
-                row["user_info"] = self.json_deserialize(row["user_info"])
-                row["global_config"] = self.json_deserialize(row["global_config"])
-        return rows_
+        return TaskBatchRecord.from_rows(rows)
 
     def delete_one(self, batch_id: int) -> bool:
         """删除任务批次"""
         sql = """DELETE FROM tb_task_batch WHERE id = ?"""
         try:
             with self.get_db_connection() as conn:
+                # 同时删除批次的用户执行记录
+                conn.execute("""DELETE FROM tb_task_batch_user WHERE batch_no IN (SELECT batch_no FROM tb_task_batch 
+                WHERE id = ?)""", (batch_id,))
                 conn.execute(sql, (batch_id,))
             return True
         except:
@@ -175,7 +196,7 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_batch_status ON tb_task_batch(execute_sta
         sql = f"UPDATE tb_task_batch SET success_user=success_user+1, update_time = datetime('now', 'localtime') WHERE batch_no = ?"
         # 4. 执行更新
         with self.get_db_connection() as conn:
-            conn.execute(sql)
+            conn.execute(sql, (batch_no,))
 
     def add_one_fail_user(self, batch_no: str):
         record = self.get_by_batch_no(batch_no)
@@ -184,7 +205,19 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_batch_status ON tb_task_batch(execute_sta
         sql = f"UPDATE tb_task_batch SET fail_user=fail_user+1, update_time = datetime('now', 'localtime') WHERE batch_no = ?"
         # 4. 执行更新
         with self.get_db_connection() as conn:
-            conn.execute(sql)
+            conn.execute(sql, (batch_no,))
+
+    def add_user_counts(self, user_counts: Dict[str, Tuple[int, int]]):
+        """
+        批量累加批次成功/失败用户数（同一事务）
+        :param user_counts: 批次号 -> (成功用户增量, 失败用户增量)
+        """
+        if not user_counts:
+            return
+        sql = """UPDATE tb_task_batch SET success_user = success_user + ?, fail_user = fail_user + ?,
+        update_time = datetime('now', 'localtime') WHERE batch_no = ?"""
+        with self.get_db_connection() as conn:
+            conn.executemany(sql, [(success, fail, batch_no) for batch_no, (success, fail) in user_counts.items()])
 
     def update_by_batch_no(self, batch_no: str, update_info: Dict[str, Any]):
         """
@@ -240,45 +273,38 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_batch_status ON tb_task_batch(execute_sta
         :param project_id: 可选，按项目ID筛选，None则查全部
         :param run_mode: 可选，运行模式，None则查全部
         """
-        sql = "SELECT COUNT(*) AS total FROM tb_task_batch"
-        where_criteria, params = self.create_query_criteria(batch_no, project_name, project_id, run_mode)
-        sql += where_criteria
-        with self.get_db_connection() as conn:
-            row = conn.execute(sql, params).fetchone()
-        return row["total"] if row else 0
+        where_conditions, params = self.create_query_criteria(batch_no, project_name, project_id, run_mode)
+        with self.get_db_connection(readonly=True) as conn:
+            return self.paginator.count(conn, where_conditions, params)
 
     def create_query_criteria(self, batch_no: Optional[str] = None, project_name: Optional[str] = None,
                               project_id: Optional[int] = None, run_mode: Optional[int] = None) -> Tuple[
-        str, List[Any]]:
+        List[str], List[Any]]:
         """
         创建查询条件
         :param batch_no: 可选，按批次号筛选，支持全模糊查询，None则查全部
         :param project_name: 可选，按项目名称筛选，支持全模糊查询，None则查全部
         :param project_id: 可选，按项目ID筛选，None则查全部
         :param run_mode: 可选，运行模式，None则查全部
-        :return: Tuple[str, List[Any]] (where子句, 查询参数列表)
+        :return: Tuple[List[str], List[Any]] (查询条件列表（AND连接）, 查询参数列表)
         """
         where_conditions = []
         params = []
         # 拼接筛选条件
-        if batch_no and batch_no.strip():
-            where_conditions.append("batch_no LIKE ?")
-            params.append(f"%{batch_no.strip()}%")
-        if project_name and project_name.strip():
-            where_conditions.append("project_name LIKE ?")
-            params.append(f"%{project_name.strip()}%")
+        # 模糊查询走全文索引
+        for column, keyword in (("batch_no", batch_no), ("project_name", project_name)):
+            if keyword and keyword.strip():
+                condition, param = self.search_index.like_condition(column, keyword.strip())
+                where_conditions.append(condition)
+                params.append(param)
         if project_id is not None:
             where_conditions.append("project_id=?")
-            params.append(f"%{project_id}%")
+            params.append(project_id)
         if run_mode is not None:
             where_conditions.append("run_mode=?")
-            params.append(f"{run_mode}")
-
-        sql = ""
-        if where_conditions:
-            sql += " WHERE " + " ".join(where_conditions)
+            params.append(run_mode)
 
-        return sql, params
+        return where_conditions, params
 
     def get_list_by_page(self,
                          page_num: int = 1,
@@ -300,21 +326,13 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_batch_status ON tb_task_batch(execute_sta
         # 边界值校验（防异常）
         if page_num < 1: page_num = 1
         if page_size < 1 or page_size > 100: page_size = 10  # 限制最大页条数，防性能问题
-        # SQLite分页核心语法：LIMIT 条数 OFFSET 偏移量（偏移量=(页码-1)*页大小）
-        offset = (page_num - 1) * page_size
 
-        sql = "SELECT * FROM tb_task_batch"
-        where_criteria, params = self.create_query_criteria(batch_no, project_name, project_id, run_mode)
-        sql += where_criteria
-
-        # 拼接分页+排序（按创建时间倒序，最新任务在前，符合业务习惯）
-        sql += " ORDER BY create_time DESC LIMIT ? OFFSET ?"
-        params.extend([page_size, offset])
-
-        # 执行查询
-        with self.get_db_connection() as conn:
-            rows = conn.execute(sql, params).fetchall()
-        return [self.dict_from_row(row) for row in rows]
+        # 按创建时间倒序（最新任务在前，符合业务习惯），键集分页，深页与首页耗时相同
+        where_conditions, params = self.create_query_criteria(batch_no, project_name, project_id, run_mode)
+        with self.get_db_connection(readonly=True) as conn:
+            rows = self.paginator.fetch_page(conn, where_conditions, params, page_num, page_size)
+        # 列表展示原始JSON字符串，不解码
+        return TaskBatchRecord.from_rows(rows, decode_json=False)
 
     def get_page_data(self,
                       page_num: int = 1,
@@ -351,16 +369,15 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_batch_status ON tb_task_batch(execute_sta
 
     def get_all(self) -> List[Dict[str, Any]]:
         sql = """SELECT * FROM tb_task_batch"""
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql).fetchall()
-            rows_ = [self.dict_from_row(row) for row in rows]
-            for row in rows_:
-                row["user_info"] = self.json_deserialize(row["user_info"])
-                row["global_config"] = self.json_deserialize(row["global_config"])
-            return rows_
+        return TaskBatchRecord.from_rows(rows)
 
     def delete_by_ids(self, batch_ids: List[int]):
         with self.get_db_connection() as conn:
             batch_ids_placeholders = ','.join(['?'] * len(batch_ids))
+            # 同时删除批次的用户执行记录
+            conn.execute("""DELETE FROM tb_task_batch_user WHERE batch_no IN (SELECT batch_no FROM tb_task_batch 
+            WHERE id IN (%s))""" % batch_ids_placeholders, batch_ids)
             sql = """DELETE FROM tb_task_batch WHERE id IN (%s)""" % batch_ids_placeholders
             conn.execute(sql, batch_ids)
@@ -0,0 +1,82 @@
+from typing import Dict, Iterable, Set, Tuple
+
+from src.frame.common.decorator.singleton import singleton
+from src.frame.dao.base_db import BaseDB
+
+
+@singleton
+class TaskBatchUserDAO(BaseDB):
+    """
+    tb_task_batch_user 表专属操作类：记录批次中已执行完毕的用户，程序重启后恢复的批次（见BatchJobQueue.recover）
+    执行成功的用户不再重复执行
+    已结束/已取消的批次重新设为待运行（重新运行整个批次）时，由触发器清空其用户记录
+    """
+
+    def get_init_sql(self) -> str:
+        """返回完整的建表/索引/触发器SQL"""
+        sql = """
+CREATE TABLE IF NOT EXISTS tb_task_batch_user (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_no VARCHAR(50) NOT NULL,  -- 批次号，关联tb_task_batch.batch_no
+    username TEXT NOT NULL,  -- 用户名
+    is_success INTEGER NOT NULL DEFAULT 0,  -- 执行结果：0-失败 1-成功
+    create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (batch_no, username)
+);
+CREATE INDEX IF NOT EXISTS idx_tb_task_batch_user_batch_no ON tb_task_batch_user(batch_no);
+CREATE TRIGGER IF NOT EXISTS trg_tb_task_batch_requeue_users AFTER UPDATE OF execute_status ON tb_task_batch
+    WHEN old.execute_status IN (2, 3) AND new.execute_status = 0 BEGIN
+    DELETE FROM tb_task_batch_user WHERE batch_no = new.batch_no;
+END;
+"""
+        return sql.strip()
+
+    def mark_finished(self, batch_no: str, username: str, is_success: bool):
+        """
+        记录用户执行完毕（已存在则覆盖执行结果）
+        :param batch_no: 批次号
+        :param username: 用户名
+        :param is_success: 是否成功
+        """
+        sql = """INSERT INTO tb_task_batch_user (batch_no, username, is_success) VALUES (?, ?, ?)
+        ON CONFLICT(batch_no, username) DO UPDATE SET is_success = excluded.is_success,
+        update_time = datetime('now', 'localtime')"""
+        with self.get_db_connection() as conn:
+            conn.execute(sql, (batch_no, username, 1 if is_success else 0))
+
+    def mark_finished_many(self, records: Iterable[Tuple[str, str, bool]]):
+        """
+        批量记录用户执行完毕（同一事务）
+        :param records: [(批次号, 用户名, 是否成功)]
+        """
+        sql = """INSERT INTO tb_task_batch_user (batch_no, username, is_success) VALUES (?, ?, ?)
+        ON CONFLICT(batch_no, username) DO UPDATE SET is_success = excluded.is_success,
+        update_time = datetime('now', 'localtime')"""
+        with self.get_db_connection() as conn:
+            conn.executemany(sql, [(batch_no, username, 1 if is_success else 0)
+                                   for batch_no, username, is_success in records])
+
+    def delete_failed(self, batch_no: str):
+        """删除批次中执行失败的用户记录（重新运行批次时失败的用户重新执行、重新计数）"""
+        sql = """DELETE FROM tb_task_batch_user WHERE batch_no = ? AND is_success = 0"""
+        with self.get_db_connection() as conn:
+            conn.execute(sql, (batch_no,))
+
+    def get_success_usernames(self, batch_no: str) -> Set[str]:
+        """获取批次中执行成功的用户名"""
+        sql = """SELECT username FROM tb_task_batch_user WHERE batch_no = ? AND is_success = 1"""
+        with self.get_db_connection(readonly=True) as conn:
+            rows = conn.execute(sql, (batch_no,)).fetchall()
+        return {row["username"] for row in rows}
+
+    def count_by_result(self, batch_no: str) -> Dict[str, int]:
+        """
+        统计批次中已执行完毕的用户数
+        :return: {"success_user": 成功数, "fail_user": 失败数}
+        """
+        sql = """SELECT COALESCE(SUM(is_success), 0) AS success_user, COALESCE(SUM(1 - is_success), 0) AS fail_user
+        FROM tb_task_batch_user WHERE batch_no = ?"""
+        with self.get_db_connection(readonly=True) as conn:
+            row = conn.execute(sql, (batch_no,)).fetchone()
+        return {"success_user": row["success_user"], "fail_user": row["fail_user"]}
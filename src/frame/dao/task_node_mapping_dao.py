@@ -1,6 +1,13 @@
 from typing import Dict, List, Any
 
 from src.frame.dao.base_db import BaseDB
+from src.frame.dao.row_mapper import JsonField, RowRecord, json_field_cache
+
+
+class TaskTmplNodeMappingRecord(RowRecord):
+    """tb_task_tmpl_node_mapping 行记录"""
+    __slots__ = ("id", "task_tmpl_id", "node_id", "pre_node_id", "next_node_id", "node_params")
+    JSON_FIELDS = {"node_params": JsonField("tb_task_tmpl_node_mapping", "node_params", update_time_field=None)}
 
 
 class TaskTmplNodeMappingDAO(BaseDB):
@@ -40,31 +47,28 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_node_mapping_node_id ON tb_task_tmpl
 
     def get_task_node_mapping(self, task_tmpl_id: str) -> List[Dict[str, Any]]:
         sql = "SELECT * FROM tb_task_tmpl_node_mapping WHERE task_tmpl_id = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql, (task_tmpl_id,)).fetchall()
-        mapping_list = [self.dict_from_row(row) for row in rows]
-        for mapping in mapping_list: mapping["node_params"] = self.json_deserialize(mapping["node_params"])
-        return mapping_list
+        return TaskTmplNodeMappingRecord.from_rows(rows)
 
     def get_task_node_params(self, task_tmpl_id: str, node_id: str) -> Dict[str, Any]:
-        sql = "SELECT node_params FROM tb_task_tmpl_node_mapping WHERE task_tmpl_id = ? AND node_id = ?"
-        with self.get_db_connection() as conn:
+        sql = "SELECT id, node_params FROM tb_task_tmpl_node_mapping WHERE task_tmpl_id = ? AND node_id = ?"
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (task_tmpl_id, node_id)).fetchone()
-        return self.json_deserialize(row["node_params"]) if row else {}
+        return json_field_cache.decode("tb_task_tmpl_node_mapping", "node_params", row["id"], None,
+                                       row["node_params"]) if row else {}
 
     def get_by_task_tmpl_id_and_node_id(self, task_tmpl_id: str, node_id: str) -> Dict[str, Any]:
         sql = "SELECT * FROM tb_task_tmpl_node_mapping WHERE task_tmpl_id = ? AND node_id = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (task_tmpl_id, node_id)).fetchone()
         return self.dict_from_row(row) if row else {}
 
     def get_by_node_id(self, node_id: str) -> List[Dict[str, Any]]:
         sql = "SELECT * FROM tb_task_tmpl_node_mapping WHERE node_id = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql, (node_id,)).fetchall()
-        mapping_list = [self.dict_from_row(row) for row in rows]
-        for mapping in mapping_list: mapping["node_params"] = self.json_deserialize(mapping["node_params"])
-        return mapping_list
+        return TaskTmplNodeMappingRecord.from_rows(rows)
 
     # ========== ✅ 新增核心：修改方法（3个高频实用） ==========
     def update_by_task_tmpl_id(self, task_tmpl_id: int, update_infos: List[Dict[str, Any]]) -> bool:
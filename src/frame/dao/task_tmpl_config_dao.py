@@ -1,6 +1,7 @@
 from typing import Dict, Any
 
 from src.frame.dao.base_db import BaseDB
+from src.frame.dao.row_mapper import json_field_cache
 
 
 class TaskTmplConfigDAO(BaseDB):
@@ -28,10 +29,11 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_config_task_tmpl_id ON tb_task_tmpl_
         return True
 
     def get_by_task_tmpl_id(self, task_tmpl_id: int) -> Dict[str, Any]:
-        sql = "SELECT task_tmpl_global_config_json FROM tb_task_tmpl_config WHERE task_tmpl_id = ?"
-        with self.get_db_connection() as conn:
+        sql = "SELECT task_tmpl_global_config_json, update_time FROM tb_task_tmpl_config WHERE task_tmpl_id = ?"
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (task_tmpl_id,)).fetchone()
-        return self.json_deserialize(row["task_tmpl_global_config_json"]) if row else {}
+        return json_field_cache.decode("tb_task_tmpl_config", "task_tmpl_global_config_json", task_tmpl_id,
+                                       row["update_time"], row["task_tmpl_global_config_json"]) if row else {}
 
     def get_single_task_tmpl_config(self, task_tmpl_id: int, config_key: str) -> Dict[str, Any]:
         return self.get_by_task_tmpl_id(task_tmpl_id).get(config_key, {})
@@ -1,13 +1,23 @@
+import logging
 from typing import Dict, List, Optional, Any, Tuple
 
 from src.frame.common.decorator.singleton import singleton
 from src.frame.dao.base_db import BaseDB
+from src.frame.dao.pagination import KeysetPaginator, table_stats_sql
+from src.frame.dao.search_index import SearchIndex
 
 
 @singleton
 class TaskTmplDAO(BaseDB):
     """tb_task_tmpl 表专属操作类"""
 
+    def __init__(self, logger=logging):
+        # 列表带出项目名称：先在本表按条件查出当前页的ID，再关联项目表
+        self.paginator = KeysetPaginator("tb_task_tmpl", "SELECT t1.*, t2.name as project_name FROM tb_task_tmpl t1 "
+                                                         "left join tb_project t2 on t1.project_id=t2.id", "t1.id")
+        self.search_index = SearchIndex("tb_task_tmpl", ("name",))
+        super().__init__(logger)
+
     def get_init_sql(self) -> str:
         """返回完整的建表/索引/触发器SQL"""
         sql = """
@@ -27,8 +37,14 @@ CREATE TABLE IF NOT EXISTS tb_task_tmpl (
     update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_business_type ON tb_task_tmpl(business_type);
+-- 分页：按创建时间倒序，以及按业务类型+创建时间
+CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_create_time ON tb_task_tmpl(create_time);
+CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_business_type_create_time ON tb_task_tmpl(business_type, create_time);
     """
-        return sql.strip()
+        return sql.strip() + "\n" + table_stats_sql("tb_task_tmpl", ("create_time", "business_type", "name"))
+
+    def get_search_indexes(self) -> List[SearchIndex]:
+        return [self.search_index]
 
     def add_one(self, task_info: Dict[str, Any]) -> int:
         sql = """INSERT INTO tb_task_tmpl (project_id, domain, business_type, name, login_interval,
@@ -82,7 +98,7 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_business_type ON tb_task_tmpl(busine
 
     def get_by_id(self, task_tmpl_id: int) -> Optional[Dict[str, Any]]:
         sql = "SELECT * FROM tb_task_tmpl WHERE id = ?"
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             row = conn.execute(sql, (task_tmpl_id,)).fetchone()
         return self.dict_from_row(row)
 
@@ -96,14 +112,13 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_business_type ON tb_task_tmpl(busine
         sql = "SELECT * FROM tb_task_tmpl"
         params = []
         if business_type: sql += " WHERE business_type = ?"; params.append(business_type)
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql, params).fetchall()
         return [self.dict_from_row(row) for row in rows]
 
     # ========== ✅ 新增：分页核心方法（3个，完整支撑翻页） ==========
     def get_total_count(self, business_type: Optional[str] = None, name: Optional[str] = None) -> int:
         """获取任务模板总条数（支持按业务类型筛选，分页必备）"""
-        sql = "SELECT COUNT(*) AS total FROM tb_task_tmpl"
         params = []
         where_conditions = []  # 条件集合，自动拼接
 
@@ -113,16 +128,12 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_business_type ON tb_task_tmpl(busine
             params.append(business_type.strip())
         # 条件2：新增任务模板名称模糊筛选（核心优化）
         if name and name.strip():
-            where_conditions.append("name LIKE ?")
-            params.append(f"%{name.strip()}%")
-
-        # 拼接多条件（多个条件用AND连接，无则不拼接）
-        if where_conditions:
-            sql += " WHERE " + " AND ".join(where_conditions)
+            condition, param = self.search_index.like_condition("name", name.strip())
+            where_conditions.append(condition)
+            params.append(param)
 
-        with self.get_db_connection() as conn:
-            row = conn.execute(sql, params).fetchone()
-        return row["total"] if row else 0
+        with self.get_db_connection(readonly=True) as conn:
+            return self.paginator.count(conn, where_conditions, params)
 
     def get_list_by_page(self,
                          page_num: int = 1,
@@ -141,9 +152,6 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_business_type ON tb_task_tmpl(busine
         if page_num < 1: page_num = 1
         if page_size < 1 or page_size > 100: page_size = 10  # 限制最大页条数，防性能问题
 
-        # SQLite分页核心语法：LIMIT 条数 OFFSET 偏移量（偏移量=(页码-1)*页大小）
-        offset = (page_num - 1) * page_size
-        sql = "SELECT t1.*, t2.name as project_name FROM tb_task_tmpl t1 left join tb_project t2 on t1.project_id=t2.id"
         params = []
         where_conditions = []
 
@@ -152,19 +160,14 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_business_type ON tb_task_tmpl(busine
             where_conditions.append("business_type = ?")
             params.append(business_type.strip())
         if name and name.strip():
-            where_conditions.append("name LIKE ?")
-            params.append(f"%{name.strip()}%")
+            condition, param = self.search_index.like_condition("name", name.strip())
+            where_conditions.append(condition)
+            params.append(param)
 
-        if where_conditions:
-            sql += " WHERE " + " AND ".join(where_conditions)
-        # 拼接分页+排序（按创建时间倒序，最新任务模板在前，符合业务习惯）
-        sql += " ORDER BY create_time DESC LIMIT ? OFFSET ?"
-        params.extend([page_size, offset])
-
-        # 执行查询
-        with self.get_db_connection() as conn:
-            rows = conn.execute(sql, params).fetchall()
-            return [self.dict_from_row(row) for row in rows]
+        # 按创建时间倒序（最新任务模板在前，符合业务习惯），键集分页
+        with self.get_db_connection(readonly=True) as conn:
+            rows = self.paginator.fetch_page(conn, where_conditions, params, page_num, page_size)
+        return [self.dict_from_row(row) for row in rows]
 
     def get_page_data(self,
                       page_num: int = 1,
@@ -274,7 +277,7 @@ CREATE INDEX IF NOT EXISTS idx_tb_task_tmpl_business_type ON tb_task_tmpl(busine
 
     def get_all(self) -> List[Dict[str, Any]]:
         sql = """SELECT t1.*, t2.name as project_name FROM tb_task_tmpl t1 left join tb_project t2 on t1.project_id=t2.id"""
-        with self.get_db_connection() as conn:
+        with self.get_db_connection(readonly=True) as conn:
             rows = conn.execute(sql).fetchall()
             rows_ = [self.dict_from_row(row) for row in rows]
             return rows_
@@ -0,0 +1,326 @@
+import logging
+import math
+import multiprocessing
+import queue
+import threading
+from logging.handlers import QueueHandler
+from typing import Any, Callable, Dict, List, Optional
+
+from src.frame.common.qt_log_redirector import qt_logger, LOG
+from src.frame.common.user_manager import UserManager
+from src.frame.common.write_behind_writer import write_behind_writer, WriteBehindUserManager
+from src.frame.task_batch_executor import TaskBatchExecutor
+from src.utils.async_utils import get_event_loop_safely
+
+# 子进程 -> 主进程的事件类型
+EVENT_LOG = "log"  # 日志：(EVENT_LOG, LogRecord)
+EVENT_USER_FINISHED = "user_finished"  # 用户任务完成：(EVENT_USER_FINISHED, 分片序号, 是否成功)
+EVENT_USER_MANAGER = "user_manager"  # Excel写入：(EVENT_USER_MANAGER, 方法名, args, kwargs)
+EVENT_SHARD_FINISHED = "shard_finished"  # 分片执行完毕：(EVENT_SHARD_FINISHED, 分片序号, 异常信息, 是否有未释放的资源)
+
+# 主进程 -> 子进程的命令
+COMMAND_CANCEL = "cancel"  # 取消分片中所有的任务，并关闭浏览器
+
+
+class _EventQueueHandler(QueueHandler):
+    """子进程日志处理器：日志记录包装成事件投递到主进程"""
+
+    def enqueue(self, record: logging.LogRecord):
+        self.queue.put_nowait((EVENT_LOG, record))
+
+
+class UserManagerProxy:
+    """
+    子进程中的用户管理器代理
+    读操作在子进程中直接执行；写操作转发到主进程串行执行，避免多个进程同时写同一个Excel文件
+    """
+    def __init__(self, user_manager: UserManager, event_queue):
+        self._user_manager = user_manager
+        self._event_queue = event_queue
+
+    def __getattr__(self, name):
+        attr = getattr(self._user_manager, name)
+        if name not in UserManager.WRITE_METHODS:
+            return attr
+
+        def _forward(*args, **kwargs):
+            self._event_queue.put((EVENT_USER_MANAGER, name, args, kwargs))
+            # 写入结果由主进程记录日志，子进程按成功处理
+            return True
+
+        return _forward
+
+
+class ShardTaskBatchExecutor(TaskBatchExecutor):
+    """
+    子进程中的批次执行器：执行批次中的一个用户分片
+    复用TaskBatchExecutor的用户任务执行逻辑，用户结果通过事件队列回传主进程，批次状态由主进程汇总后更新
+    """
+
+    def __init__(self, task_batch_config: dict, shard_idx: int, event_queue, logger):
+        super().__init__([task_batch_config], logger)
+        self.shard_idx = shard_idx  # 分片序号
+        self.event_queue = event_queue  # 事件队列（子进程 -> 主进程）
+        self.release_event = threading.Event()  # 收到取消命令后置位，用于关闭未自动释放的浏览器
+        self.loop = get_event_loop_safely()
+
+    def run_shard(self, users: List[tuple], user_manager: Optional[UserManager]) -> bool:
+        """
+        执行用户分片
+        :param users: 分片中的用户
+        :param user_manager: 用户管理器（Excel模式）
+        :return: 是否有未释放的资源
+        """
+        task_batch_config = self.task_batches_config[0]
+        batch_no = task_batch_config.get("batch_info").get("batch_no")
+        web_driver_manager = self.create_web_driver_manager(task_batch_config)
+        self.has_unreleased_resource_holder[batch_no] = False
+        self.web_driver_manager_holder[batch_no] = web_driver_manager
+        if user_manager:
+            user_manager = UserManagerProxy(user_manager, self.event_queue)
+        watchdog = self.start_loop_block_watchdog(self.loop)
+        try:
+            self.loop.run_until_complete(self._run_users(task_batch_config, users, user_manager))
+        finally:
+            if watchdog:
+                watchdog.stop()
+            # 子进程退出前，用户执行记录须落盘
+            write_behind_writer.flush()
+        return self.has_unreleased_resource_holder.get(batch_no, False)
+
+    def close_drivers(self):
+        """关闭分片的所有浏览器"""
+        for web_driver_manager in self.web_driver_manager_holder.values():
+            self.loop.run_until_complete(web_driver_manager.close())
+        self.web_driver_manager_holder.clear()
+
+    def handle_command(self, command: str, *args):
+        """
+        处理主进程的命令（命令监听线程中调用）
+        :param command: 命令
+        :param args: 命令参数
+        """
+        if command == COMMAND_CANCEL:
+            for coroutine_scheduler in self.coroutine_schedulers.values():
+                # 协程调度器的cancel方法本身是线程安全的
+                coroutine_scheduler.cancel()
+            self.release_event.set()
+        elif command in ("terminate_task", "terminate_all", "pause_task", "resume_task"):
+            # 任务控制投递到事件循环中执行，保证与任务协程在同一线程
+            if not self.loop.is_closed():
+                self.loop.call_soon_threadsafe(getattr(self.task_scheduler, command), *args)
+        else:
+            self.logger.warning(f"分片{self.shard_idx} | 未知命令：{command}")
+
+    def _record_user_result(self, batch_no: str, is_success: bool):
+        self.event_queue.put((EVENT_USER_FINISHED, self.shard_idx, is_success))
+
+    def _on_task_batch_completed(self, batch_no: str):
+        # 批次状态由主进程在所有分片完成后更新
+        pass
+
+
+def _setup_worker_logging(event_queue):
+    """子进程日志：去掉文件和UI处理器，所有日志投递到主进程统一输出"""
+    root_logger = logging.getLogger()
+    for logger in (root_logger, LOG):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+    queue_handler = _EventQueueHandler(event_queue)
+    # 在子进程中记录用户名，主进程输出时还原
+    queue_handler.addFilter(qt_logger.UserContextFilter(qt_logger))
+    root_logger.addHandler(queue_handler)
+
+
+def run_shard_worker(shard_idx: int, task_batch_config: dict, users: List[tuple],
+                     user_manager: Optional[UserManager], event_queue, command_queue):
+    """
+    子进程入口
+    :param shard_idx: 分片序号
+    :param task_batch_config: 任务批次配置（已按分片调整并发数）
+    :param users: 分片中的用户
+    :param user_manager: 用户管理器（Excel模式）
+    :param event_queue: 事件队列（子进程 -> 主进程）
+    :param command_queue: 命令队列（主进程 -> 子进程）
+    """
+    _setup_worker_logging(event_queue)
+    executor = ShardTaskBatchExecutor(task_batch_config, shard_idx, event_queue, LOG)
+
+    def _listen_command():
+        while True:
+            cmd = command_queue.get()
+            if cmd is None:
+                return
+            try:
+                executor.handle_command(*cmd)
+            except Exception:
+                LOG.exception(f"分片{shard_idx} | 处理命令失败：{cmd}")
+
+    threading.Thread(target=_listen_command, name=f"shard-{shard_idx}-command", daemon=True).start()
+
+    error = None
+    has_unreleased = False
+    try:
+        has_unreleased = executor.run_shard(users, user_manager)
+    except Exception as e:
+        LOG.exception(f"分片{shard_idx} | 执行异常：")
+        error = str(e)
+    finally:
+        event_queue.put((EVENT_SHARD_FINISHED, shard_idx, error, has_unreleased))
+        if has_unreleased:
+            # 不自动关闭浏览器，等待主进程“释放资源”
+            executor.release_event.wait()
+        executor.close_drivers()
+
+
+class ProcessShardGroup:
+    """
+    多进程分片组（主进程侧）
+    1. 批次用户按轮询方式分片，每个分片一个子进程（spawn方式启动，避免fork带有Qt线程的进程）
+    2. 批次最大并发数、全局最大并发数按分片数均分（向上取整）
+    3. 在执行器线程中消费事件队列：还原日志、串行写Excel、回调用户结果
+    4. 提供与CoroutineScheduler一致的cancel方法，供“释放资源”使用
+    """
+
+    def __init__(self, task_batch_config: dict, users: List[tuple], process_count: int,
+                 user_manager: Optional[UserManager], logger):
+        self.task_batch_config = task_batch_config
+        self.batch_no = task_batch_config.get("batch_info").get("batch_no")
+        self.user_manager = user_manager
+        # 子进程转发的Excel写入交给后台写入器合并落盘
+        self.write_behind_user_manager = WriteBehindUserManager(user_manager) if user_manager else None
+        self.logger = logger
+        self.shards: List[List[tuple]] = [users[i::process_count] for i in range(process_count)]
+        self._ctx = multiprocessing.get_context("spawn")
+        self.event_queue = self._ctx.Queue()
+        self.command_queues = []
+        self.processes = []
+        self.finished_counts: Dict[int, int] = {idx: 0 for idx in range(len(self.shards))}  # 分片序号->已完成用户数
+
+    def _build_shard_config(self) -> dict:
+        """构建分片的批次配置：按分片数均分并发上限"""
+        batch_info = self.task_batch_config.get("batch_info")
+        global_config = dict(batch_info.get("global_config") or {})
+        shard_count = len(self.shards)
+        for key in ("max_concurrent_users", "global_max_concurrent_users"):
+            try:
+                value = int(global_config.get(key) or 0)
+            except (TypeError, ValueError):
+                continue
+            if value > 0:
+                global_config[key] = math.ceil(value / shard_count)
+        return {**self.task_batch_config, "batch_info": {**batch_info, "global_config": global_config}}
+
+    def start(self):
+        """启动所有分片子进程"""
+        shard_config = self._build_shard_config()
+        for idx, shard_users in enumerate(self.shards):
+            command_queue = self._ctx.Queue()
+            process = self._ctx.Process(target=run_shard_worker,
+                                        args=(idx, shard_config, shard_users, self.user_manager,
+                                              self.event_queue, command_queue),
+                                        name=f"{self.batch_no}-shard-{idx}", daemon=True)
+            process.start()
+            self.command_queues.append(command_queue)
+            self.processes.append(process)
+            self.logger.debug(f"任务批次号：{self.batch_no} | 分片{idx}已启动，用户数：{len(shard_users)}，"
+                              f"进程ID：{process.pid}")
+
+    def wait(self, on_user_finished: Callable[[bool], Any]) -> bool:
+        """
+        消费事件直到所有分片执行完毕
+        :param on_user_finished: 用户任务完成回调，参数：是否成功
+        :return: 是否有未释放的资源
+        """
+        pending = set(range(len(self.processes)))
+        unreleased_shards = set()  # 有未释放资源的分片，子进程需等待“释放资源”后才退出
+        while pending:
+            try:
+                event = self.event_queue.get(timeout=1)
+            except queue.Empty:
+                # 检查子进程是否异常退出（未上报分片完成）
+                for idx in list(pending):
+                    if not self.processes[idx].is_alive():
+                        self._drain_events(on_user_finished)
+                        if idx in pending:
+                            pending.discard(idx)
+                            self._on_shard_crashed(idx, on_user_finished)
+                continue
+            finished = self._handle_event(event, on_user_finished)
+            if finished is not None:
+                idx, shard_has_unreleased = finished
+                pending.discard(idx)
+                if shard_has_unreleased:
+                    unreleased_shards.add(idx)
+        for idx, process in enumerate(self.processes):
+            if idx not in unreleased_shards:
+                process.join(timeout=10)
+        return bool(unreleased_shards)
+
+    def _drain_events(self, on_user_finished):
+        """处理队列中残留的事件"""
+        while True:
+            try:
+                event = self.event_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._handle_event(event, on_user_finished)
+
+    def _handle_event(self, event: tuple, on_user_finished):
+        """
+        处理子进程事件
+        :return: 分片完成时返回(分片序号, 是否有未释放的资源)，否则返回None
+        """
+        event_type = event[0]
+        if event_type == EVENT_LOG:
+            record: logging.LogRecord = event[1]
+            # 还原子进程中的用户名，再交给主进程的日志处理器（文件 + UI）
+            qt_logger.set_current_user(getattr(record, "username", "FRAMEWORK"))
+            logging.getLogger(None if record.name == "root" else record.name).handle(record)
+        elif event_type == EVENT_USER_FINISHED:
+            _, idx, is_success = event
+            self.finished_counts[idx] += 1
+            self._safe_call(on_user_finished, is_success)
+        elif event_type == EVENT_USER_MANAGER:
+            _, method, args, kwargs = event
+            if self.write_behind_user_manager:
+                self._safe_call(getattr(self.write_behind_user_manager, method), *args, **kwargs)
+        elif event_type == EVENT_SHARD_FINISHED:
+            _, idx, error, shard_has_unreleased = event
+            if error:
+                self.logger.error(f"任务批次号：{self.batch_no} | 分片{idx}执行失败：{error}")
+            else:
+                self.logger.debug(f"任务批次号：{self.batch_no} | 分片{idx}执行完毕")
+            return idx, shard_has_unreleased
+        return None
+
+    def _on_shard_crashed(self, idx: int, on_user_finished):
+        """子进程异常退出：未上报结果的用户按失败处理"""
+        process = self.processes[idx]
+        unreported = len(self.shards[idx]) - self.finished_counts[idx]
+        self.logger.error(f"任务批次号：{self.batch_no} | 分片{idx}进程异常退出，退出码：{process.exitcode}，"
+                          f"未完成用户数：{unreported}")
+        for _ in range(unreported):
+            self._safe_call(on_user_finished, False)
+
+    def _safe_call(self, func, *args, **kwargs):
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            self.logger.error(f"任务批次号：{self.batch_no} | 处理子进程事件失败：{str(e)}")
+
+    def send_command(self, command: str, *args):
+        """
+        向所有存活的子进程发送命令
+        :param command: 命令
+        :param args: 命令参数
+        """
+        for process, command_queue in zip(self.processes, self.command_queues):
+            if process.is_alive():
+                command_queue.put((command, *args))
+
+    def cancel(self):
+        """取消分片组所有的任务（子进程取消协程并关闭浏览器后退出）"""
+        self.send_command(COMMAND_CANCEL)
+        self.logger.info(f"批次 {self.batch_no} 已通知所有工作进程取消")
@@ -1,16 +1,15 @@
-import os
+import asyncio
 import threading
-from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Type
 
 import shortuuid
 
-from src.frame.base.base_task_node import BaseNode, JSNode, BasePYNode
-from src.frame.common.constants import NodeState
+from src.frame.base.base_task_node import BaseNode, JSNode
+from src.frame.common.constants import ControlCommand, NodeState
 from src.frame.component_manager import component_manager
+from src.frame.task_blueprint import TaskBlueprint, TaskGraph
 from src.utils.async_utils import get_event_loop_safely
 from src.utils.clazz_utils import ClazzUtils
-from src.utils.sys_path_utils import SysPathUtils
 
 
 class Task:
@@ -22,7 +21,7 @@ class Task:
     hot_reload_lock = threading.Lock()
 
     def __init__(self, driver, user_config: Tuple[str, str], task_config, logger,
-                 user_manager=None):
+                 user_manager=None, blueprint: Optional[TaskBlueprint] = None):
         self.driver = driver  # 浏览器驱动
         # self.driver_manager: WebDriverManager = WebDriverManager(logger)
         self.task_config = task_config  # 任务配置
@@ -46,6 +45,9 @@ class Task:
         self.username = user_config[0]  # 用户名必传，即使是无用户任务，也要传用户名
         self.support_hot_reload_nodes = []  # 支持热加载节点
         self.hot_reloaded_nodes = []  # 已热加载的节点列表
+        self.blueprint = blueprint  # 任务蓝图，同一批次的任务共用，未传入则在初始化节点时编译
+        self._restart_request: Optional[Tuple[asyncio.Future, str]] = None  # 重启请求：(新浏览器驱动的future, 原因)
+        self._fail_reason: Optional[str] = None  # 失败请求的原因（浏览器驱动失效且不再重建）
         self.init_nodes()  # 初始化节点
 
     def init_nodes(self):
@@ -94,16 +96,16 @@ class Task:
             ]
         }
         """
-        self.start_node_id = self.task_tmpl.get("start_node_id")
-        if not self.start_node_id:
-            raise ValueError("配置中必须指定start_node_id")
+        if not self.blueprint:
+            # 编译蓝图时校验start_node_id、补全组件路径、加载组件类
+            self.blueprint = TaskBlueprint.compile(self.task_config)
+        self.start_node_id = self.blueprint.start_node_id
 
-        # 根据配置创建节点实例并注册
-        node_configs = self.task_config.get("task_nodes", [])
-
-        for node_cfg in node_configs:
+        # 根据蓝图创建节点实例并注册
+        for node_blueprint in self.blueprint.node_blueprints:
+            node_cfg = node_blueprint.node_config
             # 创建节点实例
-            node_instance = self.create_node_instance(node_cfg)
+            node_instance = self.create_node_instance(node_cfg, node_blueprint.component_cls)
             # 注册节点实例
             self.register_node(node_instance)
             # 注册热加载节点
@@ -125,49 +127,45 @@ class Task:
         self.nodes[node_id] = node
         node.bind_task(self)
 
-    def create_node_instance(self, node_cfg: Dict[str, Any]) -> BaseNode:
+    def create_node_instance(self, node_cfg: Dict[str, Any],
+                             component_cls: Optional[Type[BaseNode]] = None) -> BaseNode:
         """
         创建节点实例
         :param node_cfg: 节点配置信息 tb_node表
+        :param component_cls: 组件类（来自任务蓝图），None-通过组件管理器加载（热加载时重新加载组件）
         """
         # 创建浏览器驱动，一个用户对应一个浏览器驱动，不能在协程中创建！！！
         # driver = await self.driver_manager.create_user_driver(self.username, self.batch_no, DriverConfigFormatter.format(self.global_config))
         # 填充完整组件路径
-        component_path = self._complete_component_path(node_cfg["component_path"])
+        component_path = TaskBlueprint.complete_component_path(node_cfg["component_path"])
         # 更新组件路径
         node_cfg["component_path"] = component_path
-        component_ext = os.path.splitext(component_path)[1].lower()
+        if component_cls is None:
+            component_cls = TaskBlueprint.load_component_cls(component_path)
         # 支持2中类型的组件：Python组件、JavaScript组件。
         # python组件中也可支持调用JS组件，但JS组件无法调用Python组件。
-        if component_ext == ".py":
-            # 加载Python组件（支持热更新）
-            component_cls = self.component_manager.load_component(component_path, BasePYNode,
-                                                                  str(Path(SysPathUtils.get_root_dir(),
-                                                                           "components_deps")))
-            # 创建python节点实例
-            node_instance = component_cls(
+        if component_cls is JSNode:
+            # 创建js节点实例
+            node_instance = JSNode(
                 driver=self.driver,
                 user_manager=self.user_manager,
+                js_component_path=component_path,
                 global_config=self.global_config,
                 task_config=self.task_config,
                 node_config=node_cfg,
                 user_config=self.user_config,
-                logger=self.logger,
-            )
-
-        elif component_ext == ".js":
-            # 创建js节点实例
-            node_instance = JSNode(
+                logger=self.logger)
+        else:
+            # 创建python节点实例
+            node_instance = component_cls(
                 driver=self.driver,
                 user_manager=self.user_manager,
-                js_component_path=component_path,
                 global_config=self.global_config,
                 task_config=self.task_config,
                 node_config=node_cfg,
                 user_config=self.user_config,
-                logger=self.logger)
-        else:
-            raise Exception(f"不支持的组件类型：{component_ext}，加载失败的组件：{component_path}")
+                logger=self.logger,
+            )
 
         return node_instance
 
@@ -184,15 +182,23 @@ class Task:
         # 任务成功标志
         is_success = True
         try:
+            # 任务执行图（节点跳转表、重登跳转表、重登关键词匹配器，编译蓝图时生成）
+            graph = self.blueprint.graph
             # 任务整体最大重登次数
-            max_task_relogin_times = self.task_config.get("task_tmpl_config", {}).get("relogin_config", {}).get(
-                "max_task_relogin_times", 3)
+            max_task_relogin_times = graph.max_task_relogin_times
             # 设置当前执行节点ID为起始节点
             self.current_node_id = self.start_node_id
             # 任务整体重登次数（从头执行的次数）
             task_relogin_count = 0
             # 核心调度逻辑：按next_node_id循环执行
             while self.current_node_id:
+                if self._fail_reason:
+                    self.logger.error(f"浏览器驱动已失效（{self._fail_reason}），任务失败！")
+                    is_success = False
+                    break
+                if self._restart_request:
+                    # 浏览器驱动重建中，等待新的驱动后从重登节点重新执行
+                    await self._apply_restart_request(graph)
                 # 1.获取当前节点（load_config方法中实例化了所有节点）
                 current_node = self.nodes.get(self.current_node_id)
                 if not current_node:
@@ -200,11 +206,17 @@ class Task:
                     break
 
                 node_name = current_node.node_name
-                node_params = current_node.node_config.get("node_params", {})
 
                 self.logger.info(f"开始执行节点: {self.current_node_id} ({node_name})")
                 # 2.执行当前节点
-                node_success = await current_node.execute(self.context)
+                try:
+                    node_success = await current_node.execute(self.context)
+                except Exception:
+                    # 浏览器驱动重建或失效时，节点中的浏览器操作异常，交由重启/失败请求处理
+                    if not self._restart_request and not self._fail_reason:
+                        raise
+                    self.logger.warning(f"节点 {self.current_node_id} ({node_name}) 因浏览器驱动重建或失效中断")
+                    node_success = False
                 with self.hot_reload_lock:  # 加锁目的：有热更新节点时，等待热更新执行完毕
                     # 3.清理当前节点，非常重要！节点中需要清理的资源，如变量、文件、数据库连接等
                     await current_node.clean_up()
@@ -215,6 +227,9 @@ class Task:
                         self.current_node_id = current_node.node_id
                         continue
 
+                if self._restart_request or self._fail_reason:
+                    continue
+
                 if not node_success:
                     self.logger.info(f"节点 {self.current_node_id} ({node_name}) 执行完毕！发出结束信号，流程终止！")
                     break
@@ -226,19 +241,21 @@ class Task:
                 node_result = current_node.get_node_result()
                 # 3.处理重登，通过错误消息匹配重登关键词，且任务重登次数未超限
                 # 节点中遇到需要重登的情况时需要特殊返回：execute()返回True，且node_result中is_success=True，并设置error_msg，此处会去匹配关键词
-                if self._is_need_relogin(node_params, node_result.get("error_msg", "")):
+                is_need_relogin, relogin_node_id = graph.match_relogin(self.current_node_id,
+                                                                       node_result.get("error_msg", ""))
+                if is_need_relogin:
                     if task_relogin_count < max_task_relogin_times:
                         self.logger.warning(f"节点{node_name}匹配重登关键词，准备任务重登")
                         task_relogin_count += 1
                         self.logger.info(f"任务重登次数更新为：{task_relogin_count}，即将执行登录节点（一次登录）")
-                        self.current_node_id = node_params.get("relogin_node_id")
+                        self.current_node_id = relogin_node_id
                     else:
                         self.logger.error(f"任务整体重登次数已达上限（{max_task_relogin_times}次），任务失败！")
                         is_success = False
                         break
                 else:
                     # 获取下一个节点ID
-                    self.current_node_id = current_node.next_node_id
+                    self.current_node_id = graph.get_next_node_id(self.current_node_id)
             else:
                 self.logger.info(f"无下一个节点，任务执行完毕！")
         except Exception as e:
@@ -293,31 +310,49 @@ class Task:
             self.hot_reloaded_nodes.append(target_task_node.node_id)
             self.logger.info(f"任务【{self.task_uuid}】节点【{target_task_node.node_name}】热更新成功")
 
-    def get_node(self, node_id: int) -> Optional[BaseNode]:
+    def request_restart(self, driver_future: asyncio.Future, reason: str):
         """
-        获取任务内指定节点
-        :param node_id: 节点ID
+        请求重启：浏览器驱动即将重建（浏览器崩溃迁移、资源超限回收），中断当前节点，
+        任务等待新的驱动就绪后绑定，并从当前节点的重登节点（未配置则从起始节点）重新执行
+        :param driver_future: 新浏览器驱动的future
+        :param reason: 重启原因
         """
-        return self.nodes.get(node_id)
+        self._restart_request = (driver_future, reason)
+        current_node = self.get_node(self.current_node_id) if self.current_node_id else None
+        if current_node and current_node.supports_command(ControlCommand.TERMINATE):
+            current_node.terminate(reason, False)
 
-    def _is_need_relogin(self, node_params, error_msg: str) -> bool:
+    def request_fail(self, reason: str):
         """
-        判断是否需要触发重登
-        :param node_params: 节点参数
-        :param error_msg: 错误消息，用于匹配是否需要重登
-        :return:
+        请求失败：浏览器驱动已失效且不再重建，终止当前节点，任务按失败结束
+        :param reason: 失败原因
+        """
+        self._fail_reason = reason
+        current_node = self.get_node(self.current_node_id) if self.current_node_id else None
+        if current_node and current_node.supports_command(ControlCommand.TERMINATE):
+            current_node.terminate(reason, True)
+
+    async def _apply_restart_request(self, graph: TaskGraph):
+        """处理重启请求：等待新的浏览器驱动并重新绑定，跳转到重登节点"""
+        driver_future, reason = self._restart_request
+        self._restart_request = None
+        self.rebind_driver(await driver_future)
+        restart_node_id = graph.relogin_node_ids.get(self.current_node_id) or self.start_node_id
+        self.logger.warning(f"浏览器驱动已重建（{reason}），从节点 {restart_node_id} 重新执行")
+        self.current_node_id = restart_node_id
+
+    def rebind_driver(self, driver):
+        """
+        重新绑定浏览器驱动，后续执行的节点使用新的驱动
+        :param driver: 新的浏览器驱动
         """
-        if not node_params.get("is_support_relogin") or not error_msg or not error_msg.strip():
-            return False
-        trigger_errors = self.task_config.get("task_tmpl_config", {}).get("relogin_config", {}).get(
-            "relogin_trigger_errors",
-            [])
-        for error_keyword in trigger_errors:
-            if error_keyword.lower() in error_msg.lower():
-                return True
-        return False
+        self.driver = driver
+        for node in self.nodes.values():
+            node.rebind_context(driver)
 
-    def _complete_component_path(self, component_path: str):
-        if not Path(component_path).is_absolute():
-            component_path = str(Path(SysPathUtils.get_root_dir(), component_path))
-        return component_path
+    def get_node(self, node_id: int) -> Optional[BaseNode]:
+        """
+        获取任务内指定节点
+        :param node_id: 节点ID
+        """
+        return self.nodes.get(node_id)
@@ -1,27 +1,40 @@
+import asyncio
 import json
+import os
+import time
 from typing import Tuple, List, Any, Optional, Dict
 
 import shortuuid
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from src.frame.common.admission_controller import admission_controller
+from src.frame.common.batch_job_queue import BatchJobQueue
+from src.frame.common.browser_shard_pool import PLACEMENT_LEAST_LOADED, PLACEMENT_HASH
 from src.frame.common.coroutine_scheduler import CoroutineScheduler
 from src.frame.common.exceptions import ParamError
-from src.frame.common.playwright_driver_manager import WebDriverManager
+from src.frame.common.launch_profile import LaunchProfile
+from src.frame.common.playwright_driver_manager import WebDriverManager, CONTEXT_LOST_RESTART, CONTEXT_LOST_FAIL
 from src.frame.common.qt_log_redirector import qt_logger
+from src.frame.common.rate_limiter import rate_limiter_registry, AdaptiveRateLimiter
+from src.frame.common.session_cache import get_session_domain, get_session_ttl_seconds
+from src.frame.common.routing_profile import RoutingProfile
 from src.frame.common.user_manager import UserManager, UserInfoLocation
+from src.frame.common.write_behind_writer import write_behind_writer, WriteBehindUserManager
 from src.frame.dao.db_manager import db
 from src.frame.dto.driver_config import DriverConfigFormatter, DriverConfig
 from src.frame.hot_reload_manager import NodeHotReloadManager
 from src.frame.task import Task
+from src.frame.task_blueprint import TaskBlueprint
 from src.frame.task_scheduler import TaskScheduler
 from src.utils import basic
-from src.utils.async_utils import get_event_loop_safely
+from src.utils.async_utils import get_event_loop_safely, LoopBlockWatchdog
 
 
 class TaskBatchExecutor(QThread):
     # 所有任务完成的信号
     one_task_batch_finished = pyqtSignal(int, str)
     all_task_batch_finished = pyqtSignal(int, list, set)
+    resource_usage_updated = pyqtSignal(str, list)  # 用户Context资源采样结果：(批次号, [{username, js_heap_mb, cpu_percent, ...}])
 
     def __init__(self, task_batches_config: List[dict], logger):
         super().__init__()
@@ -47,6 +60,7 @@ class TaskBatchExecutor(QThread):
         self.coroutine_schedulers: Dict[str, CoroutineScheduler] = {}  # 协程调度器列表，批次号->协程调度器
         self.web_driver_manager_holder: Dict[str, WebDriverManager] = {}  # web驱动管理器。批次号->web驱动管理器
         self.has_unreleased_resource_holder: Dict[str, bool] = {}  # 用于记录每个批次中是否还有未释放的资源。批次号->bool
+        self.process_shard_groups: Dict[str, Any] = {}  # 多进程模式的分片组。批次号->ProcessShardGroup
 
     def _reset(self):
         self.future_list = []  # 任务执行结果列表
@@ -56,36 +70,77 @@ class TaskBatchExecutor(QThread):
         # self.fail_task_count = 0  # 失败任务数
 
     def run(self):
-        # 思路：一次提交多个批次，则顺序执行
+        # 思路：一次提交多个批次，默认顺序执行；配置了max_parallel_batches>1时，批次在同一事件循环中并行执行
+        watchdog = self.start_loop_block_watchdog(get_event_loop_safely())
         try:
-            for task_batch_config in self.task_batches_config:
-                # 重置数据
-                self._reset()
-                web_driver_manager = WebDriverManager(self.logger)
-                batch_no = task_batch_config.get("batch_info").get("batch_no")
-                self.has_unreleased_resource_holder[batch_no] = False
-                self.web_driver_manager_holder[batch_no] = web_driver_manager
-                try:
-                    # 支持多个任务顺序执行
-                    if task_batch_config.get("batch_info").get("user_mode") in (1, 2):
-                        # 单用户或多用户任务
-                        self.run_multi_user_mode(task_batch_config)
-                    else:
-                        # 无用户任务
-                        self.run_no_user_mode(task_batch_config)
-                finally:
-                    if not self.has_unreleased_resource_holder.get(batch_no):
-                        # 没有未释放的资源，则关闭驱动（playwright实例1个，browser实例1个，context实例n个）
-                        get_event_loop_safely().run_until_complete(web_driver_manager.close())
-                        # 已经释放了资源，则移除掉
-                        self.has_unreleased_resource_holder.pop(batch_no)
-                        # 移除web驱动管理器
-                        self.web_driver_manager_holder.pop(batch_no)
+            max_parallel_batches = self.get_max_parallel_batches()
+            if max_parallel_batches > 1 and len(self.task_batches_config) > 1:
+                get_event_loop_safely().run_until_complete(self._run_batches_in_parallel(max_parallel_batches))
+            else:
+                for task_batch_config in self.task_batches_config:
+                    # 重置数据
+                    self._reset()
+                    get_event_loop_safely().run_until_complete(self._run_one_batch(task_batch_config))
         finally:
+            if watchdog:
+                watchdog.stop()
             self.all_task_batch_finished.emit(self.action_id, self.batch_nos,
                                               set(self.has_unreleased_resource_holder.keys()))
 
-    def run_multi_user_mode(self, task_batch_config: Dict[str, Any]):
+    async def _run_batches_in_parallel(self, max_parallel_batches: int):
+        """
+        并行执行批次：同一事件循环中最多同时运行max_parallel_batches个批次
+        每个批次拥有独立的CoroutineScheduler和WebDriverManager，批次之间互不等待；
+        优先级（priority）只决定批次获得运行名额的先后顺序
+        :param max_parallel_batches: 最大并行批次数
+        """
+        semaphore = asyncio.Semaphore(max_parallel_batches)
+        # 有效优先级越小越先获得运行名额（排序稳定，同优先级保持提交顺序）
+        now = time.time()
+        ordered_configs = sorted(self.task_batches_config,
+                                 key=lambda cfg: BatchJobQueue.effective_priority(cfg.get("batch_info", {}), now))
+
+        async def _run_with_limit(task_batch_config):
+            async with semaphore:
+                await self._run_one_batch(task_batch_config)
+
+        self.logger.info(f"并行执行批次 | 批次数：{len(ordered_configs)} | 最大并行批次数：{max_parallel_batches}")
+        results = await asyncio.gather(*(_run_with_limit(cfg) for cfg in ordered_configs), return_exceptions=True)
+        for task_batch_config, result in zip(ordered_configs, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"任务批次号：{task_batch_config.get('batch_info').get('batch_no')} | "
+                                  f"执行失败：{str(result)}")
+
+    async def _run_one_batch(self, task_batch_config: Dict[str, Any]):
+        """
+        执行一个批次，批次结束后若没有未释放的资源则关闭驱动
+        :param task_batch_config: 任务批次配置
+        """
+        web_driver_manager = self.create_web_driver_manager(task_batch_config)
+        batch_no = task_batch_config.get("batch_info").get("batch_no")
+        self.has_unreleased_resource_holder[batch_no] = False
+        self.web_driver_manager_holder[batch_no] = web_driver_manager
+        try:
+            if task_batch_config.get("batch_info").get("user_mode") in (1, 2):
+                # 单用户或多用户任务
+                if self.get_worker_process_count(task_batch_config) > 1:
+                    # 配置了多个工作进程，用户分片到子进程执行
+                    await self.run_multi_process_mode(task_batch_config)
+                else:
+                    await self.run_multi_user_mode(task_batch_config)
+            else:
+                # 无用户任务
+                await self.run_no_user_mode(task_batch_config)
+        finally:
+            if not self.has_unreleased_resource_holder.get(batch_no):
+                # 没有未释放的资源，则关闭驱动（playwright实例1个，browser实例1个，context实例n个）
+                await web_driver_manager.close()
+                # 已经释放了资源，则移除掉
+                self.has_unreleased_resource_holder.pop(batch_no)
+                # 移除web驱动管理器
+                self.web_driver_manager_holder.pop(batch_no)
+
+    async def run_multi_user_mode(self, task_batch_config: Dict[str, Any]):
         """
         运行多用户模式（用户任务）
         :param task_batch_config: 任务批次配置
@@ -95,36 +150,140 @@ class TaskBatchExecutor(QThread):
         batch_no = batch_info.get("batch_no")  # 批次号
         self.logger.debug(f"任务批次号【{batch_no}】 | 启动任务")
         try:
-            unfinished_users, user_manager = self._format_user_info(batch_info.get("user_mode"),
-                                                                    batch_info.get("user_info", {}))
-            if not unfinished_users:
-                self.logger.info(f"任务批次：{batch_no} | 无待处理用户，任务退出！")
+            prepared = await asyncio.to_thread(self._prepare_users, task_batch_config)
+            if prepared is None:
+                return
+            ok_users, user_manager = prepared
+            await self._run_users(task_batch_config, ok_users, user_manager)
+        except Exception as e:
+            self.logger.error(f"任务批次号：{batch_no} | 启动任务失败：{str(e)}")
+            self.db.task_batch_dao.update_by_batch_no(batch_no, {"execute_status": 2, "remark": str(e)})
+
+    async def run_multi_process_mode(self, task_batch_config: Dict[str, Any]):
+        """
+        运行多进程模式（用户任务）
+        批次用户按轮询方式分片到多个子进程执行，每个子进程拥有独立的事件循环和WebDriverManager
+        日志、Excel写入、用户成功/失败计数通过事件队列回传到本线程处理
+        :param task_batch_config: 任务批次配置
+        :return:
+        """
+        # 延迟导入，避免循环引用
+        from src.frame.process_batch_executor import ProcessShardGroup
+
+        batch_info = task_batch_config.get("batch_info")  # 批次信息
+        batch_no = batch_info.get("batch_no")  # 批次号
+        self.logger.debug(f"任务批次号【{batch_no}】 | 启动任务（多进程模式）")
+        try:
+            prepared = await asyncio.to_thread(self._prepare_users, task_batch_config)
+            if prepared is None:
+                return
+            ok_users, user_manager = prepared
+            process_count = min(self.get_worker_process_count(task_batch_config), len(ok_users), os.cpu_count() or 1)
+            if process_count <= 1:
+                # 用户数或CPU核数不足以分片，退回当前线程执行
+                await self._run_users(task_batch_config, ok_users, user_manager)
                 return
 
-            ok_users = []
-            for unfinished_user in unfinished_users:
-                if not unfinished_user or len(unfinished_user) < 1:
-                    self.logger.warning(f"任务批次：{batch_no} | 存在用户信息格式错误，请检查：{unfinished_user}")
-                    continue
-                ok_users.append(unfinished_user)
-
-            # 待处理用户数
-            self.total_task_count = len(unfinished_users)
-            # 更新批次信息
-            self.db.task_batch_dao.update_by_batch_no(batch_no,
-                                                      {"total_user": self.total_task_count, "execute_status": 1})
             self.logger.info(
-                f"启动批量任务 | 任务批次：{batch_no} | 待处理用户数：{self.total_task_count} | 最大并发数：{self.total_task_count}")
-            coro_funcs = []
-            for user in ok_users:
-                coro_funcs.append(
-                    (self.execute_single_user_task, (user_manager, user, task_batch_config, self.logger), {}))
-            # 执行协程
-            get_event_loop_safely().run_until_complete(
-                self._execute_one_task_batch(coro_funcs, task_batch_config))
+                f"启动批量任务 | 任务批次：{batch_no} | 待处理用户数：{len(ok_users)} | "
+                f"工作进程数：{process_count}")
+            shard_group = ProcessShardGroup(task_batch_config, ok_users, process_count, user_manager, self.logger)
+            # 分片组与协程调度器一样提供cancel方法，“释放资源”时统一取消
+            self.coroutine_schedulers[batch_no] = shard_group
+            self.process_shard_groups[batch_no] = shard_group
+            shard_group.start()
+            # 在线程中等待所有分片执行完毕，不阻塞事件循环（并行执行的其它批次）
+            has_unreleased = await asyncio.to_thread(
+                shard_group.wait, on_user_finished=lambda is_success: self._record_user_result(batch_no, is_success))
+            if has_unreleased:
+                # 子进程中仍有未关闭的浏览器，“释放资源”时由分片组通知子进程关闭
+                self.has_unreleased_resource_holder[batch_no] = True
         except Exception as e:
             self.logger.error(f"任务批次号：{batch_no} | 启动任务失败：{str(e)}")
             self.db.task_batch_dao.update_by_batch_no(batch_no, {"execute_status": 2, "remark": str(e)})
+            return
+        await asyncio.to_thread(write_behind_writer.flush)
+        self.logger.info(f"任务批次号：{batch_no} | 所有任务执行完毕！")
+        self._on_task_batch_completed(batch_no)
+
+    def _prepare_users(self, task_batch_config: Dict[str, Any]) -> Optional[Tuple[List[tuple], Optional[UserManager]]]:
+        """
+        加载批次待处理用户，并更新批次的用户总数和执行状态
+        读取用户文档、等待后台写入落盘、查询数据库均为阻塞操作，协程中请用asyncio.to_thread调用
+        :param task_batch_config: 任务批次配置
+        :return: (格式正确的用户列表, 用户管理器)；无待处理用户返回None
+        """
+        batch_info = task_batch_config.get("batch_info")  # 批次信息
+        batch_no = batch_info.get("batch_no")  # 批次号
+        # 先等待后台写入落盘：其它批次对同一用户文档的写入、用户执行记录
+        write_behind_writer.flush()
+        unfinished_users, user_manager = self._format_user_info(batch_info.get("user_mode"),
+                                                                batch_info.get("user_info", {}))
+        if not unfinished_users:
+            self.logger.info(f"任务批次：{batch_no} | 无待处理用户，任务退出！")
+            return None
+
+        # 中断后恢复的批次（如程序重启前未执行完毕）：执行成功的用户不再重复执行，执行失败的用户重新执行
+        # 重新运行已结束/已取消的批次时，用户记录已由触发器清空
+        self.db.task_batch_user_dao.delete_failed(batch_no)
+        finished_usernames = self.db.task_batch_user_dao.get_success_usernames(batch_no)
+        ok_users = []
+        for unfinished_user in unfinished_users:
+            if not unfinished_user or len(unfinished_user) < 1:
+                self.logger.warning(f"任务批次：{batch_no} | 存在用户信息格式错误，请检查：{unfinished_user}")
+                continue
+            if unfinished_user[0] in finished_usernames:
+                continue
+            ok_users.append(unfinished_user)
+        if finished_usernames:
+            self.logger.info(f"任务批次：{batch_no} | 跳过已执行成功的用户数：{len(unfinished_users) - len(ok_users)}")
+
+        # 更新批次信息，总用户数含已执行成功的用户，成功/失败用户数以用户执行记录为准（重新运行时不重复累计）
+        # 多个批次并行执行，此处不写入执行器的共享字段
+        self.db.task_batch_dao.update_by_batch_no(batch_no, {"total_user": len(unfinished_users), "execute_status": 1,
+                                                             **self.db.task_batch_user_dao.count_by_result(batch_no)})
+        if not ok_users:
+            self.logger.info(f"任务批次：{batch_no} | 所有用户均已执行完毕，任务退出！")
+            self._on_task_batch_completed(batch_no)
+            return None
+        return ok_users, user_manager
+
+    async def _run_users(self, task_batch_config: Dict[str, Any], users: List[tuple], user_manager: Optional[UserManager]):
+        """
+        在当前线程的事件循环中执行用户任务，所有用户执行完毕后返回
+        :param task_batch_config: 任务批次配置
+        :param users: 用户列表
+        :param user_manager: 用户管理器
+        """
+        batch_no = task_batch_config.get("batch_info").get("batch_no")
+        if isinstance(user_manager, UserManager):
+            # Excel写入交给后台写入器，不阻塞事件循环
+            user_manager = WriteBehindUserManager(user_manager)
+        max_in_flight = self.get_max_in_flight(task_batch_config)
+        self.logger.info(
+            f"启动批量任务 | 任务批次：{batch_no} | 待处理用户数：{len(users)} | "
+            f"最大并发数：{max_in_flight or len(users)}")
+        # 编译任务蓝图（同一批次的用户共用，加载组件涉及磁盘读取，在线程中执行）
+        blueprint = await asyncio.to_thread(TaskBlueprint.compile, task_batch_config)
+        web_driver_manager = self.web_driver_manager_holder.get(batch_no)
+        if web_driver_manager:
+            # 会话缓存：登录节点无法校验会话时，新建Context不恢复缓存的会话
+            session_ttl_seconds = get_session_ttl_seconds(task_batch_config.get("batch_info", {}).get("global_config"))
+            if session_ttl_seconds and await asyncio.to_thread(blueprint.supports_session_validation):
+                web_driver_manager.configure_session_cache(get_session_domain(task_batch_config), session_ttl_seconds)
+        # 启动预热Context池（后台创建），用户启动时直接取用
+        warm_pool_size, warm_pool_idle_seconds = self.get_warm_pool_config(task_batch_config)
+        if warm_pool_size and web_driver_manager:
+            web_driver_manager.start_warm_pool(
+                DriverConfigFormatter.format(task_batch_config.get("batch_info").get("global_config")),
+                min(warm_pool_size, len(users)), warm_pool_idle_seconds)
+        coro_funcs = []
+        for user in users:
+            coro_funcs.append(
+                (self.execute_single_user_task, (user_manager, user, task_batch_config, self.logger),
+                 {"blueprint": blueprint}))
+        # 执行协程
+        await self._execute_one_task_batch(coro_funcs, task_batch_config)
 
     async def _execute_one_task_batch(self, coro_funcs, task_batch_config):
         """执行一个批次任务"""
@@ -132,23 +291,48 @@ class TaskBatchExecutor(QThread):
         batch_info = task_batch_config.get("batch_info")
         batch_no = batch_info.get("batch_no")
         login_interval = self.get_login_interval(task_batch_config)
-        scheduler = CoroutineScheduler(batch_no)
+        # 注册准入控制：批次在途上限 + 全局在途上限 + 批次权重（来自优先级）
+        global_max_in_flight = self.get_global_max_in_flight(task_batch_config)
+        if global_max_in_flight is not None:
+            admission_controller.set_global_max_in_flight(global_max_in_flight)
+        admission_controller.set_aging_seconds(BatchJobQueue.get_aging_seconds(batch_info))
+        admission_controller.register_batch(batch_no, self.get_max_in_flight(task_batch_config),
+                                            batch_info.get("priority"))
+        scheduler = CoroutineScheduler(batch_no, admission_controller)
         self.coroutine_schedulers[batch_no] = scheduler
-        # 当所有任务完成后该方法才会返回
-        await scheduler.add_tasks_with_interval(coro_funcs=coro_funcs, interval=login_interval,
-                                                callback=lambda task_id, status, result,
-                                                                exec, args, kwargs: self.on_one_task_finished(
-                                                    task_id, status, result, exec, task_batch_config,
-                                                    batch_info.get("global_config", {}), *args, **kwargs),
-                                                )
+        try:
+            # 当所有任务完成后该方法才会返回
+            await scheduler.add_tasks_with_interval(coro_funcs=coro_funcs, interval=login_interval,
+                                                    rate_limiter=self.get_rate_limiter(task_batch_config),
+                                                    callback=lambda task_id, status, result,
+                                                                    exec, args, kwargs: self.on_one_task_finished(
+                                                        task_id, status, result, exec, task_batch_config,
+                                                        batch_info.get("global_config", {}), *args, **kwargs),
+                                                    )
+        finally:
+            admission_controller.unregister_batch(batch_no)
+        # 等待用户执行结果落盘后再结束批次，保证批次的成功/失败用户数完整
+        await asyncio.to_thread(write_behind_writer.flush)
         self.logger.info(f"任务批次号：{batch_no} | 所有任务执行完毕！")
-        # 一个批次中所有的任务都完成了，更新批次状态
+        self._on_task_batch_completed(batch_no)
+
+    def _on_task_batch_completed(self, batch_no: str):
+        """一个批次中所有的任务都完成了，更新批次状态并通知UI"""
         self.db.task_batch_dao.update_status(batch_no, 2)
         self.one_task_batch_finished.emit(self.action_id, batch_no)
 
-    def on_one_task_finished(self, task_id: str, status: str, result: Any, exc: Optional[Exception],
-                             task_batch_config: dict, global_config: dict, *args, **kwargs):
+    def _record_user_result(self, batch_no: str, is_success: bool):
+        """
+        记录单个用户任务的执行结果（累加批次成功/失败用户数，由后台写入器落盘）
+        :param batch_no: 批次号
+        :param is_success: 是否成功
+        """
+        write_behind_writer.add_user_count(batch_no, is_success)
+
+    async def on_one_task_finished(self, task_id: str, status: str, result: Any, exc: Optional[Exception],
+                                   task_batch_config: dict, global_config: dict, *args, **kwargs):
         # 一个批次中单个任务的回调，若是页面上操作释放资源，则协程会被取消，会回调该方法！
+        # 协程调度器会等待该回调执行完毕（Context关闭）后，才归还准入名额放行下一个用户
         batch_no = task_batch_config.get("batch_info").get("batch_no")
         if status == "completed":
             if not isinstance(result, tuple) or len(result) != 2:
@@ -159,34 +343,31 @@ class TaskBatchExecutor(QThread):
             try:
                 if is_success:
                     self.logger.info(f"任务批次号：{batch_no} | 用户任务执行完成，状态：成功")
-                    self.db.task_batch_dao.add_one_success_user(batch_no)
                 else:
                     self.logger.info(f"任务批次号：{batch_no} | 用户任务执行完成，状态：失败")
-                    self.db.task_batch_dao.add_one_fail_user(batch_no)
+                self._record_user_result(batch_no, is_success)
             except Exception as e:
                 self.logger.error(f"处理任务回调异常：{str(e)}")
             finally:
                 # 任务执行完毕，关闭当前用户的浏览器
                 if task_batch_config.get("task_tmpl").get("is_quit_browser_when_finished", True):
                     self.logger.debug(f"关闭专属Context")
-                    get_event_loop_safely().run_until_complete(
-                        self.web_driver_manager_holder.get(batch_no).remove_user_driver(batch_no, username))
+                    await self.web_driver_manager_holder.get(batch_no).remove_user_driver(batch_no, username)
                 else:
                     self.logger.info(f"任务执行完毕，不关闭当前用户的浏览器，请用户手动关闭！")
                     self.has_unreleased_resource_holder[batch_no] = True  # 不能自动释放，需要手动释放
         elif status == "cancelled":
             # 任务被取消，往往是因为用户操作取消了，比如：用户操作点击了“释放资源”的按钮！目前的逻辑是：直接释放资源（关闭驱动）！
             username = args[1][0]
-            get_event_loop_safely().run_until_complete(
-                self.web_driver_manager_holder.get(batch_no).remove_user_driver(batch_no, username))
+            await self.web_driver_manager_holder.get(batch_no).remove_user_driver(batch_no, username)
             self.logger.info(f"任务批次号：{batch_no} | 用户任务执行完成，状态：取消")
-            self.db.task_batch_dao.add_one_fail_user(batch_no)
+            self._record_user_result(batch_no, False)
         else:  # 异常
             self.logger.debug(f"任务批次号：{batch_no} | 用户任务执行完成，状态：异常", exec_info=exc)
             self.logger.info(f"任务批次号：{batch_no} | 用户任务执行完成，状态：异常，原因：{str(exc)}")
-            self.db.task_batch_dao.add_one_fail_user(batch_no)
+            self._record_user_result(batch_no, False)
 
-    def run_no_user_mode(self, task_batch_config):
+    async def run_no_user_mode(self, task_batch_config):
         """
         无用户模式（无用户任务）
         必定是逐个执行的！
@@ -198,8 +379,7 @@ class TaskBatchExecutor(QThread):
             batch_no = batch_info.get("batch_no")  # 批次号
             self.logger.debug(f"任务批次号【{batch_no}】 | 启动任务")
             coro_funcs = [(self.execute_no_user_task, (task_batch_config, self.logger), {})]
-            get_event_loop_safely().run_until_complete(
-                self._execute_one_task_batch(coro_funcs, task_batch_config))
+            await self._execute_one_task_batch(coro_funcs, task_batch_config)
         except Exception as e:
             self.logger.error(f"任务执行失败：{str(e)}")
 
@@ -210,10 +390,237 @@ class TaskBatchExecutor(QThread):
         task_login_interval = int(task_batch_config.get("task_tmpl", {}).get("login_interval", 0))
         return task_login_interval if task_login_interval is not None and task_login_interval > 0 else global_login_interval
 
+    def get_rate_limiter(self, task_batch_config) -> Optional[AdaptiveRateLimiter]:
+        """
+        获取目标站点的自适应限流器（同一站点的批次共享）
+        初始间隔为登录间隔，最小间隔读取全局配置min_login_interval（默认1秒），
+        最大间隔读取全局配置max_login_interval（默认登录间隔的4倍）；
+        全局配置adaptive_rate_limit=0时不限流，按固定登录间隔启动
+        """
+        global_config = task_batch_config.get("batch_info", {}).get("global_config", {}) or {}
+        domain = task_batch_config.get("task_tmpl", {}).get("domain")
+        if str(global_config.get("adaptive_rate_limit", "1")) == "0" or not domain:
+            return None
+        login_interval = self.get_login_interval(task_batch_config)
+        try:
+            min_interval = float(global_config.get("min_login_interval", 1))
+            max_interval = float(global_config.get("max_login_interval", login_interval * 4))
+        except (TypeError, ValueError):
+            self.logger.warning(f"min_login_interval/max_login_interval配置有误，按默认值处理")
+            min_interval, max_interval = 1, login_interval * 4
+        return rate_limiter_registry.get(domain, login_interval, min(min_interval, login_interval),
+                                         max(max_interval, login_interval))
+
+    def get_max_in_flight(self, task_batch_config) -> int:
+        """
+        获取批次最大在途（同时运行）用户数
+        读取批次全局配置max_concurrent_users，0或未配置-不限制
+        """
+        try:
+            return max(0, int(
+                task_batch_config.get("batch_info", {}).get("global_config", {}).get("max_concurrent_users", 0) or 0))
+        except (TypeError, ValueError):
+            self.logger.warning(f"max_concurrent_users配置有误，按不限制处理")
+            return 0
+
+    def get_warm_pool_config(self, task_batch_config) -> Tuple[int, int]:
+        """
+        获取预热Context池配置
+        读取批次全局配置warm_pool_size（池大小，0或未配置-不预热）、warm_pool_idle_seconds（空闲收缩时长，默认60秒）
+        :return: (池大小, 空闲收缩时长)
+        """
+        global_config = task_batch_config.get("batch_info", {}).get("global_config", {}) or {}
+        try:
+            return (max(0, int(global_config.get("warm_pool_size", 0) or 0)),
+                    max(0, int(global_config.get("warm_pool_idle_seconds", 60) or 0)))
+        except (TypeError, ValueError):
+            self.logger.warning(f"warm_pool_size/warm_pool_idle_seconds配置有误，不启用预热Context池")
+            return 0, 0
+
+    def create_web_driver_manager(self, task_batch_config) -> WebDriverManager:
+        """
+        创建批次的web驱动管理器：配置浏览器分片、启动档案、资源采样、存活监测，
+        Context重建（浏览器崩溃、页面崩溃、资源超限回收）时通知用户任务重启，Context失效且不再重建时通知用户任务失败，
+        资源采样结果通过resource_usage_updated信号发给UI
+        """
+        web_driver_manager = WebDriverManager(self.logger)
+        web_driver_manager.configure_browser_shards(*self.get_browser_shard_config(task_batch_config))
+        web_driver_manager.configure_launch_profile(self.get_launch_profile(task_batch_config))
+        web_driver_manager.configure_resource_monitor(*self.get_resource_monitor_config(task_batch_config))
+        web_driver_manager.configure_liveness(*self.get_liveness_config(task_batch_config))
+        web_driver_manager.configure_profile_store(*self.get_profile_store_config(task_batch_config))
+        web_driver_manager.add_rebuild_listener(self._on_driver_rebuilding)
+        web_driver_manager.add_failure_listener(self._on_driver_lost)
+        batch_no = task_batch_config.get("batch_info").get("batch_no")
+        # 全局browser、分片浏览器在用户创建Context之外启动（如预热Context池），启动时登记进程，释放资源时按批次清理
+        web_driver_manager.configure_process_capture(
+            lambda browser_type: self._get_process_manager(browser_type, batch_no).capture_new_browser_processes(
+                batch_no))
+        web_driver_manager.add_usage_listener(
+            lambda usages: self.resource_usage_updated.emit(
+                batch_no, [{"username": username, **usage.to_dict()} for (username, _), usage in usages.items()]))
+        return web_driver_manager
+
+    def get_browser_shard_config(self, task_batch_config) -> Tuple[int, str]:
+        """
+        获取浏览器分片配置（仅无痕模式生效）
+        读取批次全局配置browser_shard_count（浏览器进程数，小于等于1或未配置-共用一个浏览器）、
+        browser_shard_placement（Context分配策略：least_loaded-最少负载（默认），hash-按用户名一致性哈希）
+        :return: (浏览器进程数, 分配策略)
+        """
+        global_config = task_batch_config.get("batch_info", {}).get("global_config", {}) or {}
+        placement = global_config.get("browser_shard_placement") or PLACEMENT_LEAST_LOADED
+        if placement not in (PLACEMENT_LEAST_LOADED, PLACEMENT_HASH):
+            self.logger.warning(f"browser_shard_placement配置有误：{placement}，按最少负载分配处理")
+            placement = PLACEMENT_LEAST_LOADED
+        try:
+            return max(1, int(global_config.get("browser_shard_count", 1) or 1)), placement
+        except (TypeError, ValueError):
+            self.logger.warning(f"browser_shard_count配置有误，不启用浏览器分片")
+            return 1, placement
+
+    def get_launch_profile(self, task_batch_config) -> LaunchProfile:
+        """
+        获取浏览器启动档案
+        读取任务模板配置launch_config（profile：default/lean，mute_media：是否静音，max_frame_rate：最大帧率，
+        renderer_memory_mb：渲染进程JS堆上限），配置有误按默认档案处理
+        """
+        launch_config = (task_batch_config.get("task_tmpl_config") or {}).get("launch_config")
+        try:
+            return LaunchProfile.from_config(launch_config)
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"launch_config配置有误：{str(e)}，按默认启动档案处理")
+            return LaunchProfile()
+
+    def get_resource_monitor_config(self, task_batch_config) -> Tuple[int, int]:
+        """
+        获取资源采样配置（仅Chrome）
+        读取批次全局配置resource_sample_seconds（采样周期，0或未配置-不采样）、
+        context_recycle_memory_mb（Context的JS堆超过该值时重建Context并从重登节点重新执行，0或未配置-不回收），
+        配置了回收阈值但未配置采样周期时，按30秒采样
+        :return: (采样周期, 回收阈值)
+        """
+        global_config = task_batch_config.get("batch_info", {}).get("global_config", {}) or {}
+        try:
+            sample_seconds = max(0, int(global_config.get("resource_sample_seconds", 0) or 0))
+            recycle_memory_mb = max(0, int(global_config.get("context_recycle_memory_mb", 0) or 0))
+        except (TypeError, ValueError):
+            self.logger.warning(f"resource_sample_seconds/context_recycle_memory_mb配置有误，不启用资源采样")
+            return 0, 0
+        if recycle_memory_mb and not sample_seconds:
+            sample_seconds = 30
+        return sample_seconds, recycle_memory_mb
+
+    def get_liveness_config(self, task_batch_config) -> Tuple[str, int]:
+        """
+        获取存活监测配置
+        读取批次全局配置context_lost_policy（Context意外关闭、页面崩溃时的处理策略：restart-重建Context并从重登节点重启任务（默认），
+        fail-任务失败）、max_context_restarts（每个用户最多重建次数，默认3）
+        :return: (处理策略, 最多重建次数)
+        """
+        global_config = task_batch_config.get("batch_info", {}).get("global_config", {}) or {}
+        policy = global_config.get("context_lost_policy") or CONTEXT_LOST_RESTART
+        if policy not in (CONTEXT_LOST_RESTART, CONTEXT_LOST_FAIL):
+            self.logger.warning(f"context_lost_policy配置有误：{policy}，按重建处理")
+            policy = CONTEXT_LOST_RESTART
+        try:
+            return policy, max(0, int(global_config.get("max_context_restarts", 3) or 0))
+        except (TypeError, ValueError):
+            self.logger.warning(f"max_context_restarts配置有误，按3次处理")
+            return policy, 3
+
+    def get_profile_store_config(self, task_batch_config) -> Tuple[bool, List[str], int, int]:
+        """
+        获取持久化目录配置（仅非无痕模式生效）
+        读取批次全局配置golden_profile（1-新用户的目录从模板目录克隆）、golden_profile_urls（生成模板目录时预热访问的网址，英文逗号分隔）、
+        profile_gc_idle_days（用户目录闲置天数上限，0或未配置-不回收）、profile_gc_max_count（用户目录数量上限，0或未配置-不限制）
+        :return: (是否启用模板目录, 预热网址, 闲置天数上限, 数量上限)
+        """
+        global_config = task_batch_config.get("batch_info", {}).get("global_config", {}) or {}
+        golden_profile = str(global_config.get("golden_profile", "0") or "0") == "1"
+        warm_urls = [url.strip() for url in str(global_config.get("golden_profile_urls", "") or "").split(",")
+                     if url.strip()]
+        try:
+            return (golden_profile, warm_urls, max(0, int(global_config.get("profile_gc_idle_days", 0) or 0)),
+                    max(0, int(global_config.get("profile_gc_max_count", 0) or 0)))
+        except (TypeError, ValueError):
+            self.logger.warning(f"profile_gc_idle_days/profile_gc_max_count配置有误，不回收持久化目录")
+            return golden_profile, warm_urls, 0, 0
+
+    def _find_user_tasks(self, username: str, batch_no: str) -> List[Task]:
+        return [task for task in list(self.task_scheduler.tasks.values())
+                if task.username == username and task.task_config.get("batch_info", {}).get("batch_no") == batch_no]
+
+    def _on_driver_lost(self, username: str, batch_no: str, reason: str):
+        """用户的Context已失效且不再重建，通知用户任务失败"""
+        for task in self._find_user_tasks(username, batch_no):
+            task.request_fail(reason)
+
+    def _on_driver_rebuilding(self, username: str, batch_no: str, driver_future: asyncio.Future, reason: str):
+        """用户的Context重建中，通知用户任务中断当前节点，等待新的Context后从重登节点重新执行"""
+        for task in self._find_user_tasks(username, batch_no):
+            task.request_restart(driver_future, reason)
+
+    def get_max_parallel_batches(self) -> int:
+        """
+        获取一次动作中最大并行批次数
+        读取批次全局配置max_parallel_batches（同一动作的批次共用同一份全局配置，取第一个批次），小于等于1或未配置-顺序执行
+        """
+        global_config = self.task_batches_config[0].get("batch_info", {}).get("global_config", {}) or {}
+        try:
+            return max(1, int(global_config.get("max_parallel_batches", 1) or 1))
+        except (TypeError, ValueError):
+            self.logger.warning(f"max_parallel_batches配置有误，按顺序执行处理")
+            return 1
+
+    def start_loop_block_watchdog(self, loop) -> Optional[LoopBlockWatchdog]:
+        """
+        启动事件循环阻塞检测（调试用），须在事件循环所在线程调用
+        读取批次全局配置loop_block_threshold_ms（取第一个批次），事件循环超过该毫秒数未响应时输出阻塞位置的调用栈；0或未配置-不检测
+        :return: 检测器，未启用返回None
+        """
+        global_config = self.task_batches_config[0].get("batch_info", {}).get("global_config", {}) or {}
+        try:
+            threshold_ms = int(global_config.get("loop_block_threshold_ms", 0) or 0)
+        except (TypeError, ValueError):
+            self.logger.warning(f"loop_block_threshold_ms配置有误，不启用事件循环阻塞检测")
+            return None
+        if threshold_ms <= 0:
+            return None
+        watchdog = LoopBlockWatchdog(loop, threshold_ms, self.logger)
+        watchdog.start()
+        return watchdog
+
+    def get_worker_process_count(self, task_batch_config) -> int:
+        """
+        获取批次工作进程数
+        读取批次全局配置worker_process_count，小于等于1或未配置-在当前线程执行（不启用多进程）
+        """
+        try:
+            return max(1, int(
+                task_batch_config.get("batch_info", {}).get("global_config", {}).get("worker_process_count", 1) or 1))
+        except (TypeError, ValueError):
+            self.logger.warning(f"worker_process_count配置有误，按单进程处理")
+            return 1
+
+    def get_global_max_in_flight(self, task_batch_config) -> Optional[int]:
+        """
+        获取全局最大在途用户数（所有批次共享）
+        读取批次全局配置global_max_concurrent_users，0-不限制；未配置返回None，保持准入控制器现有设置
+        """
+        value = task_batch_config.get("batch_info", {}).get("global_config", {}).get("global_max_concurrent_users")
+        if value is None or str(value).strip() == "":
+            return None
+        try:
+            return max(0, int(value))
+        except (TypeError, ValueError):
+            self.logger.warning(f"global_max_concurrent_users配置有误，按不限制处理")
+            return 0
+
     async def execute_single_user_task(self, user_manager,
                                        user_config: Tuple[str, str],
                                        task_batch_config: dict,
-                                       logger):
+                                       logger, blueprint: Optional[TaskBlueprint] = None):
         """执行单个用户任务（Driver外部创建+重登后从头执行）"""
         task_success = False
         task = None
@@ -227,9 +634,10 @@ class TaskBatchExecutor(QThread):
             # 设置日志显示的用户名
             qt_logger.set_current_user(basic.mask_username(username))
             # 创建浏览器驱动
-            driver = await self._create_driver(username, batch_no, DriverConfigFormatter.format(global_config))
+            driver = await self._create_driver(username, batch_no, DriverConfigFormatter.format(global_config),
+                                               blueprint.routing_profile if blueprint else None)
             # 创建任务
-            task = Task(driver, user_config, task_batch_config, logger, user_manager)
+            task = Task(driver, user_config, task_batch_config, logger, user_manager, blueprint)
             # 提交任务
             self.task_scheduler.submit_task(task)
             # 注册任务到热加载器中，热加载器负责回调任务调度器的热加载方法！pause by zcy! 20260127!
@@ -246,6 +654,8 @@ class TaskBatchExecutor(QThread):
             # self.progress_update_signal.emit(int((self.completed_task_count / self.total_task_count) * 100))
             # # 发送任务完成信号
             # self.user_task_finished_signal.emit(username, task_success)
+        # 记录用户已执行完毕（被取消的用户不记录，再次运行批次时重新执行）
+        write_behind_writer.mark_user_finished(batch_no, username, task_success)
         return username, task_success
 
     def _register_hot_reload(self, task: Task):
@@ -278,8 +688,11 @@ class TaskBatchExecutor(QThread):
         task = None
         try:
             batch_info = task_batch_config.get("batch_info", {})
+            routing_profile = await asyncio.to_thread(
+                RoutingProfile.from_config, (task_batch_config.get("task_tmpl_config") or {}).get("routing_config"))
             driver = await self._create_driver(username, batch_info.get("batch_no"),
-                                               DriverConfigFormatter.format(batch_info.get("global_config")))
+                                               DriverConfigFormatter.format(batch_info.get("global_config")),
+                                               routing_profile)
             task = Task(driver, (username, ''), task_batch_config, logger)
             self.task_scheduler.submit_task(task)
             task_success = await self.task_scheduler.start_task(task.task_uuid)
@@ -297,28 +710,35 @@ class TaskBatchExecutor(QThread):
             # self.user_task_finished_signal.emit(username, task_success)
         return username, task_success
 
-    async def _create_driver(self, username, batch_no, driver_config: DriverConfig):
+    async def _create_driver(self, username, batch_no, driver_config: DriverConfig,
+                             routing_profile: Optional[RoutingProfile] = None):
         # 设置日志显示的用户名
         qt_logger.set_current_user(basic.mask_username(username))
         # 步骤1：注册批次
-        if driver_config.browser_type == "0":
+        process_manager = self._get_process_manager(driver_config.browser_type, batch_no)
+        # 步骤2：创建进程捕获器（记录操作前的Chrome进程池）
+        capture_func = await asyncio.to_thread(process_manager.capture_new_browser_processes, batch_no)
+        # 步骤3：创建用户浏览器
+        driver = await self.web_driver_manager_holder.get(batch_no).create_user_driver(username, batch_no,
+                                                                                       driver_config, routing_profile)
+        # 步骤4：执行捕获，获取新增的Chrome进程组（等待进程创建完成后，在线程中遍历进程，避免阻塞事件循环）
+        await asyncio.sleep(process_manager.PROCESS_CREATE_WAIT_SECONDS)
+        await asyncio.to_thread(capture_func, 0)
+        return driver
+
+    @staticmethod
+    def _get_process_manager(browser_type: str, batch_no: str):
+        """获取浏览器类型对应的进程管理器，并注册批次"""
+        if browser_type == "0":
             # chrome
             from src.frame.common.browser_process_manager import chrome_process_manager as process_manager
-        elif driver_config.browser_type == "1":
+        elif browser_type == "1":
             # firefox
             from src.frame.common.browser_process_manager import firefox_process_manager as process_manager
         else:
-            raise ParamError(f"不支持的浏览器类型：{driver_config.browser_type}")
-
+            raise ParamError(f"不支持的浏览器类型：{browser_type}")
         process_manager.register_batch(batch_no)
-        # 步骤2：创建进程捕获器（记录操作前的Chrome进程池）
-        capture_func = process_manager.capture_new_browser_processes(batch_no)
-        # 步骤3：创建用户浏览器
-        driver = await self.web_driver_manager_holder.get(batch_no).create_user_driver(username, batch_no,
-                                                                                       driver_config)
-        # 步骤4：执行捕获，获取新增的Chrome进程组
-        capture_func()
-        return driver
+        return process_manager
 
     def _format_user_info(self, user_mode, user_info):
         # 返回数据：([(用户名, 密码)], Optional[UserManager])
@@ -349,6 +769,7 @@ class TaskBatchExecutor(QThread):
         :return:
         """
         self.task_scheduler.terminate_task(batch_no, task_uuid, reason)
+        self._send_shard_command(batch_no, "terminate_task", batch_no, task_uuid, reason)
 
     def terminate_all(self):
         """
@@ -356,6 +777,7 @@ class TaskBatchExecutor(QThread):
         :return:
         """
         self.task_scheduler.terminate_task()
+        self._send_shard_command("", "terminate_all")
 
     def pause_task(self, batch_no: str = "", task_uuid: str = "", reason=""):
         """
@@ -366,6 +788,7 @@ class TaskBatchExecutor(QThread):
         :return:
         """
         self.task_scheduler.pause_task(batch_no, task_uuid, reason)
+        self._send_shard_command(batch_no, "pause_task", batch_no, task_uuid, reason)
 
     def resume_task(self, batch_no: str = "", task_uuid: str = "", reason=""):
         """
@@ -376,3 +799,15 @@ class TaskBatchExecutor(QThread):
         :return:
         """
         self.task_scheduler.resume_task(batch_no, task_uuid, reason)
+        self._send_shard_command(batch_no, "resume_task", batch_no, task_uuid, reason)
+
+    def _send_shard_command(self, batch_no: str, command: str, *args):
+        """
+        向多进程模式下的子进程转发控制命令
+        :param batch_no: 批次号，为空则发送给所有分片组
+        :param command: 命令（执行器的方法名）
+        :param args: 命令参数
+        """
+        for shard_batch_no, shard_group in self.process_shard_groups.items():
+            if not batch_no or batch_no == shard_batch_no:
+                shard_group.send_command(command, *args)
@@ -0,0 +1,210 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from src.frame.base.base_task_node import BaseNode, BasePYNode, JSNode
+from src.frame.common.routing_profile import RoutingProfile
+from src.frame.component_manager import component_manager
+from src.utils.keyword_matcher import KeywordMatcher
+from src.utils.sys_path_utils import SysPathUtils
+
+
+@dataclass
+class NodeBlueprint:
+    """节点蓝图：节点配置 + 已解析的组件类"""
+    node_config: Dict[str, Any]  # 节点配置 tb_node表，component_path已补全为绝对路径
+    component_cls: Optional[Type[BaseNode]] = None  # 组件类；None-每次实例化时重新加载（支持热加载的节点）
+
+    @property
+    def node_id(self):
+        return self.node_config.get("node_id")
+
+
+@dataclass
+class TaskGraph:
+    """
+    编译后的任务执行图：节点跳转表、重登跳转表、重登关键词匹配器
+    执行时按节点ID直接查表，不再逐跳读取节点参数、重登配置，也不再逐个关键词转小写匹配
+    """
+    start_node_id: Any
+    next_node_ids: Dict[Any, Any] = field(default_factory=dict)  # 节点ID -> 下一个节点ID（None-流程结束）
+    relogin_node_ids: Dict[Any, Any] = field(default_factory=dict)  # 支持重登的节点ID -> 重登节点ID
+    relogin_matcher: KeywordMatcher = field(default_factory=lambda: KeywordMatcher([]))  # 重登关键词匹配器
+    max_task_relogin_times: int = 3  # 任务整体最大重登次数
+    cycles: List[List[Any]] = field(default_factory=list)  # 流程中的循环（如课程监控->进入课程->课程监控）
+    unreachable_node_ids: FrozenSet[Any] = frozenset()  # 从起始节点不可达的节点
+
+    @classmethod
+    def compile(cls, start_node_id, node_configs: List[Dict[str, Any]],
+                task_tmpl_config: Optional[Dict[str, Any]] = None) -> "TaskGraph":
+        """
+        编译任务执行图并校验
+        :param start_node_id: 起始节点ID
+        :param node_configs: 节点配置列表
+        :param task_tmpl_config: 任务模板配置 tb_task_tmpl_config
+        :return: 任务执行图
+        """
+        relogin_config = (task_tmpl_config or {}).get("relogin_config", {}) or {}
+        graph = cls(start_node_id,
+                    relogin_matcher=KeywordMatcher(relogin_config.get("relogin_trigger_errors", []) or []),
+                    max_task_relogin_times=relogin_config.get("max_task_relogin_times", 3))
+        for node_cfg in node_configs:
+            node_id = node_cfg.get("node_id")
+            graph.next_node_ids[node_id] = node_cfg.get("next_node_id") or None
+            node_params = node_cfg.get("node_params", {}) or {}
+            if node_params.get("is_support_relogin"):
+                graph.relogin_node_ids[node_id] = node_params.get("relogin_node_id") or None
+        graph._validate()
+        return graph
+
+    def _validate(self):
+        """校验跳转目标是否存在，找出循环和不可达节点（只告警，执行时遇到不存在的节点终止流程）"""
+        for node_id, next_node_id in self.next_node_ids.items():
+            if next_node_id is not None and next_node_id not in self.next_node_ids:
+                logging.warning(f"任务流程校验：节点{node_id}的下一个节点{next_node_id}不存在，执行到此处流程将终止")
+        for node_id, relogin_node_id in self.relogin_node_ids.items():
+            if relogin_node_id is None:
+                logging.warning(f"任务流程校验：节点{node_id}支持重登，但未配置重登节点relogin_node_id，触发重登时流程将终止")
+            elif relogin_node_id not in self.next_node_ids:
+                logging.warning(f"任务流程校验：节点{node_id}的重登节点{relogin_node_id}不存在")
+
+        # 可达性：从起始节点沿下一个节点、重登节点遍历
+        reachable = set()
+        stack = [self.start_node_id]
+        while stack:
+            node_id = stack.pop()
+            if node_id is None or node_id in reachable or node_id not in self.next_node_ids:
+                continue
+            reachable.add(node_id)
+            stack.append(self.next_node_ids[node_id])
+            stack.append(self.relogin_node_ids.get(node_id))
+        self.unreachable_node_ids = frozenset(self.next_node_ids.keys() - reachable)
+        if self.unreachable_node_ids:
+            logging.warning(f"任务流程校验：节点{sorted(self.unreachable_node_ids, key=str)}从起始节点不可达")
+
+        # 循环检测：每个节点只有一个下一个节点，沿链路遍历，回到当前链路上的节点即为循环
+        visited = set()
+        for node_id in self.next_node_ids:
+            path_index: Dict[Any, int] = {}
+            path = []
+            current = node_id
+            while current is not None and current in self.next_node_ids and current not in visited:
+                visited.add(current)
+                path_index[current] = len(path)
+                path.append(current)
+                current = self.next_node_ids[current]
+            if current in path_index:
+                self.cycles.append(path[path_index[current]:])
+        if self.cycles:
+            logging.debug(f"任务流程包含循环：{self.cycles}")
+
+    def get_next_node_id(self, node_id):
+        """获取下一个节点ID，None-流程结束"""
+        return self.next_node_ids.get(node_id)
+
+    def match_relogin(self, node_id, error_msg: str) -> Tuple[bool, Any]:
+        """
+        匹配重登：节点支持重登且错误消息包含重登关键词时需要重登
+        :param node_id: 节点ID
+        :param error_msg: 错误消息
+        :return: (是否需要重登, 重登节点ID)；未配置重登节点时重登节点ID为None，流程结束
+        """
+        if node_id not in self.relogin_node_ids or not error_msg or not error_msg.strip():
+            return False, None
+        if not self.relogin_matcher.is_match(error_msg):
+            return False, None
+        return True, self.relogin_node_ids[node_id]
+
+
+class TaskBlueprint:
+    """
+    任务蓝图：同一批次所有用户的任务共用一份，批次启动时编译一次
+    编译时完成组件路径补全、组件依赖检查（requirements.txt）、组件加载、任务执行图编译、请求路由档案编译，
+    每个用户的Task只需按蓝图实例化节点对象，不再逐个用户重复读取磁盘、检查依赖
+    支持热加载的节点不缓存组件类，实例化时仍通过组件管理器加载（按文件修改时间判断是否重载），保证热加载后新用户用到最新代码
+    """
+
+    def __init__(self, task_config: Dict[str, Any]):
+        """
+        :param task_config: 任务批次配置
+        """
+        self.task_config = task_config
+        self.start_node_id = task_config.get("task_tmpl", {}).get("start_node_id")
+        self.node_blueprints: List[NodeBlueprint] = []
+        self.graph: Optional[TaskGraph] = None  # 任务执行图
+        self.routing_profile: Optional[RoutingProfile] = None  # 请求路由档案，创建Context时注册
+
+    @classmethod
+    def compile(cls, task_config: Dict[str, Any]) -> "TaskBlueprint":
+        """
+        编译任务蓝图（涉及磁盘读取、依赖安装，协程中请用asyncio.to_thread调用）
+        :param task_config: 任务批次配置
+        :return: 任务蓝图
+        """
+        blueprint = cls(task_config)
+        if not blueprint.start_node_id:
+            raise ValueError("配置中必须指定start_node_id")
+        for node_cfg in task_config.get("task_nodes", []):
+            # 填充完整组件路径（直接更新节点配置，热加载时按补全后的路径匹配）
+            node_cfg["component_path"] = cls.complete_component_path(node_cfg["component_path"])
+            component_cls = None
+            if not node_cfg.get("node_params", {}).get("is_support_hot_reload"):
+                component_cls = cls.load_component_cls(node_cfg["component_path"])
+            blueprint.node_blueprints.append(NodeBlueprint(node_cfg, component_cls))
+        if blueprint.start_node_id not in [node_blueprint.node_id for node_blueprint in blueprint.node_blueprints]:
+            raise ValueError(f"配置中指定的start_node_id：{blueprint.start_node_id} 不在该任务下")
+        blueprint.graph = TaskGraph.compile(blueprint.start_node_id,
+                                            [node_blueprint.node_config for node_blueprint in blueprint.node_blueprints],
+                                            task_config.get("task_tmpl_config"))
+        blueprint.routing_profile = RoutingProfile.from_config((task_config.get("task_tmpl_config") or {}).get("routing_config"))
+        if blueprint.routing_profile and blueprint.routing_profile.block_resource_types:
+            # 含登录节点时登录成功后再屏蔽资源类型（登录页的验证码图片须正常加载）
+            blueprint.routing_profile.defer_resource_blocking = blueprint.has_login_node()
+        return blueprint
+
+    def _login_nodes(self):
+        """遍历登录节点：(节点蓝图, 组件类)"""
+        # 延迟导入，避免循环引用
+        from src.frame.base.base_login_node import BaseLoginTaskNode
+
+        for node_blueprint in self.node_blueprints:
+            component_cls = node_blueprint.component_cls or self.load_component_cls(
+                node_blueprint.node_config["component_path"])
+            if issubclass(component_cls, BaseLoginTaskNode):
+                yield node_blueprint, component_cls
+
+    def has_login_node(self) -> bool:
+        """任务是否含登录节点"""
+        return next(self._login_nodes(), None) is not None
+
+    def supports_session_validation(self) -> bool:
+        """
+        登录节点能否校验会话（见BaseLoginTaskNode.supports_session_validation），不能校验时新建Context不恢复缓存的会话
+        """
+        return any(component_cls.supports_session_validation(node_blueprint.node_config)
+                   for node_blueprint, component_cls in self._login_nodes())
+
+    @staticmethod
+    def load_component_cls(component_path: str) -> Type[BaseNode]:
+        """
+        加载组件类
+        支持2种类型的组件：Python组件、JavaScript组件。
+        :param component_path: 组件绝对路径
+        :return: 组件类，JS组件返回JSNode
+        """
+        component_ext = os.path.splitext(component_path)[1].lower()
+        if component_ext == ".py":
+            # 加载Python组件（支持热更新）
+            return component_manager.load_component(component_path, BasePYNode,
+                                                    str(Path(SysPathUtils.get_root_dir(), "components_deps")))
+        elif component_ext == ".js":
+            return JSNode
+        raise Exception(f"不支持的组件类型：{component_ext}，加载失败的组件：{component_path}")
+
+    @staticmethod
+    def complete_component_path(component_path: str) -> str:
+        if not Path(component_path).is_absolute():
+            component_path = str(Path(SysPathUtils.get_root_dir(), component_path))
+        return component_path
@@ -3,6 +3,7 @@ from typing import Dict, List
 
 from PyQt5.QtCore import QObject, pyqtSignal, QThread
 
+from src.frame.common.batch_job_queue import BatchJobQueue
 from src.frame.common.exceptions import BusinessException
 from src.frame.common.browser_process_manager import chrome_process_manager
 from src.frame.common.browser_process_manager import firefox_process_manager
@@ -16,6 +17,7 @@ class TaskManager(QObject):
     user_task_finished_signal = pyqtSignal(str, bool)  # 单个用户任务完成信号
     all_task_finished_signal = pyqtSignal()  # 所有任务完成信号
     progress_update_signal = pyqtSignal(int)  # 进度更新信号
+    resource_usage_signal = pyqtSignal(str, list)  # 用户Context资源占用信号：(批次号, [{username, js_heap_mb, cpu_percent, ...}])
 
     def __init__(self, logger):
         super().__init__()
@@ -23,6 +25,9 @@ class TaskManager(QObject):
         self.logger = logger  # 日志实例
         self.db = db  # 数据库管理器
         self.task_batch_executors: Dict[int, TaskBatchExecutor] = {}  # 任务动作信息，key：批次号，value：任务执行器
+        self.job_queue = BatchJobQueue(logger)  # 持久化批次作业队列
+        # 恢复上次未执行完毕的批次（进程内只执行一次）
+        self.job_queue.recover()
 
     def load_config(self, task_batches: List[Dict]) -> List[Dict]:
         """
@@ -39,8 +44,8 @@ class TaskManager(QObject):
         示例：[({"batch_no": "xxx", "batch_info": {}, "task_tmpl": {}, "task_nodes": {}, "task_tmpl_config": {}}),(...)]
         """
         task_batch_configs = []  # {批次号: 任务模板信息}
-        # 按照优先级排序，值越小优先级越高，优先运行
-        sorted_task_batches = sorted(task_batches, key=lambda x: x["priority"])
+        # 按照有效优先级（优先级+排队时长老化）排序，值越小优先级越高，优先运行
+        sorted_task_batches = self.job_queue.order(task_batches)
 
         for task_batch in sorted_task_batches:
             # 校验
@@ -118,6 +123,7 @@ class TaskManager(QObject):
         self.task_batch_executors[task_batches[0].get("action_id")] = executor
         executor.one_task_batch_finished.connect(self.on_one_task_batch_finished)
         executor.all_task_batch_finished.connect(self.on_all_task_batch_finished)
+        executor.resource_usage_updated.connect(self.resource_usage_signal)
         self.logger.debug(f"加载成功！任务批次配置：{task_batches_config}")
         executor.start()
 
@@ -218,4 +224,4 @@ class TaskManager(QObject):
         :return:
         """
         for executor in self.task_batch_executors.values():
-            executor.pause_task(batch_no, task_uuid, reason)
+            executor.resume_task(batch_no, task_uuid, reason)
@@ -52,6 +52,8 @@ class FullAutomaticTaskPage(QWidget):
         self.btn_free.clicked.connect(self.on_free_resource)
         ##### 表格区域 #####
         self.tbl_task_batch = UITaskBatch(self.run_mode)
+        # 运行中批次的资源占用显示在表格中
+        self.task_manager.resource_usage_signal.connect(self.tbl_task_batch.update_resource_usage)
 
         ##### 添加到主布局 #####
         main_layout.addLayout(ly_buttons)
@@ -207,6 +209,8 @@ class SemiAutomaticTaskPage(QWidget):
         self.btn_switch_status.setEnabled(False)
         ##### 表格区域 #####
         self.tbl_task_batch = UITaskBatch(self.run_mode)
+        # 运行中批次的资源占用显示在表格中
+        self.task_manager.resource_usage_signal.connect(self.tbl_task_batch.update_resource_usage)
 
         ##### 添加到主布局 #####
         main_layout.addLayout(ly_buttons)
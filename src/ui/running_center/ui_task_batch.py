@@ -1,9 +1,11 @@
 from typing import List, Tuple, Dict, Callable, Optional
 
-from PyQt5.QtWidgets import QPushButton
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QPushButton, QTableWidgetItem
 
 from src.frame.base.ui.base_table_widget import BaseTableWidget, EditableField, TableHeader, QueryField
 from src.frame.dao.db_manager import db
+from src.utils import basic
 
 
 class UITaskBatch(BaseTableWidget):
@@ -26,6 +28,8 @@ class UITaskBatch(BaseTableWidget):
         self.project_mapping = {}
         self.force_stop_action = None
         self.btn_force_terminate: Optional[QPushButton] = None  # 强制终止按钮
+        # 运行中批次的资源占用（资源采样结果，不入库）：批次号 -> (汇总, 各用户明细)
+        self.resource_usages: Dict[str, Tuple[str, str]] = {}
         super().__init__(is_need_search=True, is_support_clear_all=False, is_support_export=False, is_support_add=False)
 
     def get_headers(self) -> List[TableHeader]:
@@ -45,6 +49,7 @@ class UITaskBatch(BaseTableWidget):
             TableHeader('总用户数', 'total_user'),
             TableHeader('成功用户数', 'success_user'),
             TableHeader('失败用户数', 'fail_user'),
+            TableHeader('资源占用', 'resource_usage', is_add_visible=False, is_edit_visible=False),
             TableHeader('备注信息', 'remark'),
             # ('更新时间', 'update_time'),
             # ('创建时间', 'create_time')
@@ -70,13 +75,47 @@ class UITaskBatch(BaseTableWidget):
 
     def get_records(self, condition: dict, page=1, page_size=0) -> Tuple[List[dict], int]:
         if page_size > 0:
-            return self.task_batch_dao.get_page_data(page, page_size,
-                                                     condition.get("batch_no"),
-                                                     condition.get("project_name"),
-                                                     run_mode=condition.get("run_mode"))
+            records, total = self.task_batch_dao.get_page_data(page, page_size,
+                                                               condition.get("batch_no"),
+                                                               condition.get("project_name"),
+                                                               run_mode=condition.get("run_mode"))
         else:
             records = self.task_batch_dao.get_all()
-            return records, len(records)
+            total = len(records)
+        for record in records:
+            record["resource_usage"] = self.resource_usages.get(record.get("batch_no"), ("", ""))[0]
+        return records, total
+
+    def update_resource_usage(self, batch_no: str, usages: List[Dict]):
+        """
+        更新批次的资源占用（TaskManager.resource_usage_signal），只刷新该批次所在行的单元格，不重新查询
+        :param batch_no: 批次号
+        :param usages: 各用户Context的资源占用：[{username, js_heap_mb, cpu_percent, dom_nodes, page_count, recycle_count, ...}]
+        """
+        if usages:
+            summary = (f"{len(usages)}个Context | JS堆{sum(usage['js_heap_mb'] for usage in usages):.0f}MB"
+                       f"（最高{max(usage['js_heap_mb'] for usage in usages):.0f}MB） | "
+                       f"CPU{sum(usage['cpu_percent'] for usage in usages):.0f}% | "
+                       f"回收{sum(usage['recycle_count'] for usage in usages)}次")
+            details = "\n".join(
+                f"{basic.mask_username(usage['username'])}：JS堆{usage['js_heap_mb']}MB，CPU{usage['cpu_percent']}%，"
+                f"DOM节点{usage['dom_nodes']}，页面{usage['page_count']}，回收{usage['recycle_count']}次"
+                for usage in sorted(usages, key=lambda usage: usage['js_heap_mb'], reverse=True))
+            self.resource_usages[batch_no] = (summary, details)
+        else:
+            self.resource_usages.pop(batch_no, None)
+            summary, details = "", ""
+
+        columns = {field_name: col for col, field_name in enumerate(
+            [self.field_map[self.table.horizontalHeaderItem(col).text()] for col in range(self.table.columnCount())])}
+        for row in range(self.table.rowCount()):
+            batch_no_item = self.table.item(row, columns["batch_no"])
+            if batch_no_item and batch_no_item.text() == batch_no:
+                item = QTableWidgetItem(summary)
+                item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # 禁用编辑
+                item.setToolTip(details)
+                self.table.setItem(row, columns["resource_usage"], item)
+                break
 
     def _is_empty(self, val):
         return True if val is None or not str(val).strip() else False
@@ -1,4 +1,5 @@
 import atexit
+import multiprocessing
 import os
 import sys
 import time
@@ -733,6 +734,8 @@ def qt_message_handler(msg_type, context, msg):
 
 # ======================== 程序入口 ========================
 if __name__ == "__main__":
+    # 打包后的程序以多进程模式执行批次时，子进程需由此进入
+    multiprocessing.freeze_support()
     try:
         atexit.register(release)
         # 高分屏+抗锯齿
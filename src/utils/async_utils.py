@@ -1,4 +1,10 @@
 import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
 
 
 def get_event_loop_safely():
@@ -19,4 +25,79 @@ def get_event_loop_safely():
             # 无默认循环，创建新循环并设为默认
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-    return loop
\ No newline at end of file
+    return loop
+
+
+class LoopBlockWatchdog:
+    """
+    事件循环阻塞检测（调试用）
+    后台守护线程定时向事件循环投递心跳回调，若心跳超过阈值仍未被执行，说明某个回调/协程长时间占用了事件循环
+    （例如在协程中调用了time.sleep、同步IO），此时输出事件循环所在线程的调用栈，便于定位阻塞代码
+    同一次阻塞只报告一次
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, threshold_ms: int, logger=None):
+        """
+        :param loop: 被检测的事件循环
+        :param threshold_ms: 阻塞阈值（毫秒），事件循环超过该时长未响应即报告
+        :param logger: 日志，默认logging
+        """
+        self.loop = loop
+        self.threshold = max(threshold_ms, 1) / 1000
+        self.logger = logger or logging.getLogger(__name__)
+        self._loop_thread_id: Optional[int] = None
+        self._pending_since: Optional[float] = None  # 未被执行的心跳的投递时间
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _beat(self):
+        self._pending_since = None
+
+    def start(self):
+        """启动检测，须在事件循环所在线程调用"""
+        if self._thread:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._pending_since = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, name="LoopBlockWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止检测"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _watch(self):
+        # 检测周期取阈值的1/4，保证阻塞能被及时发现
+        check_interval = self.threshold / 4
+        reported = False
+        while not self._stop_event.wait(check_interval):
+            if self.loop.is_closed():
+                break
+            pending_since = self._pending_since
+            if pending_since is not None:
+                # 心跳尚未被执行
+                blocked = time.monotonic() - pending_since
+                if blocked > self.threshold and not reported and self.loop.is_running():
+                    reported = True
+                    self.logger.warning(f"事件循环已阻塞{blocked * 1000:.0f}毫秒（阈值{self.threshold * 1000:.0f}毫秒），"
+                                        f"阻塞位置：\n{self._format_loop_stack()}")
+                continue
+            if reported:
+                reported = False
+                self.logger.warning("事件循环阻塞结束")
+            self._pending_since = time.monotonic()
+            try:
+                self.loop.call_soon_threadsafe(self._beat)
+            except RuntimeError:
+                # 事件循环已关闭
+                break
+
+    def _format_loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return "（未获取到事件循环线程的调用栈）"
+        return "".join(traceback.format_stack(frame))
@@ -0,0 +1,75 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class KeywordMatcher:
+    """
+    多关键词匹配器（Aho-Corasick自动机，忽略大小写）
+    构建时对所有关键词casefold并建立自动机，匹配时文本只需casefold一次、扫描一遍，耗时与关键词个数无关
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        :param keywords: 关键词列表，空白关键词忽略
+        """
+        self._goto: List[Dict[str, int]] = [{}]  # 状态转移表
+        self._fail: List[int] = [0]  # 失败指针
+        self._output: List[Optional[str]] = [None]  # 状态对应的关键词（含经失败指针可达的关键词）
+        self.keywords: List[str] = []
+        for keyword in keywords:
+            if keyword and keyword.strip():
+                self._add(keyword.casefold())
+        self._build()
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def _add(self, keyword: str):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state] = keyword
+        self.keywords.append(keyword)
+
+    def _build(self):
+        """广度优先构建失败指针"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._output[next_state] is None:
+                    self._output[next_state] = self._output[self._fail[next_state]]
+
+    def search(self, text: str) -> Optional[str]:
+        """
+        查找文本中出现的第一个关键词
+        :param text: 文本
+        :return: 匹配到的关键词（casefold后），未匹配返回None
+        """
+        if not text or not self.keywords:
+            return None
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text.casefold():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+    def is_match(self, text: str) -> bool:
+        """文本中是否包含任一关键词"""
+        return self.search(text) is not None
@@ -43,6 +43,7 @@ class SliderVerifyUtils:
     def move_slider_slowly(cls, move_x: int, btn_slider, ac):
         """
         模拟滑块缓慢移动（确保所有移动距离为整数，适配move_by_offset要求）
+        注意：Selenium同步版本，内部使用time.sleep，会阻塞事件循环，协程中请使用move_slider_slowly_pw_version
         :param move_x: 总移动距离（x方向，整数）
         :param btn_slider: 滑块元素（WebElement）
         :param ac: ActionChains实例
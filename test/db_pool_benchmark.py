@@ -0,0 +1,116 @@
+"""
+数据库连接池对比：分别以旧方式（每次操作建立、关闭连接，回滚日志模式）和连接池（长连接，WAL模式）执行任务批次表的高频操作，统计每秒操作数
+用法：python -m test.db_pool_benchmark --batches 2000 --ops 3000 --threads 4
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from src.frame.dao.base_db import SQLITE_CONNECT_ARGS
+from src.frame.dao.task_batch_dao import TaskBatchDAO
+from src.frame.dao.task_tmpl_dao import TaskTmplDAO
+
+
+class LegacyTaskBatchDAO(TaskBatchDAO.__wrapped__):
+    """旧的连接方式：每次操作建立连接、提交、关闭"""
+
+    @contextmanager
+    def get_db_connection(self, readonly: bool = False):
+        conn = sqlite3.connect(self.db_path, **SQLITE_CONNECT_ARGS)
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.row_factory = sqlite3.Row
+            yield conn
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def make_dao(dao_cls, db_path: str):
+    dao_cls = type(dao_cls.__name__, (dao_cls,), {"db_path": db_path})
+    return dao_cls(logging.getLogger("benchmark"))
+
+
+def prepare(db_path: str, batches: int, legacy: bool):
+    """建表并写入测试数据（旧方式为默认的回滚日志模式）"""
+    dao = make_dao(LegacyTaskBatchDAO if legacy else TaskBatchDAO.__wrapped__, db_path)
+    with dao.get_db_connection() as conn:
+        conn.executescript(TaskTmplDAO.__wrapped__.get_init_sql(dao))
+        conn.execute("INSERT INTO tb_task_tmpl (project_id, domain, business_type, name, login_interval) "
+                     "VALUES (1, 'www.example.com', 'learning', 'benchmark', 1)")
+    dao.batch_add([{"task_tmpl_id": 1, "task_tmpl_name": "benchmark", "business_type": "learning", "project_id": 1,
+                    "project_name": f"项目{i % 20}", "user_info": "{}", "priority": 5, "queue_time": None,
+                    "execute_status": 0, "user_mode": 1, "run_mode": 1, "batch_no": f"B{i:08d}",
+                    "global_config": '{"default_login_interval": "8"}', "total_user": 100, "success_user": 0,
+                    "fail_user": 0} for i in range(batches)])
+    return dao
+
+
+def run_ops(func, ops: int, threads: int) -> float:
+    """多线程执行操作，返回每秒操作数"""
+    per_thread = max(1, ops // threads)
+
+    def worker():
+        for _ in range(per_thread):
+            func()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def benchmark(legacy: bool, batches: int, ops: int, threads: int) -> dict:
+    db_dir = tempfile.mkdtemp()
+    dao = prepare(os.path.join(db_dir, "benchmark.db"), batches, legacy)
+
+    def batch_no():
+        return f"B{random.randrange(batches):08d}"
+
+    def mixed():
+        # 用户结束时的典型操作：累加计数，同时UI刷新分页
+        if random.random() < 0.5:
+            dao.add_user_counts({batch_no(): (1, 0)})
+        else:
+            dao.get_page_data(random.randint(1, 50), 20)
+
+    results = {
+        "get_by_batch_no": run_ops(lambda: dao.get_by_batch_no(batch_no()), ops, threads),
+        "add_one_success_user": run_ops(lambda: dao.add_one_success_user(batch_no()), ops, threads),
+        "update_status": run_ops(lambda: dao.update_status(batch_no(), 1), ops, threads),
+        "get_page_data": run_ops(lambda: dao.get_page_data(random.randint(1, 50), 20), ops, threads),
+        "mixed": run_ops(mixed, ops, threads),
+    }
+    if not legacy:
+        dao.pool.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库连接池对比")
+    parser.add_argument("--batches", type=int, default=2000, help="任务批次表的记录数")
+    parser.add_argument("--ops", type=int, default=3000, help="每项操作的执行次数")
+    parser.add_argument("--threads", type=int, default=4, help="并发线程数")
+    args = parser.parse_args()
+
+    legacy = benchmark(True, args.batches, args.ops, args.threads)
+    pooled = benchmark(False, args.batches, args.ops, args.threads)
+    print(f"{'操作':<24}{'旧方式(ops/s)':>16}{'连接池(ops/s)':>16}{'提升':>10}")
+    for name in legacy:
+        print(f"{name:<24}{legacy[name]:>16.0f}{pooled[name]:>16.0f}{pooled[name] / legacy[name]:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
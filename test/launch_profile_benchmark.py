@@ -0,0 +1,68 @@
+"""
+启动档案内存对比：分别以默认档案、低资源档案启动浏览器，创建N个Context并打开同一页面，统计浏览器进程树的RSS
+用法：python -m test.launch_profile_benchmark --contexts 10 --url https://www.example.com --settle 20
+"""
+import argparse
+import asyncio
+import logging
+import os
+
+import psutil
+
+from src.frame.common.launch_profile import LaunchProfile
+from src.frame.common.playwright_driver_manager import WebDriverManager
+from src.frame.dto.driver_config import DriverConfig
+
+
+def browser_tree_rss_mb() -> float:
+    """当前进程所有子孙进程（playwright驱动+浏览器）的RSS之和（MB）"""
+    total = 0
+    for proc in psutil.Process(os.getpid()).children(recursive=True):
+        try:
+            total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total / 1024 / 1024
+
+
+async def measure(launch_config, contexts: int, url: str, settle: float, browser_type: str) -> tuple:
+    """
+    :return: (首个Context创建后的RSS, N个Context创建后的RSS, 每个Context的RSS增量)，单位MB
+    """
+    manager = WebDriverManager(logging)
+    manager.configure_launch_profile(LaunchProfile.from_config(launch_config))
+    driver_config = DriverConfig(browser_type=browser_type, headless_mode="1", incognito_mode="1")
+    try:
+        for i in range(contexts):
+            context = await manager.create_user_driver(f"bench_{i}", "bench", driver_config)
+            await context.pages[0].goto(url)
+            if i == 0:
+                await asyncio.sleep(settle)
+                base_rss = browser_tree_rss_mb()
+        await asyncio.sleep(settle)
+        total_rss = browser_tree_rss_mb()
+    finally:
+        await manager.close()
+    return base_rss, total_rss, (total_rss - base_rss) / max(1, contexts - 1)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="启动档案内存对比")
+    parser.add_argument("--contexts", type=int, default=10, help="Context数")
+    parser.add_argument("--url", default="https://www.example.com", help="每个Context打开的页面")
+    parser.add_argument("--settle", type=float, default=10, help="打开页面后等待稳定的时长（秒）")
+    parser.add_argument("--browser-type", default="0", choices=("0", "1"), help="浏览器类型。0：chrome；1：firefox")
+    parser.add_argument("--max-frame-rate", type=int, default=5, help="低资源档案的最大帧率")
+    args = parser.parse_args()
+
+    results = {}
+    for name, launch_config in (("default", None),
+                                ("lean", {"profile": "lean", "max_frame_rate": args.max_frame_rate})):
+        results[name] = await measure(launch_config, args.contexts, args.url, args.settle, args.browser_type)
+    print(f"{'档案':<10}{'首个Context(MB)':>18}{f'{args.contexts}个Context(MB)':>20}{'每个Context(MB)':>18}")
+    for name, (base_rss, total_rss, per_context_rss) in results.items():
+        print(f"{name:<10}{base_rss:>18.1f}{total_rss:>20.1f}{per_context_rss:>18.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())